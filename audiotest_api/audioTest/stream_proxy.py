@@ -0,0 +1,96 @@
+# ============================================
+# stream_proxy.py - 스트리밍 리버스 프록시
+# ============================================
+# 요청 본문과 응답 바이트를 메모리에 모으거나 다시 인코딩하지 않고 그대로 흘려보냅니다.
+# - 업스트림 연결은 공유 httpx.AsyncClient 로 재사용 (요청마다 새 클라이언트를 만들지 않음)
+# - 상태 코드 / 헤더(hop-by-hop 제외)는 업스트림 응답 그대로 전달
+# - front.py 와 audioTest/app.py 의 /ingest-chunk 패스스루에서 공용으로 사용
+#
+# 사용 예)
+#     judge_proxy = StreamProxy(timeout=30.0)
+#     app = FastAPI(lifespan=judge_proxy.lifespan)   # 종료 시 연결 정리
+#
+#     @app.post("/ingest-chunk")
+#     async def ingest_chunk(request: Request):
+#         return await judge_proxy.forward(request, f"{JUDGE_BASE_URL}/ingest-chunk")
+
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import httpx
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+# RFC 7230 hop-by-hop 헤더 (프록시 구간마다 새로 정해지므로 전달하지 않음)
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+
+def _forward_headers(headers, drop: set) -> dict:
+    return {key: value for key, value in headers.items() if key.lower() not in drop}
+
+
+class StreamProxy:
+    """
+    공유 연결 풀을 쓰는 스트리밍 리버스 프록시
+
+    Attributes:
+        timeout: 업스트림 요청 타임아웃(초)
+        max_connections: 업스트림 최대 동시 연결 수
+        max_keepalive: 유지할 keep-alive 연결 수
+    """
+
+    def __init__(self, timeout: float = 30.0, max_connections: int = 100, max_keepalive: int = 20):
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+        )
+
+    async def forward(self, request: Request, url: str, params: Optional[dict] = None) -> StreamingResponse:
+        """
+        request 를 url 로 그대로 전달하고 업스트림 응답을 스트리밍으로 반환
+
+        Args:
+            request: 들어온 요청 (본문은 request.stream() 으로 읽으며 전달)
+            url: 업스트림 URL
+            params: 원래 쿼리 파라미터에 덧붙일 값
+
+        Raises:
+            httpx.HTTPError: 업스트림 연결 / 전송 실패
+        """
+        query = dict(request.query_params)
+        if params:
+            query.update(params)
+        # Content-Length 를 그대로 넘기므로 업스트림에도 chunked 없이 같은 길이로 전달됨
+        upstream_request = self.client.build_request(
+            request.method,
+            url,
+            params=query,
+            headers=_forward_headers(request.headers, HOP_BY_HOP_HEADERS | {"host"}),
+            content=request.stream(),
+        )
+        upstream = await self.client.send(upstream_request, stream=True)
+        return StreamingResponse(
+            upstream.aiter_raw(),
+            status_code=upstream.status_code,
+            headers=_forward_headers(upstream.headers, HOP_BY_HOP_HEADERS),
+            background=BackgroundTask(upstream.aclose),
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    @asynccontextmanager
+    async def lifespan(self, app):
+        """FastAPI(lifespan=...) 용: 앱 종료 시 업스트림 연결 정리"""
+        yield
+        await self.aclose()
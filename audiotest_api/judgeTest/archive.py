@@ -0,0 +1,233 @@
+"""
+archive.py - 판단 서버 발화 오디오 아카이브
+발화 오디오를 요청 경로 밖에서 압축 저장하고, 보존 정책과 manifest 인덱스를 관리합니다.
+
+- 요청 경로에서는 submit() 으로 큐에 넣기만 함 (인코딩/디스크 쓰기는 전용 스레드)
+- 큐에 쌓인 발화를 batch_size 개씩 묶어서 저장하고 manifest 도 배치 단위로 한 번에 기록
+- 저장 형식: FLAC (무손실, 기본) / Opus (OGG, 손실) / WAV
+- 저장 위치: {root}/YYYY/MM/DD/{session}_{timestamp}.{ext}
+- 보존 정책: retention_days 보다 오래된 파일, max_total_bytes 를 넘는 오래된 파일부터 삭제
+- manifest: {root}/manifest.jsonl (파일 경로, 세션, 시각, 길이, 크기, 전사 텍스트)
+
+manifest 에 없는 파일(예: 예전 방식으로 저장된 audio_data/*.wav)은 보존 정책 대상이 아닙니다.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# format → (soundfile format, subtype, 확장자)
+ARCHIVE_FORMATS = {
+    "flac": ("FLAC", "PCM_16", "flac"),
+    "opus": ("OGG", "OPUS", "ogg"),
+    "wav": ("WAV", "PCM_16", "wav"),
+}
+MANIFEST_NAME = "manifest.jsonl"
+
+
+class AudioArchive:
+    """
+    배치 단위 백그라운드 오디오 아카이브
+
+    Attributes:
+        root: 아카이브 루트 디렉토리
+        fmt: 저장 형식 ("flac" | "opus" | "wav")
+        batch_size: 한 번에 저장할 최대 발화 수
+        flush_interval: 배치를 채우지 못해도 저장하는 주기(초)
+        max_queue: 대기 가능한 발화 수 (넘으면 버리고 dropped_total 증가)
+        retention_days: 보존 기간(일), 0이면 기간 제한 없음
+        max_total_bytes: 전체 용량 제한(bytes), 0이면 용량 제한 없음
+        retention_interval: 보존 정책 실행 주기(초)
+    """
+    def __init__(self,
+                 root: Path,
+                 fmt: str = "flac",
+                 batch_size: int = 16,
+                 flush_interval: float = 2.0,
+                 max_queue: int = 256,
+                 retention_days: float = 30,
+                 max_total_bytes: int = 0,
+                 retention_interval: float = 600.0):
+        if fmt not in ARCHIVE_FORMATS:
+            raise ValueError(f"지원하지 않는 아카이브 형식: {fmt} (지원: {', '.join(ARCHIVE_FORMATS)})")
+
+        self.root = Path(root)
+        self.fmt = fmt
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.max_total_bytes = max_total_bytes
+        self.retention_interval = retention_interval
+        self.manifest_path = self.root / MANIFEST_NAME
+
+        self.written_total = 0
+        self.dropped_total = 0
+        self.failed_total = 0
+        self.deleted_total = 0
+
+        self._queue = queue.Queue(maxsize=max(1, max_queue))
+        self._entries = self._load_manifest()   # timestamp 순 (오래된 파일이 앞)
+        self._total_bytes = sum(entry["bytes"] for entry in self._entries)
+        self._last_retention = 0.0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="audio-archive-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- 요청 경로 ----------
+    def submit(self, session_id: str, audio: np.ndarray, samplerate: int, text: Optional[str] = None) -> bool:
+        """저장할 발화를 큐에 등록 (즉시 반환), 큐가 가득 찼으면 버리고 False"""
+        try:
+            self._queue.put_nowait((session_id, time.time(), audio, samplerate, text))
+            return True
+        except queue.Full:
+            self.dropped_total += 1
+            return False
+
+    # ---------- writer 스레드 ----------
+    def _next_batch(self) -> list:
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    # manifest 기록 실패 등, 배치 하나가 실패해도 writer 스레드는 계속 동작
+                    self.failed_total += len(batch)
+                    print(f"❌ 오디오 아카이브 배치 저장 실패 ({len(batch)}개): {e}")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+
+            if time.monotonic() - self._last_retention >= self.retention_interval:
+                self._last_retention = time.monotonic()
+                try:
+                    self.apply_retention()
+                except Exception as e:
+                    print(f"❌ 오디오 아카이브 보존 정책 실패: {e}")
+
+    def _write_batch(self, batch: list):
+        import soundfile as sf  # writer 스레드에서 처음 저장할 때 로드
+
+        sf_format, subtype, ext = ARCHIVE_FORMATS[self.fmt]
+        entries = []
+        for session_id, timestamp, audio, samplerate, text in batch:
+            try:
+                day_dir = datetime.fromtimestamp(timestamp).strftime("%Y/%m/%d")
+                save_dir = self.root / day_dir
+                save_dir.mkdir(parents=True, exist_ok=True)
+                save_path = save_dir / f"{session_id}_{timestamp:.3f}.{ext}"
+                sf.write(save_path, audio, samplerate, format=sf_format, subtype=subtype)
+                entries.append({
+                    "path": f"{day_dir}/{save_path.name}",
+                    "session_id": session_id,
+                    "timestamp": timestamp,
+                    "duration": round(len(audio) / samplerate, 3),
+                    "bytes": save_path.stat().st_size,
+                    "format": self.fmt,
+                    "text": text,
+                })
+            except Exception as e:
+                self.failed_total += 1
+                print(f"❌ 오디오 아카이브 저장 실패: {e}")
+
+        if not entries:
+            return
+        with self._lock:
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+            self._entries.extend(entries)
+            self._total_bytes += sum(entry["bytes"] for entry in entries)
+            self.written_total += len(entries)
+
+    # ---------- manifest / 보존 정책 ----------
+    def _load_manifest(self) -> deque:
+        if not self.manifest_path.exists():
+            return deque()
+        entries = []
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        # 이후 저장분은 submit 순서대로 뒤에 붙으므로 정렬은 로드할 때 한 번만
+        return deque(sorted(entries, key=lambda entry: entry["timestamp"]))
+
+    def _rewrite_manifest(self):
+        """삭제 반영한 manifest 를 임시 파일에 쓰고 교체 (중간에 죽어도 기존 manifest 유지)"""
+        tmp_path = self.manifest_path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in self._entries))
+        os.replace(tmp_path, self.manifest_path)
+
+    def apply_retention(self, now: Optional[float] = None) -> int:
+        """보존 기간 / 전체 용량 제한을 넘는 오래된 파일 삭제, 삭제한 수 반환"""
+        now = now or time.time()
+        with self._lock:
+            expired = []
+            if self.retention_days:
+                deadline = now - self.retention_days * 86400
+                while self._entries and self._entries[0]["timestamp"] < deadline:
+                    expired.append(self._entries.popleft())
+                    self._total_bytes -= expired[-1]["bytes"]
+            if self.max_total_bytes:
+                while self._entries and self._total_bytes > self.max_total_bytes:
+                    expired.append(self._entries.popleft())
+                    self._total_bytes -= expired[-1]["bytes"]
+            if not expired:
+                return 0
+
+            for entry in expired:
+                path = self.root / entry["path"]
+                try:
+                    path.unlink(missing_ok=True)
+                    # 비어 있는 날짜 디렉토리 정리
+                    for parent in list(path.parents)[:3]:
+                        if parent == self.root or any(parent.iterdir()):
+                            break
+                        parent.rmdir()
+                except OSError as e:
+                    print(f"⚠️ 아카이브 파일 삭제 실패: {path} ({e})")
+            self._rewrite_manifest()
+            self.deleted_total += len(expired)
+
+        print(f"🧹 오디오 아카이브 정리: {len(expired)}개 삭제")
+        return len(expired)
+
+    def flush(self):
+        """큐에 남은 발화가 모두 저장될 때까지 대기 (테스트 / 종료 시)"""
+        self._queue.join()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "format": self.fmt,
+                "queued": self._queue.qsize(),
+                "files": len(self._entries),
+                "bytes": self._total_bytes,
+                "written_total": self.written_total,
+                "dropped_total": self.dropped_total,
+                "failed_total": self.failed_total,
+                "deleted_total": self.deleted_total,
+            }
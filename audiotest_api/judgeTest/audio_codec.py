@@ -0,0 +1,98 @@
+"""
+audio_codec.py - 판단 서버 청크 디코더
+브라우저(processor.js)가 보낸 청크를 codec / rate 헤더에 맞게 float32 오디오로 복원합니다.
+
+지원 codec:
+    pcm_s16le: Int16 리틀엔디언 PCM (기존 전송 방식)
+    mulaw:     G.711 μ-law 8bit (processor.js 의 encodeMulaw 와 짝)
+"""
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+DEFAULT_CODEC = "pcm_s16le"
+DEFAULT_RATE = 48000  # codec / rate 헤더가 없는 기존 클라이언트 (브라우저 기본 sampleRate)
+SUPPORTED_CODECS = ("pcm_s16le", "mulaw")
+
+
+class UnsupportedCodecError(ValueError):
+    """지원하지 않는 codec 또는 잘못된 rate"""
+
+
+def _build_mulaw_table() -> np.ndarray:
+    """μ-law 바이트(0~255) → float32 변환 테이블"""
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    sign = codes & 0x80
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    samples = np.where(sign != 0, -magnitude, magnitude)
+    return (samples / 32768.0).astype(np.float32)
+
+
+_MULAW_TABLE = _build_mulaw_table()
+
+
+def mulaw_encode(pcm: np.ndarray) -> np.ndarray:
+    """Int16 PCM → G.711 μ-law 바이트 (processor.js 의 encodeMulaw 와 같은 인코딩, 테스트/벤치마크용)"""
+    pcm = pcm.astype(np.int32)
+    sign = np.where(pcm < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(pcm), 32635) + 0x84
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def decode_chunk(data: bytes, codec: str = DEFAULT_CODEC) -> np.ndarray:
+    """청크 바이트를 float32 (-1.0 ~ 1.0) 오디오로 디코딩"""
+    if codec == "pcm_s16le":
+        return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+    if codec == "mulaw":
+        return _MULAW_TABLE[np.frombuffer(data, dtype=np.uint8)]
+    raise UnsupportedCodecError(f"지원하지 않는 codec: {codec} (지원: {', '.join(SUPPORTED_CODECS)})")
+
+
+@lru_cache(maxsize=8)
+def _gained_mulaw_table(gain: float) -> np.ndarray:
+    return (_MULAW_TABLE * np.float32(gain)).astype(np.float32)
+
+
+def decode_into(data: bytes, codec: str, gain: float = 1.0,
+                buffer: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    청크 바이트를 float32 로 디코딩하면서 gain 을 곱해 재사용 버퍼에 바로 기록 (fast path)
+
+    int16 → float32 변환, / 32768, * gain 을 한 번의 ufunc 로 처리해 중간 배열을 만들지 않습니다.
+    반환되는 오디오는 buffer 의 view 이므로 다음 청크에서 덮어써집니다. (보관하려면 copy 필요)
+
+    Returns:
+        (오디오 view, 버퍼) - 버퍼가 없거나 작으면 새로 만든 버퍼를 반환
+    """
+    if codec == "pcm_s16le":
+        samples = np.frombuffer(data, dtype="<i2")
+    elif codec == "mulaw":
+        samples = np.frombuffer(data, dtype=np.uint8)
+    else:
+        raise UnsupportedCodecError(f"지원하지 않는 codec: {codec} (지원: {', '.join(SUPPORTED_CODECS)})")
+
+    if buffer is None or len(buffer) < len(samples):
+        buffer = np.empty(len(samples), dtype=np.float32)
+    out = buffer[:len(samples)]
+
+    if codec == "pcm_s16le":
+        np.multiply(samples, np.float32(gain / 32768.0), out=out, dtype=np.float32)
+    else:
+        np.take(_gained_mulaw_table(float(gain)), samples, out=out)
+    return out, buffer
+
+
+def to_samplerate(audio: np.ndarray, rate: int, target_rate: int) -> np.ndarray:
+    """rate 가 target_rate 와 다를 때만 리샘플링 (클라이언트가 이미 16kHz로 보냈으면 그대로 통과)"""
+    if rate <= 0:
+        raise UnsupportedCodecError(f"잘못된 rate: {rate}")
+    if rate == target_rate:
+        return audio
+    import librosa  # 리샘플링이 필요할 때만 로드 (서버 시작 시간 단축)
+
+    return librosa.resample(audio, orig_sr=rate, target_sr=target_rate)
@@ -0,0 +1,146 @@
+"""
+bench_ingest.py - /ingest-chunk 디코딩 경로 마이크로벤치마크
+
+청크 하나를 float32 오디오로 바꾸는 비용을 비교합니다.
+- legacy: frombuffer → astype(float32) → /32768 → *GAIN → min/max (중간 배열 3개 + 리덕션 2번)
+- fused:  decode_into (변환+게인 한 번에, 세션별 버퍼 재사용)
+- http:   (--http) TestClient 로 multipart(UploadFile) 와 application/octet-stream 요청 비교
+
+실행 예:
+    python bench_ingest.py
+    python bench_ingest.py --chunk-seconds 0.25 --iterations 20000
+    python bench_ingest.py --http --requests 300
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+BASE = Path(__file__).parent
+sys.path.insert(0, str(BASE))
+
+from audio_codec import DEFAULT_RATE, decode_into  # noqa: E402
+
+GAIN = 5.0
+
+
+def _legacy(data: bytes, codec: str, gain: float) -> np.ndarray:
+    """기존 /ingest-chunk 변환 경로"""
+    audio = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+    audio = audio * gain
+    _ = (audio.min(), audio.max())
+    return audio
+
+
+def _fused(buffer):
+    def run(data: bytes, codec: str, gain: float) -> np.ndarray:
+        nonlocal buffer
+        audio, buffer = decode_into(data, codec, gain, buffer)
+        return audio
+    return run
+
+
+def _measure(fn, data: bytes, codec: str, iterations: int) -> dict:
+    for _ in range(min(100, iterations)):
+        fn(data, codec, GAIN)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(data, codec, GAIN)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _ in range(100):
+        fn(data, codec, GAIN)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"us_per_chunk": elapsed / iterations * 1e6, "peak_kb": peak / 1024}
+
+
+def bench_decode(chunk_seconds: float, rate: int, iterations: int):
+    samples = int(rate * chunk_seconds)
+    pcm = (np.random.default_rng(0).standard_normal(samples) * 3000).astype(np.int16)
+    data = pcm.tobytes()
+
+    print(f"📊 디코딩: {chunk_seconds}초 청크 ({samples} samples, {len(data)} bytes), {iterations}회")
+    results = {
+        "legacy": _measure(_legacy, data, "pcm_s16le", iterations),
+        "fused": _measure(_fused(None), data, "pcm_s16le", iterations),
+        "fused (mulaw)": _measure(_fused(None), bytes(samples), "mulaw", iterations),
+    }
+    for name, result in results.items():
+        print(f"  {name:<14} {result['us_per_chunk']:8.1f} µs/chunk   peak {result['peak_kb']:8.1f} KB")
+    speedup = results["legacy"]["us_per_chunk"] / results["fused"]["us_per_chunk"]
+    print(f"  → fused 가 legacy 대비 {speedup:.2f}배")
+
+
+def bench_http(chunk_seconds: float, rate: int, requests: int):
+    """요청 파싱까지 포함한 비교 (Fake STT, 무음 청크라 VAD 는 녹음을 시작하지 않음)"""
+    tmp_dir = tempfile.mkdtemp(prefix="judge_bench_")
+    with open(BASE / "config.json", "r", encoding="utf-8") as f:
+        config_data = json.load(f)
+    config_data["stt"] = {"backend": "fake"}
+    config_data.setdefault("paths", {})["archive_dir"] = str(Path(tmp_dir) / "audio_data")
+    config_data.setdefault("server", {})["warmup"] = "blocking"
+    config_path = Path(tmp_dir) / "config.json"
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config_data, f, ensure_ascii=False)
+    os.environ["JUDGE_CONFIG"] = str(config_path)
+
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as client:
+        data = bytes(int(rate * chunk_seconds) * 2)
+
+        def multipart(session_id):
+            return client.post(
+                "/ingest-chunk",
+                data={"sessionId": session_id, "mode": "chunk", "codec": "pcm_s16le", "rate": str(rate)},
+                files={"chunk": ("chunk.raw", data, "application/octet-stream")},
+            )
+
+        def raw(session_id):
+            return client.post(
+                "/ingest-chunk",
+                params={"sessionId": session_id, "codec": "pcm_s16le", "rate": rate},
+                content=data,
+                headers={"Content-Type": "application/octet-stream"},
+            )
+
+        print(f"\n📊 HTTP: {requests}개 요청 (TestClient)")
+        for name, send in (("multipart", multipart), ("octet-stream", raw)):
+            session_id = client.post("/start").json()["sessionId"]
+            for _ in range(10):
+                send(session_id)
+            start = time.perf_counter()
+            for _ in range(requests):
+                resp = send(session_id)
+                assert resp.status_code == 200, resp.text
+            elapsed = time.perf_counter() - start
+            print(f"  {name:<14} {elapsed / requests * 1e3:8.2f} ms/request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/ingest-chunk 디코딩 마이크로벤치마크")
+    parser.add_argument("--chunk-seconds", type=float, default=0.5, help="청크 길이(초)")
+    parser.add_argument("--rate", type=int, default=DEFAULT_RATE, help="클라이언트 샘플레이트")
+    parser.add_argument("--iterations", type=int, default=5000, help="디코딩 반복 횟수")
+    parser.add_argument("--http", action="store_true", help="TestClient 로 요청 단위 비교도 실행")
+    parser.add_argument("--requests", type=int, default=200, help="--http 요청 수")
+    args = parser.parse_args()
+
+    bench_decode(args.chunk_seconds, args.rate, args.iterations)
+    if args.http:
+        bench_http(args.chunk_seconds, args.rate, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+bench_vad.py - VAD 백엔드 / 스레드 설정 벤치마크 (CPU)
+
+torch JIT 와 ONNX Runtime 백엔드를 스레드 설정별로 비교합니다.
+동시성 N 은 스레드 N개가 각자 VAD 모델 인스턴스로 0.5초 청크를 처리하는 상황입니다.
+(워커 프로세스 여러 개가 한 머신에서 VAD 를 돌리는 스케일아웃 환경과 같은 코어 경쟁)
+
+측정 항목:
+    프레임(32ms)당 지연 p50 / p99, 전체 처리량 (frames/sec, 실시간 대비 배수)
+
+torch 스레드 수는 프로세스 전역 설정이라 설정 조합마다 별도 프로세스에서 측정합니다.
+
+실행 예:
+    python bench_vad.py
+    python bench_vad.py --backends onnx --threads 1x1 2x1 0x0 --concurrency 1 4 16
+    python bench_vad.py --method frames --seconds 20
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE = Path(__file__).parent
+sys.path.insert(0, str(BASE))
+
+from judge_config import AudioConfig, VADConfig  # noqa: E402
+
+SAMPLERATE = 16000
+CHUNK_SECONDS = 0.5
+FRAME_SAMPLES = 512
+
+
+def _load_audio(seconds: float) -> np.ndarray:
+    """audio_data/ 의 실제 발화 WAV 를 이어 붙여 사용 (없으면 합성 신호)"""
+    wavs = sorted((BASE / "audio_data").glob("*.wav"))
+    if wavs:
+        import librosa
+
+        pieces, total = [], 0
+        for path in wavs:
+            audio, _ = librosa.load(path, sr=SAMPLERATE, mono=True)
+            pieces.append(audio.astype(np.float32))
+            total += len(audio)
+            if total >= seconds * SAMPLERATE:
+                break
+        audio = np.concatenate(pieces)
+        repeats = int(np.ceil(seconds * SAMPLERATE / len(audio)))
+        return np.tile(audio, repeats)[:int(seconds * SAMPLERATE)]
+
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SAMPLERATE)) / SAMPLERATE
+    envelope = (np.sin(2 * np.pi * 0.5 * t) > 0).astype(np.float32)
+    return (0.3 * np.sin(2 * np.pi * 220 * t) * envelope + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+# ========== 측정 (자식 프로세스) ==========
+def _process(model, method: str):
+    return model.frame_probabilities if method == "frames" else model.get_speech_timestamps
+
+
+def run_case(backend: str, intra: int, inter: int, concurrency_levels: list, seconds: float, method: str) -> list:
+    from streaming_engine import VADModel
+
+    audio_config = AudioConfig(SAMPLERATE=SAMPLERATE)
+    vad_config = VADConfig(BACKEND=backend, INTRA_OP_THREADS=intra, INTER_OP_THREADS=inter)
+    audio = _load_audio(seconds)
+    chunk_samples = int(CHUNK_SECONDS * SAMPLERATE)
+    chunks = [audio[i:i + chunk_samples] for i in range(0, len(audio) - chunk_samples + 1, chunk_samples)]
+    frames_per_chunk = chunk_samples / FRAME_SAMPLES
+
+    results = []
+    for concurrency in concurrency_levels:
+        models = [VADModel(audio_config, vad_config) for _ in range(concurrency)]
+        for model in models:
+            _process(model, method)(chunks[0])  # 모델 로드 + 첫 추론은 측정에서 제외
+
+        latencies = [[] for _ in range(concurrency)]
+        barrier = threading.Barrier(concurrency + 1)
+
+        def worker(index: int):
+            process = _process(models[index], method)
+            barrier.wait()
+            for chunk in chunks:
+                started = time.perf_counter()
+                process(chunk)
+                latencies[index].append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        per_frame_ms = np.concatenate([np.asarray(values) for values in latencies]) / frames_per_chunk * 1000
+        total_frames = concurrency * len(chunks) * frames_per_chunk
+        results.append({
+            "backend": backend,
+            "threads": f"{intra}x{inter}",
+            "concurrency": concurrency,
+            "frame_ms_p50": round(float(np.percentile(per_frame_ms, 50)), 3),
+            "frame_ms_p99": round(float(np.percentile(per_frame_ms, 99)), 3),
+            "frames_per_sec": round(total_frames / elapsed, 1),
+            "realtime_x": round(concurrency * len(chunks) * CHUNK_SECONDS / elapsed, 1),
+        })
+    return results
+
+
+# ========== 오케스트레이션 ==========
+def _parse_threads(spec: str) -> tuple:
+    intra, _, inter = spec.partition("x")
+    return int(intra), int(inter or 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD 백엔드 / 스레드 설정 벤치마크")
+    parser.add_argument("--backends", nargs="+", default=["jit", "onnx"], choices=["jit", "onnx"])
+    parser.add_argument("--threads", nargs="+", default=["1x1", "2x1", "0x0"],
+                        help="intra x inter 스레드 수 (0 = 라이브러리 기본값)")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=10.0, help="세션 하나가 처리할 오디오 길이(초)")
+    parser.add_argument("--method", choices=["timestamps", "frames"], default="timestamps",
+                        help="timestamps: get_speech_timestamps (chunk 종료 감지), frames: 프레임 확률 (adaptive)")
+    parser.add_argument("--save", help="결과를 JSON 으로 저장")
+    parser.add_argument("--case", help=argparse.SUPPRESS)    # 자식 프로세스용: backend:intra:inter
+    args = parser.parse_args()
+
+    if args.case:
+        backend, intra, inter = args.case.split(":")
+        results = run_case(backend, int(intra), int(inter), args.concurrency, args.seconds, args.method)
+        print(json.dumps(results))
+        return
+
+    print(f"🖥️ CPU 코어: {os.cpu_count()} | 방식: {args.method} | 세션당 {args.seconds}초 오디오")
+    all_results = []
+    for backend in args.backends:
+        for spec in args.threads:
+            intra, inter = _parse_threads(spec)
+            proc = subprocess.run(
+                [sys.executable, __file__, "--case", f"{backend}:{intra}:{inter}",
+                 "--concurrency", *map(str, args.concurrency),
+                 "--seconds", str(args.seconds), "--method", args.method],
+                cwd=BASE, capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"❌ {backend} {spec} 실패:\n{proc.stderr[-1000:]}")
+                continue
+            all_results.extend(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"\n{'backend':<8}{'threads':>8}{'conc':>6}{'p50 ms':>10}{'p99 ms':>10}{'frames/s':>12}{'x RT':>8}")
+    for row in all_results:
+        print(f"{row['backend']:<8}{row['threads']:>8}{row['concurrency']:>6}"
+              f"{row['frame_ms_p50']:>10.3f}{row['frame_ms_p99']:>10.3f}"
+              f"{row['frames_per_sec']:>12.1f}{row['realtime_x']:>8.1f}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(all_results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+judge_config.py - 판단 서버 / 오프라인 CLI 공용 설정
+config.json 을 읽어 설정 dataclass 로 변환합니다. (main.py, realtimeStream.py 공용)
+"""
+import dataclasses
+import json
+import os
+from pathlib import Path
+
+
+# ========== 설정 클래스 ==========
+@dataclasses.dataclass
+class AudioConfig:
+    """오디오 설정"""
+    SAMPLERATE: int = 16000
+    SILENCE_THRESHOLD: int = 3
+    EXIT_THRESHOLD: int = 10
+    GAIN: float = 3.0
+    VAD_THRESHOLD: float = 0.2
+    WHISPER_MODEL: str = "whisper-1"
+    WHISPER_LANGUAGE: str = "ko"
+    ENDPOINTING: str = "chunk"      # "chunk": 연속 무음 청크 수 | "adaptive": 프레임 VAD 확률 + 무음 길이(ms)
+    MIN_SPEECH_MS: int = 250        # adaptive: 발화 시작으로 인정할 최소 음성 길이
+    MIN_HANG_MS: int = 300          # adaptive: 음성 확률이 급격히 떨어졌을 때의 종료 대기 시간
+    MAX_HANG_MS: int = 800          # adaptive: 기본 종료 대기 시간
+    FAST_DROP: bool = True          # adaptive: 급격한 확률 하락 시 MIN_HANG_MS 적용 여부
+    FAST_DROP_DELTA: float = 0.6    # adaptive: 급격한 하락으로 볼 확률 차이 (직전 음성 평균 - 무음 평균)
+
+
+@dataclasses.dataclass
+class STTConfig:
+    """STT 백엔드 설정"""
+    BACKEND: str = "openai"         # "openai" | "local" | "fake"
+    LOCAL_MODEL: str = "small"      # faster-whisper 모델 크기
+    COMPUTE_TYPE: str = "int8"
+    POOL_SIZE: int = 0              # 0이면 CPU 코어 수에 맞춰 자동
+    CPU_THREADS: int = 2            # 모델 인스턴스당 스레드 수
+    QUEUE_SIZE: int = 8             # 대기 가능한 작업 수
+    QUEUE_TIMEOUT: float = 5.0      # 작업 슬롯 대기 시간(초)
+    FAKE_TEXT: str = ""
+    FAKE_DELAY: float = 0.0
+    PARTIAL_TRANSCRIPTS: bool = False   # 발화 중 중간 전사(partial_text) 사용 여부
+    PARTIAL_INTERVAL: int = 2           # 중간 전사 주기 (Speech 청크 수)
+    WORKERS: int = 0                    # 전용 STT 워커 스레드 수 (0이면 local: pool_size, 그 외: 4)
+    MAX_PENDING: int = 16               # 대기 가능한 STT 작업 수, 넘으면 /ingest-chunk 가 Busy 반환
+
+
+@dataclasses.dataclass
+class SessionConfig:
+    """세션 레지스트리 설정"""
+    CAPACITY: int = 1000            # 최대 동시 세션 수
+    IDLE_TTL: float = 120.0         # 요청이 없으면 만료되는 시간(초)
+    SWEEP_INTERVAL: float = 10.0    # 만료 세션 정리 주기(초)
+
+
+@dataclasses.dataclass
+class ServerConfig:
+    """서버 설정"""
+    HOST: str = "127.0.0.1"
+    # HOST: str = "192.168.0.37"
+    PORT: int = 8000
+    WARMUP: str = "background"          # 모델 로드: "background" (먼저 기동, /ready 로 확인) | "blocking" (로드 후 기동)
+
+
+@dataclasses.dataclass
+class ClusterConfig:
+    """스케일아웃(다중 워커) 설정"""
+    ENABLED: bool = False
+    REGISTRY_PATH: str = "workers.db"   # 프록시와 공유하는 워커 레지스트리 (SQLite)
+    WORKER_ID: str = ""                 # 비어 있으면 "worker-{port}"
+    ADVERTISE_URL: str = ""             # 비어 있으면 "http://{host}:{port}"
+    HEARTBEAT_INTERVAL: float = 5.0
+    WORKER_TTL: float = 15.0
+
+
+@dataclasses.dataclass
+class CORSConfig:
+    """CORS 설정"""
+    ALLOW_ORIGINS: list = dataclasses.field(default_factory=lambda: ["*"])
+    ALLOW_CREDENTIALS: bool = True
+    ALLOW_METHODS: list = dataclasses.field(default_factory=lambda: ["*"])
+    ALLOW_HEADERS: list = dataclasses.field(default_factory=lambda: ["*"])
+
+
+@dataclasses.dataclass
+class PathConfig:
+    """경로 설정"""
+    SESSIONS_DIR: str = "sessions_b"
+    INBOX_DIR: str = "inbox"
+    TEMP_FILE_PREFIX: str = "temp_audio_"
+    ARCHIVE_DIR: str = "audio_data"
+
+
+@dataclasses.dataclass
+class ArchiveConfig:
+    """발화 오디오 아카이브 설정 (archive.py)"""
+    ENABLED: bool = True
+    FORMAT: str = "flac"            # "flac" | "opus" | "wav"
+    BATCH_SIZE: int = 16            # 한 번에 저장할 최대 발화 수
+    FLUSH_INTERVAL: float = 2.0     # 배치 저장 주기(초)
+    MAX_QUEUE: int = 256            # 대기 가능한 발화 수 (넘으면 버림)
+    RETENTION_DAYS: float = 30      # 보존 기간(일), 0이면 제한 없음
+    MAX_TOTAL_MB: int = 1024        # 전체 용량 제한(MB), 0이면 제한 없음
+    RETENTION_INTERVAL: float = 600.0   # 보존 정책 실행 주기(초)
+
+
+@dataclasses.dataclass
+class VADConfig:
+    """VAD 모델 설정"""
+    MONITORING: bool = False
+    BACKEND: str = "jit"                # "jit" (torch JIT) | "onnx" (ONNX Runtime)
+    INTRA_OP_THREADS: int = 1           # 연산 하나에 쓰는 스레드 수 (0이면 라이브러리 기본값 = 코어 수)
+    INTER_OP_THREADS: int = 1           # 연산 간 병렬 스레드 수 (0이면 라이브러리 기본값)
+    ONNX_GRAPH_OPTIMIZATION: str = "all"        # "disable" | "basic" | "extended" | "all"
+    ONNX_EXECUTION_MODE: str = "sequential"     # "sequential" | "parallel"
+    ONNX_SPIN_WAIT: bool = False        # 스레드 busy-wait (지연은 줄지만 유휴 CPU 사용)
+    STREAM_STATE: bool = True           # 적응형 종료 감지에서 세션별 VAD 상태 유지 (False 면 청크마다 초기화)
+
+
+# ========== Config 로더 ==========
+def load_config(config_path: str = "config.json"):
+    """JSON 설정 파일 로드"""
+    config_file = Path(config_path)
+    
+    if config_file.exists():
+        print(f"✅ 설정 파일 로드: {config_path}")
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config_data = json.load(f)
+    else:
+        print(f"⚠️  설정 파일 없음. 기본값 사용: {config_path}")
+        config_data = {}
+    
+    # AudioConfig
+    audio_conf = config_data.get("audio", {})
+    audio_config = AudioConfig(
+        SAMPLERATE=audio_conf.get("samplerate", 16000),
+        SILENCE_THRESHOLD=audio_conf.get("silence_threshold", 3),
+        EXIT_THRESHOLD=audio_conf.get("exit_threshold", 10),
+        GAIN=audio_conf.get("gain", 3.0),
+        VAD_THRESHOLD=audio_conf.get("vad_threshold", 0.2),
+        WHISPER_MODEL=audio_conf.get("whisper_model", "whisper-1"),
+        WHISPER_LANGUAGE=audio_conf.get("whisper_language", "ko"),
+        ENDPOINTING=audio_conf.get("endpointing", "chunk"),
+        MIN_SPEECH_MS=audio_conf.get("min_speech_ms", 250),
+        MIN_HANG_MS=audio_conf.get("min_hang_ms", 300),
+        MAX_HANG_MS=audio_conf.get("max_hang_ms", 800),
+        FAST_DROP=audio_conf.get("fast_drop", True),
+        FAST_DROP_DELTA=audio_conf.get("fast_drop_delta", 0.6)
+    )
+    
+    # STTConfig
+    stt_conf = config_data.get("stt", {})
+    stt_config = STTConfig(
+        BACKEND=stt_conf.get("backend", "openai"),
+        LOCAL_MODEL=stt_conf.get("local_model", "small"),
+        COMPUTE_TYPE=stt_conf.get("compute_type", "int8"),
+        POOL_SIZE=stt_conf.get("pool_size", 0),
+        CPU_THREADS=stt_conf.get("cpu_threads", 2),
+        QUEUE_SIZE=stt_conf.get("queue_size", 8),
+        QUEUE_TIMEOUT=stt_conf.get("queue_timeout", 5.0),
+        FAKE_TEXT=stt_conf.get("fake_text", ""),
+        FAKE_DELAY=stt_conf.get("fake_delay", 0.0),
+        PARTIAL_TRANSCRIPTS=stt_conf.get("partial_transcripts", False),
+        PARTIAL_INTERVAL=stt_conf.get("partial_interval", 2),
+        WORKERS=stt_conf.get("workers", 0),
+        MAX_PENDING=stt_conf.get("max_pending", 16)
+    )
+    
+    # SessionConfig
+    session_conf = config_data.get("sessions", {})
+    session_config = SessionConfig(
+        CAPACITY=session_conf.get("capacity", 1000),
+        IDLE_TTL=session_conf.get("idle_ttl", 120.0),
+        SWEEP_INTERVAL=session_conf.get("sweep_interval", 10.0)
+    )
+    
+    # ServerConfig
+    server_conf = config_data.get("server", {})
+    server_config = ServerConfig(
+        HOST=server_conf.get("host", "127.0.0.1"),
+        PORT=int(os.getenv("JUDGE_PORT", server_conf.get("port", 8000))),
+        WARMUP=server_conf.get("warmup", "background")
+    )
+    
+    # ClusterConfig (같은 config.json 으로 여러 워커를 띄울 수 있도록 워커 ID 는 환경 변수 우선)
+    cluster_conf = config_data.get("cluster", {})
+    cluster_config = ClusterConfig(
+        ENABLED=cluster_conf.get("enabled", False),
+        REGISTRY_PATH=cluster_conf.get("registry_path", "workers.db"),
+        WORKER_ID=os.getenv("JUDGE_WORKER_ID", cluster_conf.get("worker_id", "")),
+        ADVERTISE_URL=cluster_conf.get("advertise_url", ""),
+        HEARTBEAT_INTERVAL=cluster_conf.get("heartbeat_interval", 5.0),
+        WORKER_TTL=cluster_conf.get("worker_ttl", 15.0)
+    )
+    
+    # CORSConfig
+    cors_conf = config_data.get("cors", {})
+    cors_config = CORSConfig(
+        ALLOW_ORIGINS=cors_conf.get("allow_origins", ["*"]),
+        ALLOW_CREDENTIALS=cors_conf.get("allow_credentials", True),
+        ALLOW_METHODS=cors_conf.get("allow_methods", ["*"]),
+        ALLOW_HEADERS=cors_conf.get("allow_headers", ["*"])
+    )
+    
+    # PathConfig
+    path_conf = config_data.get("paths", {})
+    path_config = PathConfig(
+        SESSIONS_DIR=path_conf.get("sessions_dir", "sessions_b"),
+        INBOX_DIR=path_conf.get("inbox_dir", "inbox"),
+        TEMP_FILE_PREFIX=path_conf.get("temp_file_prefix", "temp_audio_"),
+        ARCHIVE_DIR=path_conf.get("archive_dir", "audio_data")
+    )
+    
+    # VADConfig
+    vad_conf = config_data.get("vad", {})
+    vad_config = VADConfig(
+        MONITORING=vad_conf.get("monitoring", False),
+        BACKEND=vad_conf.get("backend", "jit"),
+        INTRA_OP_THREADS=vad_conf.get("intra_op_threads", 1),
+        INTER_OP_THREADS=vad_conf.get("inter_op_threads", 1),
+        ONNX_GRAPH_OPTIMIZATION=vad_conf.get("onnx_graph_optimization", "all"),
+        ONNX_EXECUTION_MODE=vad_conf.get("onnx_execution_mode", "sequential"),
+        ONNX_SPIN_WAIT=vad_conf.get("onnx_spin_wait", False),
+        STREAM_STATE=vad_conf.get("stream_state", True)
+    )
+    
+    # ArchiveConfig
+    archive_conf = config_data.get("archive", {})
+    archive_config = ArchiveConfig(
+        ENABLED=archive_conf.get("enabled", True),
+        FORMAT=archive_conf.get("format", "flac"),
+        BATCH_SIZE=archive_conf.get("batch_size", 16),
+        FLUSH_INTERVAL=archive_conf.get("flush_interval", 2.0),
+        MAX_QUEUE=archive_conf.get("max_queue", 256),
+        RETENTION_DAYS=archive_conf.get("retention_days", 30),
+        MAX_TOTAL_MB=archive_conf.get("max_total_mb", 1024),
+        RETENTION_INTERVAL=archive_conf.get("retention_interval", 600.0)
+    )
+    
+    return (audio_config, stt_config, session_config, server_config,
+            cluster_config, cors_config, path_config, vad_config, archive_config)
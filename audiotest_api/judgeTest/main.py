@@ -2,147 +2,37 @@
 """
 판단 서버 (Judge Server)
 청크를 받아서 VAD 처리하고 status 반환
+
+무거운 라이브러리(torch / silero-vad / librosa / soundfile / openai)와 모델은 import 시점이 아니라
+lifespan 의 warm-up 에서 로드합니다. (server.warmup: "background" 이면 먼저 기동하고 /ready 로 준비 상태 확인)
 """
-import librosa
 
-from uuid import uuid4
 import asyncio
-import dataclasses
-import shutil
-from openai import OpenAI
-import time
-from silero_vad import load_silero_vad, get_speech_timestamps
-import soundfile as sf
-import numpy as np
 import os
+import time
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, UploadFile, Form, Response
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse
 from pathlib import Path
-from typing import Dict
+from typing import Optional
 from fastapi.middleware.cors import CORSMiddleware
-import json
-from collections import deque
 
-active_sessions = deque(maxlen=100)
+from archive import AudioArchive
+from audio_codec import DEFAULT_CODEC, DEFAULT_RATE, UnsupportedCodecError
+from judge_config import load_config
+from session_registry import SessionCapacityError, SessionRegistry
+from streaming_engine import StreamingEngine
+from stt_backend import STTBusyError, create_stt_backend, default_workers
+from stt_executor import STTExecutor
+from worker_registry import InvalidShardError, WorkerRegistry, make_session_id
 
 load_dotenv()
 
-# ========== 설정 클래스 ==========
-@dataclasses.dataclass
-class AudioConfig:
-    """오디오 설정"""
-    SAMPLERATE: int = 16000
-    SILENCE_THRESHOLD: int = 3
-    EXIT_THRESHOLD: int = 10
-    GAIN: float = 3.0
-    VAD_THRESHOLD: float = 0.2
-    WHISPER_MODEL: str = "whisper-1"
-    WHISPER_LANGUAGE: str = "ko"
-
-
-@dataclasses.dataclass
-class ServerConfig:
-    """서버 설정"""
-    HOST: str = "127.0.0.1"
-    # HOST: str = "192.168.0.37"
-    PORT: int = 8000
-
-
-@dataclasses.dataclass
-class CORSConfig:
-    """CORS 설정"""
-    ALLOW_ORIGINS: list = dataclasses.field(default_factory=lambda: ["*"])
-    ALLOW_CREDENTIALS: bool = True
-    ALLOW_METHODS: list = dataclasses.field(default_factory=lambda: ["*"])
-    ALLOW_HEADERS: list = dataclasses.field(default_factory=lambda: ["*"])
-
-
-@dataclasses.dataclass
-class PathConfig:
-    """경로 설정"""
-    SESSIONS_DIR: str = "sessions_b"
-    INBOX_DIR: str = "inbox"
-    TEMP_FILE_PREFIX: str = "temp_audio_"
-
-
-@dataclasses.dataclass
-class VADConfig:
-    """VAD 모델 설정"""
-    MONITORING: bool = False
-
-
-# ========== Config 로더 ==========
-def load_config(config_path: str = "config.json"):
-    """JSON 설정 파일 로드"""
-    config_file = Path(config_path)
-    
-    if config_file.exists():
-        print(f"✅ 설정 파일 로드: {config_path}")
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config_data = json.load(f)
-    else:
-        print(f"⚠️  설정 파일 없음. 기본값 사용: {config_path}")
-        config_data = {}
-    
-    # AudioConfig
-    audio_conf = config_data.get("audio", {})
-    audio_config = AudioConfig(
-        SAMPLERATE=audio_conf.get("samplerate", 16000),
-        SILENCE_THRESHOLD=audio_conf.get("silence_threshold", 3),
-        EXIT_THRESHOLD=audio_conf.get("exit_threshold", 10),
-        GAIN=audio_conf.get("gain", 3.0),
-        VAD_THRESHOLD=audio_conf.get("vad_threshold", 0.2),
-        WHISPER_MODEL=audio_conf.get("whisper_model", "whisper-1"),
-        WHISPER_LANGUAGE=audio_conf.get("whisper_language", "ko")
-    )
-    
-    # ServerConfig
-    server_conf = config_data.get("server", {})
-    server_config = ServerConfig(
-        HOST=server_conf.get("host", "127.0.0.1"),
-        PORT=server_conf.get("port", 8000)
-    )
-    
-    # CORSConfig
-    cors_conf = config_data.get("cors", {})
-    cors_config = CORSConfig(
-        ALLOW_ORIGINS=cors_conf.get("allow_origins", ["*"]),
-        ALLOW_CREDENTIALS=cors_conf.get("allow_credentials", True),
-        ALLOW_METHODS=cors_conf.get("allow_methods", ["*"]),
-        ALLOW_HEADERS=cors_conf.get("allow_headers", ["*"])
-    )
-    
-    # PathConfig
-    path_conf = config_data.get("paths", {})
-    path_config = PathConfig(
-        SESSIONS_DIR=path_conf.get("sessions_dir", "sessions_b"),
-        INBOX_DIR=path_conf.get("inbox_dir", "inbox"),
-        TEMP_FILE_PREFIX=path_conf.get("temp_file_prefix", "temp_audio_")
-    )
-    
-    # VADConfig
-    vad_conf = config_data.get("vad", {})
-    vad_config = VADConfig(
-        MONITORING=vad_conf.get("monitoring", False)
-    )
-    
-    return audio_config, server_config, cors_config, path_config, vad_config
-
-
 # ========== 설정 로드 ==========
-AUDIO_CONFIG, SERVER_CONFIG, CORS_CONFIG, PATH_CONFIG, VAD_CONFIG = load_config()
-
-# FastAPI 앱
-app = FastAPI()
-
-# CORS 설정
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=CORS_CONFIG.ALLOW_ORIGINS,
-    allow_credentials=CORS_CONFIG.ALLOW_CREDENTIALS,
-    allow_methods=CORS_CONFIG.ALLOW_METHODS,
-    allow_headers=CORS_CONFIG.ALLOW_HEADERS,
+(AUDIO_CONFIG, STT_CONFIG, SESSION_CONFIG, SERVER_CONFIG,
+ CLUSTER_CONFIG, CORS_CONFIG, PATH_CONFIG, VAD_CONFIG, ARCHIVE_CONFIG) = load_config(
+    os.getenv("JUDGE_CONFIG", "config.json")
 )
 
 # 경로 설정
@@ -151,245 +41,304 @@ SESS_BASE = BASE / PATH_CONFIG.SESSIONS_DIR
 SESS_BASE.mkdir(exist_ok=True)
 INBOX = BASE / PATH_CONFIG.INBOX_DIR
 INBOX.mkdir(exist_ok=True)
+ARCHIVE_DIR = BASE / PATH_CONFIG.ARCHIVE_DIR
 
-# OpenAI API 키 설정
-api_key = os.getenv("OPENAI_API_KEY", "your-api-key")
-client = OpenAI(api_key=api_key)
-
-
-# ========== VAD 모델 ==========
-class VADModel:
-    """VAD 모델 래퍼 클래스"""
-    def __init__(self, audio_config: AudioConfig, vad_config: VADConfig) -> None:
-        self.model = load_silero_vad()
-        self.SAMPLERATE = audio_config.SAMPLERATE
-        self.VAD_THRESHOLD = audio_config.VAD_THRESHOLD
-        self.monitoring = vad_config.MONITORING
-
-    def get_speech_timestamps(self, audio_data) -> list:
-        """오디오 데이터에서 음성 구간의 타임스탬프를 반환"""
-        if self.monitoring:
-            print(f"[VAD] audio_data type: {type(audio_data)}")
-            print(f"[VAD] audio_data dtype: {audio_data.dtype}")
-            print(f"[VAD] audio_data shape: {audio_data.shape}")
-            print(f"[VAD] audio_data range: [{audio_data.min():.4f}, {audio_data.max():.4f}]")
-  
-        return get_speech_timestamps(
-            audio_data,
-            self.model,
-            threshold=self.VAD_THRESHOLD,
-            sampling_rate=self.SAMPLERATE,
-        )
-
-
-# ========== 음성 활동 감지 ==========
-class _AudioActivityDetection:
-    """음성 활동 감지 클래스"""
-    def __init__(self, audio_config: AudioConfig):
-        self.is_recording = False
-        self.speech_buffer = []
-        self.stop_count = 0
-        self.silence_threshold = audio_config.SILENCE_THRESHOLD
-        self.exit_threshold = audio_config.EXIT_THRESHOLD
-
-    def resetStream(self):
-        """스트림 상태 초기화"""
-        self.is_recording = False
-        self.speech_buffer = []
-        self.stop_count = 0
-        return {"audio": None, "status": "Reset"}
-
-    def __call__(self, speech_detected: list, audio_buffer: np.array) -> dict:
-        """음성 데이터에서 화자 활동을 감지"""
-        has_speech = len(speech_detected) > 0
-        user_status = "Silent"
-        user_audio = None
-        
-        if has_speech:
-            if not self.is_recording:
-                self.is_recording = True
-                self.stop_count = 0
-                self.speech_buffer = []
-                user_status = "Speech"
-                print("🎤 음성 시작")
-            else:
-                user_status = "Speech"
-            
-            self.speech_buffer.append(audio_buffer)
-            
-            if self.stop_count > 0:
-                print(f"음성 재감지 → 무음 카운트 리셋 ({self.stop_count} → 0)")
-                self.stop_count = 0
-            
-        else:  # 무음
-            if self.is_recording:
-                zero_data = np.zeros_like(audio_buffer)
-                self.speech_buffer.append(zero_data)
-                self.stop_count += 1
-                user_status = "Speech"
-                
-                print(f"연속 무음: {self.stop_count}/{self.silence_threshold}")
-                
-                if self.stop_count >= self.silence_threshold:
-                    speech_data = np.concatenate(self.speech_buffer, axis=0)
-                    self.is_recording = False
-                    self.stop_count = 0
-                    self.speech_buffer = []
-                    user_audio = speech_data
-                    user_status = "Finished"
-                    print("✅ 음성 종료")
-                    
-            else:
-                self.stop_count += 1
-                if self.stop_count >= self.exit_threshold:
-                    print(f"❌ 연속 {self.exit_threshold}번 무음으로 시스템 종료")
-                    user_audio = None
-                    user_status = "Error"
-                else:
-                    user_status = "Silent"
-
-        return {"audio": user_audio, "status": user_status}
-
-
-# 세션 상태 및 VAD 모델 초기화
-session_states: Dict[str, _AudioActivityDetection] = {}
-_vad_model = VADModel(AUDIO_CONFIG, VAD_CONFIG)
+# 전용 STT 실행기 (기본 스레드 풀과 분리, 대기열 길이 제한)
+# STT 백엔드(config.json 의 stt.backend)는 warm_up() 에서 생성해 engine.stt_backend 에 지정
+stt_executor = STTExecutor(
+    workers=STT_CONFIG.WORKERS or default_workers(STT_CONFIG),
+    max_pending=STT_CONFIG.MAX_PENDING
+)
 
 
-# ========== 핵심 함수: 오디오 청크 처리 ==========
-async def process_audio_chunk(session_id: str, audio_data, reset: bool = False) -> dict:
-    """실시간 오디오 청취 및 텍스트 변환"""
-    vad_model = _vad_model
-    audio_data = librosa.resample(audio_data, orig_sr=48000, target_sr=16000)
+# ========== 발화 오디오 아카이브 ==========
+# 요청 경로에서는 큐에 넣기만 하고, 압축/저장/보존 정책은 archive.py 의 전용 스레드가 처리
+_audio_archive = AudioArchive(
+    ARCHIVE_DIR,
+    fmt=ARCHIVE_CONFIG.FORMAT,
+    batch_size=ARCHIVE_CONFIG.BATCH_SIZE,
+    flush_interval=ARCHIVE_CONFIG.FLUSH_INTERVAL,
+    max_queue=ARCHIVE_CONFIG.MAX_QUEUE,
+    retention_days=ARCHIVE_CONFIG.RETENTION_DAYS,
+    max_total_bytes=ARCHIVE_CONFIG.MAX_TOTAL_MB * 1024 * 1024,
+    retention_interval=ARCHIVE_CONFIG.RETENTION_INTERVAL
+) if ARCHIVE_CONFIG.ENABLED else None
+
+
+# 세션 레지스트리 및 스트리밍 엔진 초기화
+session_registry = SessionRegistry(
+    capacity=SESSION_CONFIG.CAPACITY,
+    idle_ttl=SESSION_CONFIG.IDLE_TTL
+)
+engine = StreamingEngine(
+    AUDIO_CONFIG, STT_CONFIG, VAD_CONFIG,
+    archive=_audio_archive,
+    executor=stt_executor
+)
 
-    if session_id not in session_states:
-        session_states[session_id] = _AudioActivityDetection(AUDIO_CONFIG)
 
-    event_checker = session_states[session_id]    
-    
-    result_status = None
-    transcript_text = None
+# ========== 모델 warm-up / 준비 상태 ==========
+readiness = {"ready": False, "stage": "starting", "error": None, "warmup_seconds": None}
+
+
+def warm_up():
+    """STT 백엔드 생성 + VAD 모델 로드/첫 추론 (동기, lifespan 에서는 스레드로 실행)"""
+    if engine.ready:
+        return
+    start = time.perf_counter()
+    readiness["stage"] = "stt"
+    stt_backend = create_stt_backend(STT_CONFIG, AUDIO_CONFIG)
+    readiness["stage"] = "vad"
+    engine.warm_up(stt_backend)
+    readiness.update(ready=True, stage="ready", warmup_seconds=round(time.perf_counter() - start, 2))
+    print(f"🔥 모델 준비 완료 ({readiness['warmup_seconds']}초, STT: {stt_backend.name})")
+
+
+# ========== 핵심 함수: 오디오 청크 처리 ==========
+def _session_with_stream(session_id: str):
+    """세션 조회(없으면 등록) + 스트리밍 상태 준비"""
+    session = session_registry.get(session_id) or session_registry.register(session_id)
+    if session.stream is None:
+        session.stream = engine.new_state()
+    return session
+
+
+async def process_audio_chunk(session_id: str, audio_data, reset: bool = False,
+                              samplerate: int = DEFAULT_RATE, borrowed: bool = False) -> dict:
+    """
+    실시간 오디오 청취 및 텍스트 변환
+    samplerate: 클라이언트가 보낸 청크의 샘플레이트
+    borrowed: audio_data 가 세션 재사용 버퍼(engine.decode)의 view 인 경우 True
+    """
+    session = _session_with_stream(session_id)
 
     if reset:
-        result = event_checker.resetStream()
-        return {"status": result["status"], "text": None}
+        return engine.reset(session.stream)
 
-    if audio_data is not None:
-        speech_timestamps = vad_model.get_speech_timestamps(audio_data)
-        result = event_checker(speech_timestamps, audio_data)
-        
-        result_status = result["status"]
-                
-        if result["audio"] is not None:
-            # 임시 파일 이름 생성
-            temp_file_name = f"{PATH_CONFIG.TEMP_FILE_PREFIX}{session_id}_{time.time()}.wav"
-            
-            # 파일 쓰기
-            await asyncio.to_thread(
-                sf.write, 
-                temp_file_name, 
-                result["audio"], 
-                AUDIO_CONFIG.SAMPLERATE
-            )
-            
-            # STT 호출
-            def transcribe_sync():
-                with open(temp_file_name, "rb") as audio_file:
-                    return client.audio.transcriptions.create(
-                        model=AUDIO_CONFIG.WHISPER_MODEL,
-                        file=audio_file,
-                        language=AUDIO_CONFIG.WHISPER_LANGUAGE
-                    )
-
-            response = await asyncio.to_thread(transcribe_sync)
-            transcript_text = response.text
-            
-            # 임시 파일 삭제
-                
-            os.makedirs("audio_data", exist_ok=True)
-            save_path = f"audio_data/{session_id}_{time.time()}.wav"
-            await asyncio.to_thread(shutil.copy, temp_file_name, save_path)            
-            await asyncio.to_thread(os.remove, temp_file_name)
-                        
-            print(f"📝 인식된 텍스트: {transcript_text}")
-
-        elif result["status"] in ["Error", "Speech", "Silent", "Reset"]:
-            transcript_text = None
+    if audio_data is None:
+        return {"status": "silent", "text": None, "partial_text": None}
+
+    result = await engine.process_chunk(session.stream, audio_data, samplerate,
+                                        session_id=session_id, borrowed=borrowed)
+
+    if result["status"] in ["Finished", "Error"]:
+        print(f"세션 {session_id} 발화 버퍼 정리.")
+        engine.end_utterance(session.stream)
+
+    return result
+
+
+# ========== 만료 세션 정리 ==========
+async def _session_sweeper():
+    """유휴 TTL 이 지난 세션을 주기적으로 정리 (버려진 세션의 오디오 버퍼 해제)"""
+    while True:
+        await asyncio.sleep(SESSION_CONFIG.SWEEP_INTERVAL)
+        expired = session_registry.sweep()
+        if expired:
+            print(f"🧹 만료 세션 {expired}개 정리 (남은 세션: {len(session_registry)})")
+
+
+# ========== 스케일아웃: 워커 등록 ==========
+WORKER_ID = CLUSTER_CONFIG.WORKER_ID or f"worker-{SERVER_CONFIG.PORT}"
+WORKER_URL = CLUSTER_CONFIG.ADVERTISE_URL or f"http://{SERVER_CONFIG.HOST}:{SERVER_CONFIG.PORT}"
+worker_registry = (
+    WorkerRegistry(BASE / CLUSTER_CONFIG.REGISTRY_PATH, worker_ttl=CLUSTER_CONFIG.WORKER_TTL)
+    if CLUSTER_CONFIG.ENABLED else None
+)
 
+
+async def _worker_heartbeat():
+    """레지스트리에 주기적으로 살아있음을 기록"""
+    while True:
+        await asyncio.sleep(CLUSTER_CONFIG.HEARTBEAT_INTERVAL)
+        try:
+            await asyncio.to_thread(worker_registry.register, WORKER_ID, WORKER_URL)
+        except Exception as e:
+            print(f"⚠️ 워커 heartbeat 실패: {e}")
+
+
+async def _warm_up_and_register(background_tasks: list):
+    """모델 준비가 끝난 뒤에 워커를 등록 (준비 전 워커로 세션이 라우팅되지 않도록)"""
+    await asyncio.to_thread(warm_up)
+    if worker_registry is None:
+        return
+    await asyncio.to_thread(worker_registry.register, WORKER_ID, WORKER_URL)
+    background_tasks.append(asyncio.create_task(_worker_heartbeat()))
+    print(f"🧩 워커 등록: {WORKER_ID} → {WORKER_URL}")
+
+
+async def _background_warm_up(background_tasks: list):
+    try:
+        await _warm_up_and_register(background_tasks)
+    except Exception as e:
+        readiness.update(stage="failed", error=str(e))
+        print(f"❌ 모델 warm-up 실패: {e}")
+
+
+# ========== 서버 수명 주기 ==========
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = [asyncio.create_task(_session_sweeper())]
+    if SERVER_CONFIG.WARMUP == "blocking":
+        await _warm_up_and_register(background_tasks)
     else:
-        result_status = "silent"
-        transcript_text = None
-        
-    if result_status in ["Finished", "Error"]:
-        print(f"세션 {session_id} 상태 정리.")
-        if session_id in session_states:
-            del session_states[session_id]
-                    
-    return {"status": result_status, "text": transcript_text}
+        background_tasks.append(asyncio.create_task(_background_warm_up(background_tasks)))
+
+    yield
+
+    for task in background_tasks:
+        task.cancel()
+    if worker_registry is not None:
+        worker_registry.unregister(WORKER_ID)
+        print(f"🧩 워커 등록 해제: {WORKER_ID}")
+    # 종료 전에 큐에 남은 발화 오디오를 저장
+    if _audio_archive is not None:
+        await asyncio.to_thread(_audio_archive.flush)
+
+
+# FastAPI 앱
+app = FastAPI(lifespan=lifespan)
+
+# CORS 설정
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=CORS_CONFIG.ALLOW_ORIGINS,
+    allow_credentials=CORS_CONFIG.ALLOW_CREDENTIALS,
+    allow_methods=CORS_CONFIG.ALLOW_METHODS,
+    allow_headers=CORS_CONFIG.ALLOW_HEADERS,
+)
 
 
 # ========== FastAPI 라우트 ==========
+@app.get("/ready")
+def ready():
+    """모델 준비 상태 (준비 전 / 실패 시 503, 로드밸런서 readiness probe 용)"""
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
 @app.post("/start")
-def start():
-    """새 세션 시작 (API 호환성 유지)"""
-    sid = str(uuid4())
-    active_sessions.append(sid)
-    return {"sessionId": sid}
+def start(shard: Optional[str] = None):
+    """새 세션 시작 (스케일아웃 모드에서는 이 워커의 ID 를 샤드 태그로 세션 ID 앞에 붙임)"""
+    if not readiness["ready"]:
+        return JSONResponse({"error": f"Server is not ready ({readiness['stage']})"}, status_code=503)
+    if worker_registry is not None:
+        # 프록시는 ring 으로 고른 worker_id 를 샤드로 넘김, 다른 워커의 샤드면 잘못 라우팅된 요청
+        if shard is not None and shard != WORKER_ID:
+            return JSONResponse({"error": f"shard '{shard}' does not belong to worker '{WORKER_ID}'"}, status_code=400)
+        shard = WORKER_ID
+    try:
+        session = session_registry.register(make_session_id(shard))
+    except InvalidShardError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    except SessionCapacityError as e:
+        print(f"❌ 세션 생성 실패: {e}")
+        return JSONResponse({"error": str(e)}, status_code=503)
+    return {"sessionId": session.session_id}
+
+
+@app.get("/stats")
+def stats():
+    """세션 수 / 버퍼 메모리 사용량 / STT 대기열 조회 (세션 ID 는 노출하지 않음)"""
+    return {
+        "worker_id": WORKER_ID,
+        "ready": readiness["ready"],
+        "stt": stt_executor.stats(),
+        "archive": _audio_archive.stats() if _audio_archive is not None else None,
+        **session_registry.stats()
+    }
+
+
+def _busy_response(detail: str) -> JSONResponse:
+    """STT 대기열이 가득 찼을 때의 명시적 Busy 응답 (클라이언트는 잠시 후 다시 시도)"""
+    return JSONResponse({
+        "status": "Busy",
+        "text": None,
+        "detail": detail
+    }, status_code=503, headers={"Retry-After": "1"})
 
 
 @app.post("/ingest-chunk")
-async def ingest_chunk(
-    sessionId: str = Form(...),
-    chunk: UploadFile = Form(...),
-    mode: str = Form("chunk")  # "chunk" 또는 "file"
-):
-    """청크/파일 수신 → VAD 처리 또는 직접 전사 → 응답 반환"""
+async def ingest_chunk(request: Request):
+    """
+    청크/파일 수신 → VAD 처리 또는 직접 전사 → 응답 반환
+
+    - multipart/form-data: sessionId, chunk, mode("chunk" | "file"), codec, rate (기존 방식, sessionId 는 쿼리로도 가능)
+    - application/octet-stream: 본문이 raw 청크 그대로, sessionId / codec / rate 는 쿼리 파라미터 (fast path)
+      (sessionId 는 X-Session-Id 헤더로도 전달 가능, 청크 모드만 지원)
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/octet-stream"):
+        params = request.query_params
+        session_id = params.get("sessionId") or request.headers.get("X-Session-Id")
+        mode, filename = "chunk", None
+        codec = params.get("codec", DEFAULT_CODEC)
+        rate = params.get("rate", DEFAULT_RATE)
+        read_chunk = request.body
+    else:
+        form = await request.form()
+        chunk = form.get("chunk")
+        session_id = form.get("sessionId") or request.query_params.get("sessionId")
+        mode = form.get("mode", "chunk")
+        filename = getattr(chunk, "filename", None)
+        codec = form.get("codec", DEFAULT_CODEC)
+        rate = form.get("rate", DEFAULT_RATE)
+        # 파일 없이 문자열 필드로 온 chunk 는 읽을 수 없으므로 잘못된 요청으로 처리
+        read_chunk = chunk.read if hasattr(chunk, "read") else None
+
     #함수 시작전에 무조껀 session ID 중복검사를 중복이면 에러로 반환함
-    if sessionId not in active_sessions:
+    session = session_registry.get(session_id) if session_id else None
+    if session is None or read_chunk is None:
         return JSONResponse({
             "status": "Error",
             "text": None,
-            "detail": "Invalid sessionId. Call /start first."
+            "detail": "Invalid sessionId. Call /start first." if session is None
+                      else "chunk must be sent as a file part (or raw application/octet-stream body)."
         }, status_code=400)    
+
+    # 승인 제어: 파일 모드는 바로 STT 를 쓰므로 대기열이 가득 찼으면 본문을 읽기 전에 Busy 반환
+    # (청크 모드는 VAD 를 계속 처리하고, 발화를 확정할 때만 자리를 확보 → 실패하면 "Busy" 상태로 버퍼 유지)
+    if mode == "file" and stt_executor.busy:
+        print(f"⏳ STT 대기열 초과, Busy 반환 (대기 {stt_executor.pending}/{stt_executor.max_pending})")
+        return _busy_response("STT queue is full. Retry later.")
     
     try:
-        chunk_data = await chunk.read()
-        print(f"📥 [판단] 세션: {sessionId[:8]}... | 모드: {mode} | 크기: {len(chunk_data)} bytes")
+        rate = int(rate)
+    except (TypeError, ValueError):
+        return JSONResponse({
+            "status": "Error",
+            "text": None,
+            "detail": f"Invalid rate: {rate}"
+        }, status_code=400)
+    
+    try:
+        chunk_data = await read_chunk()
+        print(f"📥 [판단] 세션: {session_id[:8]}... | 모드: {mode} | 크기: {len(chunk_data)} bytes | {codec}@{rate}")
         
         # ========== 파일 모드: 바로 Whisper 전사 ==========
         if mode == "file":
-            temp_path = f"{PATH_CONFIG.TEMP_FILE_PREFIX}{sessionId}_{time.time()}.wav"
-            
-            with open(temp_path, "wb") as f:
-                f.write(chunk_data)
-            
-            def transcribe_sync():
-                with open(temp_path, "rb") as audio_file:
-                    return client.audio.transcriptions.create(
-                        model=AUDIO_CONFIG.WHISPER_MODEL,
-                        file=audio_file,
-                        language=AUDIO_CONFIG.WHISPER_LANGUAGE
-                    )
-            
-            response = await asyncio.to_thread(transcribe_sync)
-            await asyncio.to_thread(os.remove, temp_path)
-            
-            print(f"📝 [파일모드] 인식된 텍스트: {response.text}")
+            text = await stt_executor.run(
+                engine.stt_backend.transcribe_file,
+                chunk_data,
+                filename or "speech.wav"
+            )
+
+            print(f"📝 [파일모드] 인식된 텍스트: {text}")
             
             return JSONResponse({
                 "status": "Finished",
-                "text": response.text
+                "text": text
             }, status_code=200)
         
         # ========== 청크 모드: VAD 처리 ==========
         else:
-            audio_array = np.frombuffer(chunk_data, dtype=np.int16)
-            audio_data = audio_array.astype(np.float32) / 32768.0
+            # int16 → float32 → gain 을 한 번에 세션 재사용 버퍼로 디코딩
+            stream = _session_with_stream(session_id).stream
+            audio_data = engine.decode(stream, chunk_data, codec, AUDIO_CONFIG.GAIN)
             
-            print(f"🔄 [판단] 샘플 수: {len(audio_data)} | 범위: [{audio_data.min():.3f}, {audio_data.max():.3f}]")
+            if VAD_CONFIG.MONITORING:
+                print(f"🔄 [판단] 샘플 수: {len(audio_data)} | 범위: [{audio_data.min():.3f}, {audio_data.max():.3f}]")
             
-            audio_data = audio_data * AUDIO_CONFIG.GAIN
-            result = await process_audio_chunk(sessionId, audio_data)
+            result = await process_audio_chunk(session_id, audio_data, samplerate=rate, borrowed=True)
             
             print(f"🎯 [판단] VAD 결과: {result['status']}")
             
@@ -401,7 +350,8 @@ async def ingest_chunk(
             elif result["status"] == "Speech":
                 return JSONResponse({
                     "status": "Speech",
-                    "text": None
+                    "text": None,
+                    "partial_text": result["partial_text"]
                 }, status_code=200)
             
             elif result["status"] == "Finished":
@@ -409,6 +359,10 @@ async def ingest_chunk(
                     "status": "Finished",
                     "text": result["text"]
                 }, status_code=200)
+
+            elif result["status"] == "Busy":
+                # 발화 버퍼는 세션에 남아 있음, 클라이언트는 이 청크를 다시 보내지 않고 다음 청크를 이어서 전송
+                return _busy_response("STT queue is full. Utterance is kept; keep sending chunks.")
             
             else: #Silent
                 return JSONResponse({
@@ -416,6 +370,23 @@ async def ingest_chunk(
                     "text": None
                 }, status_code=200)
 
+    except UnsupportedCodecError as e:
+        print(f"❌ 청크 디코딩 실패: {str(e)}")
+        return JSONResponse({
+            "status": "Error",
+            "text": None,
+            "detail": str(e)
+        }, status_code=400)
+
+    except STTBusyError as e:
+        print(f"⏳ STT 작업 대기열 초과: {str(e)}")
+        return _busy_response(str(e))
+
+    except SessionCapacityError as e:
+        # 만료 정리된 세션을 다시 등록하려는데 동시 세션 수가 가득 찬 경우
+        print(f"❌ 세션 재등록 실패: {str(e)}")
+        return _busy_response(str(e))
+
     except Exception as e:
         print(f"❌ 에러: {str(e)}")
         import traceback
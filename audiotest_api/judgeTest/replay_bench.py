@@ -0,0 +1,376 @@
+"""
+replay_bench.py - 판단 서버 오프라인 리플레이 벤치마크
+
+audio_data/ 의 실제 발화 WAV 를 동시 세션으로 흘려보내 오디오 경로의 성능을 측정합니다.
+- inproc 모드: Fake STT 로 main.process_audio_chunk 를 직접 호출 (네트워크 없음)
+- http 모드:   이미 떠 있는 판단 서버의 /start, /ingest-chunk 로 전송
+
+측정 항목:
+    VAD CPU / 청크 (inproc 만), 발화 종료 감지 지연, chunks/sec, 응답 지연 p50 / p99
+
+실행 예:
+    python replay_bench.py --sessions 20 --speed 0
+    python replay_bench.py --sessions 8 --speed 1 --codec mulaw --rate 16000
+    python replay_bench.py --mode http --url http://127.0.0.1:8000 --sessions 10
+    python replay_bench.py --save baseline.json
+    python replay_bench.py --compare baseline.json --tolerance 0.2   # 회귀 시 exit 1
+
+발화 종료 감지 방식 비교 (청크 기준 vs 적응형):
+    python replay_bench.py --endpointing chunk --save chunk.json
+    python replay_bench.py --endpointing adaptive --save adaptive.json
+
+세션별 VAD 상태 유지 전/후 발화 종료 감지 지연 비교:
+    python replay_bench.py --endpointing adaptive --vad-state stateless --save before.json
+    python replay_bench.py --endpointing adaptive --vad-state session --compare before.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+BASE = Path(__file__).parent
+sys.path.insert(0, str(BASE))
+
+from audio_codec import decode_chunk, mulaw_encode  # noqa: E402
+
+CHUNK_SECONDS = 0.5
+TRAILING_SILENCE_SECONDS = 3.0
+REFERENCE_SAMPLERATE = 16000
+
+# 회귀 비교 대상 지표 (값이 클수록 나쁨)
+GATED_METRICS = ("latency_p50_ms", "latency_p99_ms", "vad_cpu_per_chunk_ms", "eos_delay_p99_ms")
+# baseline 비교 시 전/후 값을 함께 출력할 지표
+COMPARED_METRICS = ("eos_delay_p50_ms", "eos_delay_p99_ms", "eos_delay_max_ms", "finished") + GATED_METRICS[:3]
+
+
+# ========== 입력 준비 ==========
+class Utterance:
+    """
+    리플레이할 발화 하나
+
+    Attributes:
+        name: 파일 이름
+        chunks: 브라우저와 같은 형식의 0.5초 청크 바이트 목록 (뒤에 무음 포함)
+        speech_end: 오프라인 VAD 기준 마지막 음성 끝 시각(초), 음성이 없으면 None
+    """
+    def __init__(self, name: str, chunks: list, speech_end):
+        self.name = name
+        self.chunks = chunks
+        self.speech_end = speech_end
+
+
+def load_utterances(paths: list, rate: int, codec: str, reference_vad=None) -> list:
+    """WAV 파일을 클라이언트 청크로 변환하고, reference_vad 가 있으면 실제 발화 끝 시각을 계산"""
+    utterances = []
+    for path in paths:
+        audio, sr = sf.read(path, dtype="float32")
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+
+        speech_end = None
+        if reference_vad is not None:
+            reference = librosa.resample(audio, orig_sr=sr, target_sr=REFERENCE_SAMPLERATE)
+            timestamps = reference_vad(reference)
+            if timestamps:
+                speech_end = timestamps[-1]["end"] / REFERENCE_SAMPLERATE
+
+        audio = librosa.resample(audio, orig_sr=sr, target_sr=rate)
+        audio = np.concatenate([audio, np.zeros(int(rate * TRAILING_SILENCE_SECONDS), dtype=np.float32)])
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        if codec == "mulaw":
+            pcm = mulaw_encode(pcm)
+
+        chunk_size = int(rate * CHUNK_SECONDS)
+        chunks = [pcm[i:i + chunk_size].tobytes() for i in range(0, len(pcm), chunk_size)]
+        utterances.append(Utterance(path.name, chunks, speech_end))
+    return utterances
+
+
+# ========== 전송 대상 ==========
+class InProcessTarget:
+    """main.process_audio_chunk 를 직접 호출 (Fake STT, 임시 아카이브 디렉토리)"""
+    name = "inproc"
+
+    def __init__(self, stt_delay: float, endpointing: str = None, vad_state: str = None):
+        tmp_dir = tempfile.mkdtemp(prefix="judge_bench_")
+        with open(BASE / "config.json", "r", encoding="utf-8") as f:
+            config_data = json.load(f)
+        config_data["stt"] = {"backend": "fake", "fake_delay": stt_delay}
+        if endpointing:
+            config_data.setdefault("audio", {})["endpointing"] = endpointing
+        if vad_state:
+            config_data.setdefault("vad", {})["stream_state"] = vad_state == "session"
+        config_data.setdefault("paths", {})["archive_dir"] = str(Path(tmp_dir) / "audio_data")
+        config_path = Path(tmp_dir) / "config.json"
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump(config_data, f, ensure_ascii=False)
+        os.environ["JUDGE_CONFIG"] = str(config_path)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            import main
+            main.warm_up()  # lifespan 을 거치지 않으므로 모델 로드를 직접 실행
+        self.main = main
+        self.vad_cpu = []
+        self._instrument_vad()
+
+    def _instrument_vad(self):
+        """VAD 호출마다 CPU 시간 기록 (구간 검출 / 프레임 확률)"""
+        vad_model = self.main.engine.vad
+        self.reference_vad = vad_model.get_speech_timestamps
+
+        def timed(original):
+            def wrapper(*args, **kwargs):
+                started = time.process_time()
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    self.vad_cpu.append(time.process_time() - started)
+            return wrapper
+
+        vad_model.get_speech_timestamps = timed(vad_model.get_speech_timestamps)
+        vad_model.frame_probabilities = timed(vad_model.frame_probabilities)
+
+    async def start(self) -> str:
+        return self.main.session_registry.register(self.main.make_session_id()).session_id
+
+    async def send(self, session_id: str, chunk: bytes, codec: str, rate: int) -> str:
+        audio_data = decode_chunk(chunk, codec) * self.main.AUDIO_CONFIG.GAIN
+        result = await self.main.process_audio_chunk(session_id, audio_data, samplerate=rate)
+        return result["status"]
+
+    async def close(self):
+        """인프로세스 모드는 정리할 연결이 없음"""
+
+
+class HTTPTarget:
+    """실행 중인 판단 서버(또는 프록시)로 전송"""
+    name = "http"
+
+    def __init__(self, url: str):
+        import httpx
+
+        self.url = url.rstrip("/")
+        self.client = httpx.AsyncClient(timeout=30.0)
+        self.vad_cpu = []
+        self.reference_vad = None
+
+    async def start(self) -> str:
+        resp = await self.client.post(f"{self.url}/start")
+        resp.raise_for_status()
+        return resp.json()["sessionId"]
+
+    async def send(self, session_id: str, chunk: bytes, codec: str, rate: int) -> str:
+        resp = await self.client.post(
+            f"{self.url}/ingest-chunk",
+            data={"sessionId": session_id, "mode": "chunk", "codec": codec, "rate": str(rate)},
+            files={"chunk": ("chunk.raw", chunk, "application/octet-stream")},
+        )
+        return resp.json().get("status", "Error")
+
+    async def close(self):
+        await self.client.aclose()
+
+
+# ========== 리플레이 ==========
+class SessionResult:
+    """세션 하나의 리플레이 결과"""
+    def __init__(self, utterance: Utterance):
+        self.utterance = utterance
+        self.latencies = []
+        self.final_status = None
+        self.finished_at_audio = None   # Finished 를 받은 청크의 끝 시각(오디오 기준, 초)
+
+    @property
+    def eos_delay(self):
+        """발화 종료 감지 지연 (오디오 시간 기준, 초)"""
+        if self.finished_at_audio is None or self.utterance.speech_end is None:
+            return None
+        return self.finished_at_audio - self.utterance.speech_end
+
+
+async def replay_session(target, utterance: Utterance, speed: float, codec: str, rate: int,
+                         start_offset: float) -> SessionResult:
+    """세션 하나를 청크 단위로 재생 (speed=1 실시간, speed=0 최대 속도)"""
+    result = SessionResult(utterance)
+    if speed > 0:
+        await asyncio.sleep(start_offset / speed)
+
+    session_id = await target.start()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    for index, chunk in enumerate(utterance.chunks):
+        if speed > 0:
+            due = started + index * CHUNK_SECONDS / speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        sent = time.perf_counter()
+        status = await target.send(session_id, chunk, codec, rate)
+        result.latencies.append(time.perf_counter() - sent)
+        result.final_status = status
+
+        if status == "Finished":
+            result.finished_at_audio = (index + 1) * CHUNK_SECONDS
+            break
+        if status == "Error":
+            break
+    return result
+
+
+def _percentile(values: list, q: float):
+    return float(np.percentile(values, q)) if values else None
+
+
+def _ms(value):
+    return None if value is None else round(value * 1000, 2)
+
+
+def summarize(results: list, vad_cpu: list, wall_seconds: float) -> dict:
+    """세션 결과를 지표로 요약"""
+    latencies = [latency for r in results for latency in r.latencies]
+    eos_delays = [r.eos_delay for r in results if r.eos_delay is not None]
+    return {
+        "sessions": len(results),
+        "finished": sum(1 for r in results if r.final_status == "Finished"),
+        "chunks": len(latencies),
+        "wall_seconds": round(wall_seconds, 3),
+        "chunks_per_sec": round(len(latencies) / wall_seconds, 1) if wall_seconds > 0 else None,
+        "latency_p50_ms": _ms(_percentile(latencies, 50)),
+        "latency_p99_ms": _ms(_percentile(latencies, 99)),
+        "vad_cpu_per_chunk_ms": _ms(float(np.mean(vad_cpu)) if vad_cpu else None),
+        "vad_cpu_p99_ms": _ms(_percentile(vad_cpu, 99)),
+        "eos_delay_p50_ms": _ms(_percentile(eos_delays, 50)),
+        "eos_delay_p99_ms": _ms(_percentile(eos_delays, 99)),
+        "eos_delay_max_ms": _ms(max(eos_delays) if eos_delays else None),
+    }
+
+
+async def run_bench(target, utterances: list, sessions: int, speed: float, codec: str, rate: int,
+                    quiet: bool = True) -> dict:
+    """동시 세션 리플레이 실행 후 요약 반환"""
+    rng = random.Random(0)
+    plan = [(utterances[i % len(utterances)], rng.uniform(0, CHUNK_SECONDS)) for i in range(sessions)]
+
+    target.vad_cpu.clear()
+    output = io.StringIO() if quiet else sys.stdout
+    with contextlib.redirect_stdout(output):
+        started = time.perf_counter()
+        results = await asyncio.gather(*[
+            replay_session(target, utterance, speed, codec, rate, offset)
+            for utterance, offset in plan
+        ])
+        wall_seconds = time.perf_counter() - started
+    await target.close()
+
+    return summarize(results, target.vad_cpu, wall_seconds)
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """baseline 대비 tolerance 이상 나빠진 지표 목록"""
+    regressions = []
+    for metric in GATED_METRICS:
+        old, new = baseline.get(metric), report.get(metric)
+        if old is None or new is None or old <= 0:
+            continue
+        if new > old * (1 + tolerance):
+            regressions.append(f"{metric}: {old} → {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def _print_report(report: dict):
+    print("\n" + "=" * 60)
+    print("📊 리플레이 벤치마크 결과")
+    print("=" * 60)
+    for key, value in report.items():
+        print(f"  {key:<24}{value}")
+
+
+def _print_comparison(report: dict, baseline: dict):
+    """baseline(전) 대비 현재(후) 지표 출력"""
+    print("\n" + "=" * 60)
+    print("🔁 baseline 대비 (전 → 후)")
+    print("=" * 60)
+    for metric in COMPARED_METRICS:
+        old, new = baseline.get(metric), report.get(metric)
+        if old is None and new is None:
+            continue
+        change = f"  ({new - old:+.2f})" if isinstance(old, (int, float)) and isinstance(new, (int, float)) else ""
+        print(f"  {metric:<24}{old} → {new}{change}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="판단 서버 오프라인 리플레이 벤치마크")
+    parser.add_argument("--mode", choices=["inproc", "http"], default="inproc")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="http 모드 대상 서버")
+    parser.add_argument("--files", default=str(BASE / "audio_data" / "*.wav"), help="리플레이할 WAV glob")
+    parser.add_argument("--limit", type=int, default=0, help="사용할 파일 수 (0이면 전체)")
+    parser.add_argument("--sessions", type=int, default=10, help="동시 세션 수")
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 속도 배수 (0이면 대기 없이 최대 속도)")
+    parser.add_argument("--codec", choices=["pcm_s16le", "mulaw"], default="pcm_s16le")
+    parser.add_argument("--rate", type=int, default=48000, help="클라이언트 전송 샘플레이트")
+    parser.add_argument("--endpointing", choices=["chunk", "adaptive"],
+                        help="발화 종료 감지 방식 (inproc 모드, 기본: config.json)")
+    parser.add_argument("--vad-state", choices=["session", "stateless"],
+                        help="적응형 종료 감지의 VAD 상태: 세션별 유지 / 청크마다 초기화 (inproc 모드, 기본: config.json)")
+    parser.add_argument("--stt-delay", type=float, default=0.0, help="Fake STT 지연(초), inproc 모드")
+    parser.add_argument("--verbose", action="store_true", help="서버 로그 출력")
+    parser.add_argument("--save", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 baseline JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="회귀 판정 허용 비율")
+    args = parser.parse_args()
+
+    pattern = Path(args.files)
+    paths = sorted(pattern.parent.glob(pattern.name))
+    if args.limit:
+        paths = paths[:args.limit]
+    if not paths:
+        print(f"❌ 리플레이할 파일이 없습니다: {args.files}")
+        sys.exit(1)
+
+    target = InProcessTarget(args.stt_delay, args.endpointing, args.vad_state) if args.mode == "inproc" else HTTPTarget(args.url)
+    print(f"🎧 파일 {len(paths)}개 로드 중... ({args.codec}@{args.rate})")
+    utterances = load_utterances(paths, args.rate, args.codec, target.reference_vad)
+
+    print(f"🚀 {target.name} | 세션 {args.sessions}개 | 속도 x{args.speed or '∞'}")
+    report = asyncio.run(run_bench(
+        target, utterances, args.sessions, args.speed, args.codec, args.rate, quiet=not args.verbose
+    ))
+    if args.mode == "inproc":
+        report["endpointing"] = target.main.AUDIO_CONFIG.ENDPOINTING
+        report["vad_state"] = "session" if target.main.VAD_CONFIG.STREAM_STATE else "stateless"
+    report.update({"mode": target.name, "speed": args.speed, "codec": args.codec, "rate": args.rate})
+    _print_report(report)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 저장: {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        _print_comparison(report, baseline)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("❌ 성능 회귀:")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print(f"✅ baseline 대비 회귀 없음 (허용 {args.tolerance * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,125 @@
+"""
+session_registry.py - 판단 서버 세션 레지스트리
+세션 ID → 세션 상태를 dict 로 관리 (O(1) 조회), 유휴 TTL 만료와 세션별 메모리 사용량 집계를 담당
+"""
+import time
+from typing import Dict, Optional
+from uuid import uuid4
+
+
+class SessionCapacityError(Exception):
+    """동시 세션 수가 capacity 에 도달해 새 세션을 만들 수 없는 상태"""
+
+
+class SessionEntry:
+    """
+    세션 하나의 상태
+
+    Attributes:
+        session_id: 세션 ID
+        created_at: 생성 시각 (time.time)
+        last_seen: 마지막 요청 시각 (time.monotonic)
+        stream: 스트리밍 상태 (streaming_engine.StreamState, 발화 종료 후 None)
+    """
+    __slots__ = ("session_id", "created_at", "last_seen", "stream")
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.created_at = time.time()
+        self.last_seen = time.monotonic()
+        self.stream = None
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def release_buffers(self):
+        """발화 버퍼 해제 (세션은 유지)"""
+        self.stream = None
+
+    @property
+    def buffered_bytes(self) -> int:
+        """현재 세션이 잡고 있는 오디오 버퍼 크기 (bytes)"""
+        if self.stream is None:
+            return 0
+        return self.stream.buffered_bytes
+
+
+class SessionRegistry:
+    """
+    세션 레지스트리
+
+    - capacity 를 넘으면 기존 세션을 조용히 밀어내지 않고 SessionCapacityError 를 발생시킵니다.
+    - idle_ttl 초 동안 요청이 없는 세션은 sweep() 에서 제거됩니다.
+    """
+    def __init__(self, capacity: int = 1000, idle_ttl: float = 120.0):
+        self.capacity = capacity
+        self.idle_ttl = idle_ttl
+        self._sessions: Dict[str, SessionEntry] = {}
+        self.created_total = 0
+        self.expired_total = 0
+        self.rejected_total = 0
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def register(self, session_id: Optional[str] = None) -> SessionEntry:
+        """새 세션 등록 (session_id 를 주지 않으면 uuid4 로 생성)"""
+        if len(self._sessions) >= self.capacity:
+            # 만료된 세션부터 정리한 뒤 다시 확인
+            self.sweep()
+            if len(self._sessions) >= self.capacity:
+                self.rejected_total += 1
+                raise SessionCapacityError(f"동시 세션 수 초과 (capacity={self.capacity})")
+
+        entry = SessionEntry(session_id or str(uuid4()))
+        self._sessions[entry.session_id] = entry
+        self.created_total += 1
+        return entry
+
+    def get(self, session_id: str) -> Optional[SessionEntry]:
+        """세션 조회 + last_seen 갱신 (없으면 None)"""
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            entry.touch()
+        return entry
+
+    def remove(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def sweep(self) -> int:
+        """유휴 TTL 이 지난 세션 제거, 제거한 수 반환"""
+        deadline = time.monotonic() - self.idle_ttl
+        expired = [sid for sid, entry in self._sessions.items() if entry.last_seen < deadline]
+        for sid in expired:
+            del self._sessions[sid]
+        self.expired_total += len(expired)
+        return len(expired)
+
+    def stats(self) -> dict:
+        """
+        세션 수 / 메모리 사용량 통계
+        세션 ID 는 /ingest-chunk 의 유일한 인증 수단이므로 노출하지 않고 개수와 경과 시간만 집계합니다.
+        """
+        now_monotonic = time.monotonic()
+        now = time.time()
+        idle = [now_monotonic - entry.last_seen for entry in self._sessions.values()]
+        ages = [now - entry.created_at for entry in self._sessions.values()]
+        return {
+            "active_sessions": len(self._sessions),
+            "recording_sessions": sum(
+                1 for entry in self._sessions.values()
+                if entry.stream is not None and entry.stream.is_recording
+            ),
+            "capacity": self.capacity,
+            "idle_ttl": self.idle_ttl,
+            "buffered_bytes": sum(entry.buffered_bytes for entry in self._sessions.values()),
+            "idle_seconds_max": round(max(idle), 1) if idle else None,
+            "age_seconds_max": round(max(ages), 1) if ages else None,
+            "age_seconds_avg": round(sum(ages) / len(ages), 1) if ages else None,
+            "created_total": self.created_total,
+            "expired_total": self.expired_total,
+            "rejected_total": self.rejected_total,
+        }
@@ -0,0 +1,757 @@
+"""
+streaming_engine.py - 판단 서버 스트리밍 엔진
+VAD + 음성 활동 감지 + 리샘플링 + STT 를 하나로 묶은 엔진 (HTTP 서버와 오프라인 CLI 공용)
+
+- 세션 상태는 StreamState 객체 하나에 담기므로 여러 세션을 동시에 처리해도 서로 섞이지 않습니다.
+- 비동기 API: StreamingEngine.process_chunk()  (main.py, STT 는 asyncio.to_thread)
+- 동기 API:   StreamingEngine.process_chunk_sync(), replay_file()  (realtimeStream.py, 벤치마크)
+- torch / silero-vad 는 처음 VAD 를 쓸 때(또는 warm_up) 로드하므로 모듈 import 는 가볍습니다.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from audio_codec import DEFAULT_RATE, decode_into, to_samplerate
+from judge_config import AudioConfig, STTConfig, VADConfig
+from stt_backend import STTBackend
+from stt_executor import PRIORITY_FINAL, PRIORITY_PARTIAL, STTExecutor
+
+VAD_FRAME_SAMPLES = 512     # Silero VAD 프레임 크기 (16kHz 기준 32ms)
+VAD_BACKENDS = ("jit", "onnx")
+
+_torch_threads_configured = False
+
+
+def _configure_torch_threads(intra_op: int, inter_op: int):
+    """torch 스레드 수 설정 (프로세스 전역, 한 번만 적용)"""
+    global _torch_threads_configured
+    if _torch_threads_configured:
+        return
+    import torch
+
+    if intra_op:
+        torch.set_num_threads(intra_op)
+    if inter_op:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError as e:
+            # 이미 병렬 연산이 실행된 뒤에는 바꿀 수 없음
+            print(f"⚠️ torch inter-op 스레드 설정 실패: {e}")
+    _torch_threads_configured = True
+
+
+def _onnx_session_options(vad_config: VADConfig):
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    if vad_config.INTRA_OP_THREADS:
+        options.intra_op_num_threads = vad_config.INTRA_OP_THREADS
+    if vad_config.INTER_OP_THREADS:
+        options.inter_op_num_threads = vad_config.INTER_OP_THREADS
+    options.graph_optimization_level = {
+        "disable": onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }[vad_config.ONNX_GRAPH_OPTIMIZATION]
+    options.execution_mode = (
+        onnxruntime.ExecutionMode.ORT_PARALLEL
+        if vad_config.ONNX_EXECUTION_MODE == "parallel"
+        else onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    )
+    spin = "1" if vad_config.ONNX_SPIN_WAIT else "0"
+    options.add_session_config_entry("session.intra_op.allow_spinning", spin)
+    options.add_session_config_entry("session.inter_op.allow_spinning", spin)
+    return options
+
+
+# ========== VAD 모델 ==========
+class VADStream:
+    """
+    세션별 Silero VAD 스트리밍 상태 (모델은 모든 세션이 공유하므로 호출 전후로 교체)
+
+    Attributes:
+        model_state: 모델 내부 상태 (RNN state, context, last_sr, last_batch_size), 없으면 처음부터 시작
+        remainder: 프레임(512 샘플)을 채우지 못하고 다음 청크로 넘긴 샘플
+    """
+    __slots__ = ("model_state", "remainder")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.model_state = None
+        self.remainder = np.zeros(0, dtype=np.float32)
+
+
+class VADModel:
+    """
+    VAD 모델 래퍼 클래스 (모델은 처음 사용할 때 로드)
+
+    backend:
+        jit:  silero-vad torch JIT 모델 (torch 스레드 수는 프로세스 전역 설정)
+        onnx: silero-vad ONNX 모델을 설정한 SessionOptions 로 ONNX Runtime 에서 실행
+    """
+    def __init__(self, audio_config: AudioConfig, vad_config: VADConfig) -> None:
+        if vad_config.BACKEND not in VAD_BACKENDS:
+            raise ValueError(f"지원하지 않는 VAD 백엔드: {vad_config.BACKEND} (지원: {', '.join(VAD_BACKENDS)})")
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._state_lock = threading.Lock()    # 공유 모델의 내부 상태(RNN state)를 쓰는 추론 구간
+        self.vad_config = vad_config
+        self.backend = vad_config.BACKEND
+        self.SAMPLERATE = audio_config.SAMPLERATE
+        self.VAD_THRESHOLD = audio_config.VAD_THRESHOLD
+        self.monitoring = vad_config.MONITORING
+
+    def _load(self):
+        from silero_vad import load_silero_vad
+
+        config = self.vad_config
+        # get_speech_timestamps / 프레임 확률 계산의 torch 연산은 두 백엔드 모두 사용
+        _configure_torch_threads(config.INTRA_OP_THREADS, config.INTER_OP_THREADS)
+        if self.backend == "jit":
+            return load_silero_vad()
+
+        import onnxruntime
+        from importlib import resources
+
+        model = load_silero_vad(onnx=True)
+        # silero-vad 기본 세션(스레드 1/1 고정)을 설정값으로 만든 세션으로 교체
+        model_path = str(resources.files("silero_vad.data").joinpath("silero_vad.onnx"))
+        model.session = onnxruntime.InferenceSession(
+            model_path,
+            sess_options=_onnx_session_options(config),
+            providers=["CPUExecutionProvider"],
+        )
+        return model
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    self._model = self._load()
+                    print(f"🧠 VAD 모델 로드: {self.backend} "
+                          f"(intra {self.vad_config.INTRA_OP_THREADS}, inter {self.vad_config.INTER_OP_THREADS})")
+        return self._model
+
+    def get_speech_timestamps(self, audio_data) -> list:
+        """오디오 데이터에서 음성 구간의 타임스탬프를 반환"""
+        if self.monitoring:
+            print(f"[VAD] audio_data type: {type(audio_data)}")
+            print(f"[VAD] audio_data dtype: {audio_data.dtype}")
+            print(f"[VAD] audio_data shape: {audio_data.shape}")
+            print(f"[VAD] audio_data range: [{audio_data.min():.4f}, {audio_data.max():.4f}]")
+  
+        from silero_vad import get_speech_timestamps
+
+        model = self.model
+        with self._state_lock:
+            return get_speech_timestamps(
+                audio_data,
+                model,
+                threshold=self.VAD_THRESHOLD,
+                sampling_rate=self.SAMPLERATE,
+            )
+
+    def frame_probabilities(self, audio_data, stream: Optional[VADStream] = None) -> np.ndarray:
+        """
+        오디오를 32ms 프레임으로 나눠 프레임별 음성 확률을 반환 (적응형 종료 감지용)
+
+        stream 이 있으면 세션의 VAD 상태를 이어서 추론하고, 프레임을 채우지 못한 뒤쪽 샘플은 다음 청크로 넘깁니다.
+        없으면 청크마다 상태를 초기화합니다. (warm-up, 비교용)
+        """
+        if stream is not None:
+            return self._stream_probabilities(audio_data, stream)
+
+        import torch
+
+        audio = torch.from_numpy(np.ascontiguousarray(audio_data, dtype=np.float32))
+        model = self.model
+        with self._state_lock, torch.no_grad():
+            if hasattr(model, "audio_forward"):
+                probs = model.audio_forward(audio, self.SAMPLERATE)
+                return probs.squeeze(0).numpy()
+
+            model.reset_states()
+            probs = []
+            for start in range(0, len(audio), VAD_FRAME_SAMPLES):
+                frame = audio[start:start + VAD_FRAME_SAMPLES]
+                if len(frame) < VAD_FRAME_SAMPLES:
+                    frame = torch.nn.functional.pad(frame, (0, VAD_FRAME_SAMPLES - len(frame)))
+                probs.append(model(frame, self.SAMPLERATE).item())
+            return np.asarray(probs, dtype=np.float32)
+
+    def _stream_probabilities(self, audio_data, stream: VADStream) -> np.ndarray:
+        import torch
+
+        audio = np.concatenate([stream.remainder, np.asarray(audio_data, dtype=np.float32)])
+        frames = len(audio) // VAD_FRAME_SAMPLES
+        stream.remainder = audio[frames * VAD_FRAME_SAMPLES:].copy()
+        samples = torch.from_numpy(audio[:frames * VAD_FRAME_SAMPLES])
+
+        model = self.model
+        with self._state_lock, torch.no_grad():
+            if stream.model_state is None:
+                model.reset_states()
+            else:
+                model._state, model._context, model._last_sr, model._last_batch_size = stream.model_state
+            probs = [
+                model(samples[start:start + VAD_FRAME_SAMPLES], self.SAMPLERATE).item()
+                for start in range(0, len(samples), VAD_FRAME_SAMPLES)
+            ]
+            stream.model_state = (model._state, model._context, model._last_sr, model._last_batch_size)
+        return np.asarray(probs, dtype=np.float32)
+
+
+# ========== 음성 활동 감지 ==========
+class _AudioActivityDetection:
+    """음성 활동 감지 클래스 (연속 무음 청크 수로 발화 종료 판단)"""
+    uses_frame_probs = False
+
+    def __init__(self, audio_config: AudioConfig):
+        self.is_recording = False
+        self.speech_buffer = []
+        self.stop_count = 0
+        self.started_at = None      # 현재 발화 시작 시각 (time.monotonic, STT 우선순위)
+        self.buffer_samples = 0     # speech_buffer 전체 샘플 수
+        self.speech_samples = 0     # 마지막 음성 청크까지의 샘플 수 (뒤쪽 무음 제외)
+        self.silence_threshold = audio_config.SILENCE_THRESHOLD
+        self.exit_threshold = audio_config.EXIT_THRESHOLD
+
+    def resetStream(self):
+        """스트림 상태 초기화"""
+        self.is_recording = False
+        self.speech_buffer = []
+        self.stop_count = 0
+        self.buffer_samples = 0
+        self.speech_samples = 0
+        return {"audio": None, "status": "Reset"}
+
+    def current_audio(self) -> Optional[np.ndarray]:
+        """녹음 중인 발화 버퍼를 이어붙여 반환 (중간 전사용)"""
+        if not self.speech_buffer:
+            return None
+        return np.concatenate(self.speech_buffer, axis=0)
+
+    @staticmethod
+    def _hold(admit: Optional[Callable[[], bool]]) -> bool:
+        """발화를 확정하기 전 STT 자리 확보, 실패하면 True (버퍼를 유지하고 다음 청크에서 다시 종료)"""
+        if admit is None or admit():
+            return False
+        print("⏳ STT 대기열 초과 → 발화 버퍼 유지, 다음 청크에서 다시 종료")
+        return True
+
+    def __call__(self, speech_detected: list, audio_buffer: np.array,
+                 admit: Optional[Callable[[], bool]] = None) -> dict:
+        """
+        음성 데이터에서 화자 활동을 감지
+
+        admit: 발화를 확정하기 직전에 호출, False 면 버퍼를 그대로 두고 "Busy" 반환
+        """
+        has_speech = len(speech_detected) > 0
+        user_status = "Silent"
+        user_audio = None
+        
+        if has_speech:
+            if not self.is_recording:
+                self.is_recording = True
+                self.started_at = time.monotonic()
+                self.stop_count = 0
+                self.speech_buffer = []
+                self.buffer_samples = 0
+                user_status = "Speech"
+                print("🎤 음성 시작")
+            else:
+                user_status = "Speech"
+            
+            self.speech_buffer.append(audio_buffer)
+            self.buffer_samples += len(audio_buffer)
+            self.speech_samples = self.buffer_samples
+            
+            if self.stop_count > 0:
+                print(f"음성 재감지 → 무음 카운트 리셋 ({self.stop_count} → 0)")
+                self.stop_count = 0
+            
+        else:  # 무음
+            if self.is_recording:
+                zero_data = np.zeros_like(audio_buffer)
+                self.speech_buffer.append(zero_data)
+                self.buffer_samples += len(zero_data)
+                self.stop_count += 1
+                user_status = "Speech"
+                
+                print(f"연속 무음: {self.stop_count}/{self.silence_threshold}")
+                
+                if self.stop_count >= self.silence_threshold and self._hold(admit):
+                    user_status = "Busy"
+                elif self.stop_count >= self.silence_threshold:
+                    speech_data = np.concatenate(self.speech_buffer, axis=0)
+                    self.is_recording = False
+                    self.stop_count = 0
+                    self.speech_buffer = []
+                    self.buffer_samples = 0
+                    user_audio = speech_data
+                    user_status = "Finished"
+                    print("✅ 음성 종료")
+                    
+            else:
+                self.stop_count += 1
+                if self.stop_count >= self.exit_threshold:
+                    print(f"❌ 연속 {self.exit_threshold}번 무음으로 시스템 종료")
+                    user_audio = None
+                    user_status = "Error"
+                else:
+                    user_status = "Silent"
+
+        return {"audio": user_audio, "status": user_status}
+
+
+class _AdaptiveEndpointDetection(_AudioActivityDetection):
+    """
+    프레임 단위 VAD 확률 기반 적응형 발화 종료 감지
+
+    - 청크 안의 음성 프레임(32ms) 길이가 MIN_SPEECH_MS 이상이면 발화 시작
+    - 마지막 음성 프레임 이후 무음 길이(ms)가 대기 시간(hang)을 넘으면 발화 종료
+      (청크 경계와 무관하게 판단하므로 발화가 청크 중간에 끝나면 같은 청크에서 바로 종료 가능)
+    - 대기 시간은 기본 MAX_HANG_MS, 음성 확률이 급격히 떨어진 경우(fast drop) MIN_HANG_MS
+
+    Attributes:
+        trailing_silence_ms: 마지막 음성 프레임 이후 무음 길이(ms)
+        drop_from: 무음 직전 음성 프레임들의 평균 확률
+    """
+    uses_frame_probs = True
+
+    def __init__(self, audio_config: AudioConfig):
+        super().__init__(audio_config)
+        self.threshold = audio_config.VAD_THRESHOLD
+        self.neg_threshold = max(self.threshold - 0.15, 0.01)  # Silero 기본 규칙과 동일
+        self.frame_ms = VAD_FRAME_SAMPLES * 1000 / audio_config.SAMPLERATE
+        self.min_speech_ms = audio_config.MIN_SPEECH_MS
+        self.min_hang_ms = audio_config.MIN_HANG_MS
+        self.max_hang_ms = audio_config.MAX_HANG_MS
+        self.fast_drop = audio_config.FAST_DROP
+        self.fast_drop_delta = audio_config.FAST_DROP_DELTA
+        self._reset_hang()
+
+    def _reset_hang(self):
+        self.trailing_silence_ms = 0.0
+        self.silence_prob_sum = 0.0
+        self.drop_from = 0.0
+        self.recent_probs = deque(maxlen=3)
+
+    def resetStream(self):
+        """스트림 상태 초기화"""
+        self._reset_hang()
+        return super().resetStream()
+
+    @property
+    def hang_ms(self) -> float:
+        """현재 적용되는 종료 대기 시간(ms)"""
+        if self.fast_drop and self.trailing_silence_ms > 0:
+            silence_mean = self.silence_prob_sum / (self.trailing_silence_ms / self.frame_ms)
+            if self.drop_from - silence_mean >= self.fast_drop_delta:
+                return self.min_hang_ms
+        return self.max_hang_ms
+
+    def _update(self, frame_probs) -> int:
+        """프레임 확률로 무음 길이를 갱신하고 음성 프레임 수 반환"""
+        speech_frames = 0
+        for prob in frame_probs:
+            prob = float(prob)
+            if prob >= self.neg_threshold:
+                # 음성 또는 음성 유지 구간
+                if prob >= self.threshold:
+                    speech_frames += 1
+                self.trailing_silence_ms = 0.0
+                self.silence_prob_sum = 0.0
+                self.recent_probs.append(prob)
+            else:
+                if self.trailing_silence_ms == 0.0:
+                    self.drop_from = sum(self.recent_probs) / len(self.recent_probs) if self.recent_probs else 0.0
+                self.trailing_silence_ms += self.frame_ms
+                self.silence_prob_sum += prob
+        return speech_frames
+
+    def __call__(self, frame_probs, audio_buffer: np.array,
+                 admit: Optional[Callable[[], bool]] = None) -> dict:
+        """프레임별 음성 확률로 화자 활동을 감지 (admit 은 _AudioActivityDetection 과 같음)"""
+        speech_frames = self._update(frame_probs)
+        if self.is_recording:
+            has_speech = speech_frames > 0
+        else:
+            has_speech = speech_frames * self.frame_ms >= self.min_speech_ms
+        user_status = "Silent"
+        user_audio = None
+
+        if not self.is_recording and not has_speech:
+            self.stop_count += 1
+            if self.stop_count >= self.exit_threshold:
+                print(f"❌ 연속 {self.exit_threshold}번 무음으로 시스템 종료")
+                user_status = "Error"
+            return {"audio": None, "status": user_status}
+
+        if not self.is_recording:
+            self.is_recording = True
+            self.started_at = time.monotonic()
+            self.stop_count = 0
+            self.speech_buffer = []
+            self.buffer_samples = 0
+            print("🎤 음성 시작")
+
+        self.speech_buffer.append(audio_buffer)
+        self.buffer_samples += len(audio_buffer)
+        if has_speech:
+            self.speech_samples = self.buffer_samples
+            self.stop_count = 0
+        else:
+            self.stop_count += 1
+        user_status = "Speech"
+
+        hang_ms = self.hang_ms
+        if self.trailing_silence_ms >= hang_ms and self._hold(admit):
+            user_status = "Busy"
+        elif self.trailing_silence_ms >= hang_ms:
+            user_audio = np.concatenate(self.speech_buffer, axis=0)
+            print(f"✅ 음성 종료 (무음 {self.trailing_silence_ms:.0f}ms ≥ 대기 {hang_ms:.0f}ms)")
+            self.is_recording = False
+            self.stop_count = 0
+            self.speech_buffer = []
+            self.buffer_samples = 0
+            self._reset_hang()
+            user_status = "Finished"
+
+        return {"audio": user_audio, "status": user_status}
+
+
+# ========== 중간 전사 (partial transcript) ==========
+class _PartialTranscript:
+    """
+    발화 도중 버퍼를 백그라운드에서 전사한 결과를 보관하는 세션별 상태
+
+    Attributes:
+        engine: 전사를 수행할 StreamingEngine
+        text: 가장 최근에 완료된 중간 전사 결과
+        covered_samples: text 가 전사한 버퍼 길이 (샘플 수)
+        task: 진행 중인 중간 전사 작업
+        pending_samples: task 가 전사 중인 버퍼 길이 (샘플 수)
+        chunks_since: 마지막 중간 전사 이후 들어온 Speech 청크 수
+    """
+    def __init__(self, engine: "StreamingEngine"):
+        self.engine = engine
+        self.text: Optional[str] = None
+        self.covered_samples = 0
+        self.task: Optional[asyncio.Task] = None
+        self.pending_samples = 0
+        self.chunks_since = 0
+
+    async def _run(self, audio: np.ndarray, started_at: Optional[float]):
+        try:
+            text = await self.engine.transcribe(audio, started_at, kind=PRIORITY_PARTIAL)
+        except Exception as e:
+            print(f"⚠️ 중간 전사 실패 (무시): {e}")
+            return None
+        self.text = text
+        self.covered_samples = len(audio)
+        return text
+
+    def maybe_start(self, event_checker: "_AudioActivityDetection"):
+        """주기가 됐거나 발화 직후 첫 무음 청크이면 현재 버퍼로 중간 전사 시작"""
+        self.chunks_since += 1
+        if self.task is not None and not self.task.done():
+            return
+
+        # 첫 무음 청크: 발화가 끝났을 가능성이 높으므로 무음 대기 시간 동안 미리 전사
+        speech_may_have_ended = (
+            event_checker.stop_count == 1
+            and self.covered_samples < event_checker.speech_samples
+        )
+        if self.chunks_since < self.engine.stt_config.PARTIAL_INTERVAL and not speech_may_have_ended:
+            return
+
+        # STT 대기열이 가득 찼으면 중간 전사는 건너뜀 (최종 전사 우선)
+        if self.engine.stt_busy:
+            return
+
+        audio = event_checker.current_audio()
+        if audio is None:
+            return
+        self.chunks_since = 0
+        self.pending_samples = len(audio)
+        self.task = asyncio.create_task(self._run(audio, event_checker.started_at))
+
+    async def final_text(self, speech_samples: int) -> Optional[str]:
+        """
+        발화 종료 시 재사용 가능한 중간 전사 결과 반환
+        마지막 음성 청크까지 모두 전사했다면 (뒤에 붙은 무음만 다르면) 그대로 최종 결과로 사용합니다.
+        """
+        if self.task is not None and not self.task.done() and self.pending_samples >= speech_samples:
+            text = await self.task
+            if text is not None:
+                return text
+        if self.text is not None and self.covered_samples >= speech_samples:
+            return self.text
+        return None
+
+
+# ========== 세션별 스트림 상태 ==========
+class StreamState:
+    """
+    세션 하나의 스트리밍 상태
+
+    Attributes:
+        detector: 음성 활동 감지 상태
+        partial: 중간 전사 상태 (사용하지 않으면 None)
+        scratch: 청크 디코딩용 재사용 버퍼 (StreamingEngine.decode)
+        vad: 세션별 VAD 스트리밍 상태 (적응형 종료 감지)
+    """
+    __slots__ = ("detector", "partial", "scratch", "vad")
+
+    def __init__(self, audio_config: AudioConfig):
+        if audio_config.ENDPOINTING == "adaptive":
+            self.detector = _AdaptiveEndpointDetection(audio_config)
+        else:
+            self.detector = _AudioActivityDetection(audio_config)
+        self.partial: Optional[_PartialTranscript] = None
+        self.scratch: Optional[np.ndarray] = None
+        self.vad = VADStream()
+
+    @property
+    def is_recording(self) -> bool:
+        return self.detector.is_recording
+
+    @property
+    def buffered_bytes(self) -> int:
+        """현재 잡고 있는 오디오 버퍼 크기 (bytes)"""
+        return sum(chunk.nbytes for chunk in self.detector.speech_buffer)
+
+
+# ========== 스트리밍 엔진 ==========
+class StreamingEngine:
+    """
+    VAD 모델과 STT 백엔드를 공유하는 스트리밍 엔진
+
+    Attributes:
+        audio_config: 오디오 설정
+        stt_config: STT 설정 (중간 전사 옵션)
+        vad: VAD 모델 (모든 세션 공유)
+        stt_backend: STT 백엔드 (모든 세션 공유, 없으면 warm_up 에서 지정)
+        archive: 발화 오디오 저장소 (archive.AudioArchive 처럼 submit(session_id, audio, samplerate, text) 를 가진 객체, 선택)
+        executor: 전용 STT 실행기 (없으면 asyncio.to_thread)
+    """
+    def __init__(self,
+                 audio_config: AudioConfig,
+                 stt_config: STTConfig,
+                 vad_config: VADConfig,
+                 stt_backend: Optional[STTBackend] = None,
+                 archive=None,
+                 executor: Optional[STTExecutor] = None):
+        self.audio_config = audio_config
+        self.stt_config = stt_config
+        self.vad = VADModel(audio_config, vad_config)
+        self.stt_backend = stt_backend
+        self.archive = archive
+        self.executor = executor
+
+    @property
+    def stt_busy(self) -> bool:
+        return self.executor is not None and self.executor.busy
+
+    def new_state(self) -> StreamState:
+        return StreamState(self.audio_config)
+
+    @property
+    def ready(self) -> bool:
+        return self.stt_backend is not None and self.vad.loaded
+
+    def warm_up(self, stt_backend: Optional[STTBackend] = None) -> float:
+        """
+        STT 백엔드 지정 + VAD 모델 로드 + 무음 1초로 첫 추론을 미리 실행 (서버 시작 / 벤치마크)
+
+        Returns:
+            걸린 시간(초)
+        """
+        start = time.perf_counter()
+        if stt_backend is not None:
+            self.stt_backend = stt_backend
+        silence = np.zeros(self.audio_config.SAMPLERATE, dtype=np.float32)
+        self.vad.get_speech_timestamps(silence)
+        if self.audio_config.ENDPOINTING == "adaptive":
+            self.vad.frame_probabilities(silence)
+        return time.perf_counter() - start
+
+    # ---------- 공통 hot path ----------
+    def decode(self, state: StreamState, data: bytes, codec: str, gain: float = 1.0) -> np.ndarray:
+        """
+        청크 바이트 → float32 * gain 을 세션 재사용 버퍼(state.scratch)에 바로 디코딩
+        반환값은 다음 청크에서 덮어써지는 view 이므로 process_chunk(..., borrowed=True) 로 넘겨야 합니다.
+        """
+        audio, state.scratch = decode_into(data, codec, gain, state.scratch)
+        return audio
+
+    def _detect(self, state: StreamState, audio_data: np.ndarray, samplerate: int,
+                borrowed: bool = False, admit: Optional[Callable[[], bool]] = None) -> dict:
+        """리샘플링(필요할 때만) → VAD (구간 또는 프레임 확률) → 음성 활동 감지"""
+        audio_data = to_samplerate(audio_data, samplerate, self.audio_config.SAMPLERATE)
+        if state.detector.uses_frame_probs:
+            stream = state.vad if self.vad.vad_config.STREAM_STATE else None
+            result = state.detector(self.vad.frame_probabilities(audio_data, stream), audio_data, admit)
+        else:
+            result = state.detector(self.vad.get_speech_timestamps(audio_data), audio_data, admit)
+
+        # 재사용 버퍼의 view 를 발화 버퍼에 보관했다면 그 청크만 복사 (무음 청크는 복사 없음)
+        speech_buffer = state.detector.speech_buffer
+        if borrowed and speech_buffer and speech_buffer[-1] is audio_data:
+            speech_buffer[-1] = audio_data.copy()
+        return result
+
+    def _finish(self, session_id: Optional[str], audio: np.ndarray, text: str):
+        if self.archive is not None and session_id is not None:
+            # 아카이브 저장은 백그라운드 writer로 넘김
+            self.archive.submit(session_id, audio, self.audio_config.SAMPLERATE, text=text)
+        print(f"📝 인식된 텍스트: {text}")
+
+    # ---------- 비동기 API (HTTP 서버) ----------
+    async def transcribe(self, audio: np.ndarray, started_at: Optional[float] = None,
+                         kind: int = PRIORITY_FINAL, reserved: bool = False) -> str:
+        """
+        STT 호출 (디스크 I/O 없이 메모리에서 바로 전사, 전용 실행기 또는 스레드에서 실행)
+        reserved: executor.reserve() 로 확보한 자리를 사용
+        """
+        if self.executor is not None:
+            return await self.executor.run(
+                self.stt_backend.transcribe_audio, audio, self.audio_config.SAMPLERATE,
+                started_at=started_at, kind=kind, reserved=reserved,
+            )
+        return await asyncio.to_thread(self.stt_backend.transcribe_audio, audio, self.audio_config.SAMPLERATE)
+
+    def reset(self, state: StreamState) -> dict:
+        result = state.detector.resetStream()
+        state.partial = None
+        state.vad.reset()
+        return {"status": result["status"], "text": None, "partial_text": None}
+
+    def end_utterance(self, state: StreamState):
+        """발화 버퍼만 비움 (VAD 모델 상태, 적응형 통계, scratch 버퍼는 세션이 끝날 때까지 유지)"""
+        state.detector.resetStream()
+        state.partial = None
+
+    async def _final_transcript(self, state: StreamState, audio: np.ndarray, reserved: bool) -> str:
+        """발화 종료 시 최종 전사 (reserve 로 확보한 자리는 STT 에 쓰거나 반납)"""
+        try:
+            # 중간 전사가 발화 전체를 이미 커버했다면 재사용
+            if state.partial is not None:
+                text = await state.partial.final_text(state.detector.speech_samples)
+                if text is not None:
+                    return text
+            use_reserved, reserved = reserved, False
+            return await self.transcribe(audio, state.detector.started_at, reserved=use_reserved)
+        finally:
+            if reserved:
+                self.executor.release()
+
+    async def process_chunk(self,
+                            state: StreamState,
+                            audio_data: np.ndarray,
+                            samplerate: int = DEFAULT_RATE,
+                            session_id: Optional[str] = None,
+                            borrowed: bool = False) -> dict:
+        """
+        청크 하나 처리 (비동기)
+
+        Args:
+            borrowed: audio_data 가 decode() 가 돌려준 재사용 버퍼의 view 인 경우 True
+
+        Returns:
+            dict: {"status": "Silent" | "Speech" | "Finished" | "Busy" | "Error", "text": str | None, "partial_text": str | None}
+            "Busy": 발화가 끝났지만 STT 대기열이 가득 참, 발화 버퍼는 유지되고 다음 청크에서 다시 종료를 시도
+        """
+        # 발화를 확정하기 전에 최종 전사 자리를 확보 (실패하면 detector 가 버퍼를 유지)
+        reserved = False
+
+        def admit() -> bool:
+            nonlocal reserved
+            reserved = self.executor.reserve()
+            return reserved
+
+        result = self._detect(state, audio_data, samplerate, borrowed,
+                              admit=admit if self.executor is not None else None)
+        transcript_text = None
+        partial_text = None
+
+        if result["audio"] is not None:
+            transcript_text = await self._final_transcript(state, result["audio"], reserved)
+            self._finish(session_id, result["audio"], transcript_text)
+
+        elif result["status"] == "Speech" and self.stt_config.PARTIAL_TRANSCRIPTS:
+            if state.partial is None:
+                state.partial = _PartialTranscript(self)
+            state.partial.maybe_start(state.detector)
+            partial_text = state.partial.text
+
+        return {"status": result["status"], "text": transcript_text, "partial_text": partial_text}
+
+    # ---------- 동기 API (오프라인 CLI / 파일 리플레이) ----------
+    def process_chunk_sync(self,
+                           state: StreamState,
+                           audio_data: np.ndarray,
+                           samplerate: int = DEFAULT_RATE,
+                           session_id: Optional[str] = None) -> dict:
+        """청크 하나 처리 (동기, 중간 전사 없음)"""
+        result = self._detect(state, audio_data, samplerate)
+        transcript_text = None
+
+        if result["audio"] is not None:
+            transcript_text = self.stt_backend.transcribe_audio(result["audio"], self.audio_config.SAMPLERATE)
+            self._finish(session_id, result["audio"], transcript_text)
+
+        return {"status": result["status"], "text": transcript_text, "partial_text": None}
+
+    def replay_file(self,
+                    path,
+                    chunk_seconds: float = 0.5,
+                    realtime: bool = False,
+                    stop_on_finished: bool = True) -> Iterator[Tuple[int, dict]]:
+        """
+        오디오 파일을 chunk_seconds 단위로 잘라 순서대로 처리 (동기)
+
+        Args:
+            path: 오디오 파일 경로 (librosa 가 읽을 수 있는 형식)
+            chunk_seconds: 청크 길이(초)
+            realtime: True 이면 청크마다 chunk_seconds 만큼 대기 (실제 스트리밍 시뮬레이션)
+            stop_on_finished: Finished / Error 에서 멈출지 여부
+
+        Yields:
+            (청크 번호, process_chunk_sync 결과)
+        """
+        import librosa
+
+        samplerate = self.audio_config.SAMPLERATE
+        audio, _ = librosa.load(str(path), sr=samplerate)
+        chunk_size = int(samplerate * chunk_seconds)
+        state = self.new_state()
+        session_id = Path(path).stem
+
+        for index, start in enumerate(range(0, len(audio), chunk_size)):
+            chunk = audio[start:start + chunk_size]
+            # 마지막 청크 패딩 (청크 크기 맞추기)
+            if len(chunk) < chunk_size:
+                chunk = np.pad(chunk, (0, chunk_size - len(chunk)))
+
+            result = self.process_chunk_sync(state, chunk, samplerate, session_id=session_id)
+            yield index, result
+
+            if stop_on_finished and result["status"] in ("Finished", "Error"):
+                return
+            if realtime:
+                time.sleep(chunk_seconds)
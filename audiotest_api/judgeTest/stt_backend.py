@@ -0,0 +1,218 @@
+"""
+stt_backend.py - 판단 서버 STT 백엔드
+OpenAI Whisper API / 로컬 faster-whisper / 테스트용 Fake 백엔드를 같은 인터페이스로 제공
+"""
+import io
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+class STTBusyError(Exception):
+    """STT 작업 큐가 가득 차서 더 이상 작업을 받을 수 없는 상태"""
+
+
+def encode_wav(audio: np.ndarray, samplerate: int) -> bytes:
+    """오디오 배열을 디스크를 거치지 않고 메모리에서 WAV 바이트로 인코딩"""
+    import soundfile as sf
+
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, samplerate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+# ========== 백엔드 인터페이스 ==========
+class STTBackend:
+    """
+    STT 백엔드 인터페이스
+    모든 메서드는 동기 함수이며, 서버에서는 asyncio.to_thread 로 호출합니다.
+    """
+    name = "base"
+
+    def transcribe_audio(self, audio: np.ndarray, samplerate: int) -> str:
+        """float32 오디오 배열을 전사"""
+        raise NotImplementedError
+
+    def transcribe_file(self, data: bytes, filename: str = "speech.wav") -> str:
+        """인코딩된 오디오 파일 바이트(WAV 등)를 전사"""
+        raise NotImplementedError
+
+    def close(self):
+        """리소스 정리"""
+
+
+# ========== OpenAI Whisper API ==========
+class OpenAISTTBackend(STTBackend):
+    """OpenAI Whisper API 백엔드 (WAV를 메모리에서 바로 업로드)"""
+    name = "openai"
+
+    def __init__(self, model: str, language: str, api_key: str = None):
+        from openai import OpenAI
+
+        self.model = model
+        self.language = language
+        self.client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY", "your-api-key"))
+
+    def transcribe_audio(self, audio: np.ndarray, samplerate: int) -> str:
+        return self.transcribe_file(encode_wav(audio, samplerate))
+
+    def transcribe_file(self, data: bytes, filename: str = "speech.wav") -> str:
+        response = self.client.audio.transcriptions.create(
+            model=self.model,
+            file=(filename, data),
+            language=self.language
+        )
+        return response.text
+
+
+# ========== 로컬 faster-whisper (CTranslate2) ==========
+def local_pool_size(pool_size: int, cpu_threads: int) -> int:
+    """로컬 모델 인스턴스 수 (0이면 CPU 코어 수 / cpu_threads)"""
+    return pool_size or max(1, (os.cpu_count() or 1) // max(1, cpu_threads))
+
+
+class LocalWhisperSTTBackend(STTBackend):
+    """
+    faster-whisper(CTranslate2) 기반 로컬 STT 백엔드
+
+    - 서버 시작 시 모델을 pool_size 개 미리 로드하고 워밍업해 둡니다. (warm pool)
+    - 동시에 받을 수 있는 작업 수는 pool_size + queue_size 로 제한됩니다.
+      슬롯을 queue_timeout 초 안에 얻지 못하면 STTBusyError 를 발생시킵니다. (backpressure)
+
+    Attributes:
+        pool_size: 모델 인스턴스 수 (0이면 CPU 코어 수 / cpu_threads 로 자동 결정)
+        cpu_threads: 모델 인스턴스 하나가 사용하는 CPU 스레드 수
+    """
+    name = "local"
+
+    def __init__(self,
+                 model_size: str = "small",
+                 language: str = "ko",
+                 compute_type: str = "int8",
+                 pool_size: int = 0,
+                 cpu_threads: int = 2,
+                 queue_size: int = 8,
+                 queue_timeout: float = 5.0,
+                 beam_size: int = 1):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImportError(
+                "stt.backend = \"local\" 을 사용하려면 faster-whisper 가 필요합니다: pip install faster-whisper"
+            ) from e
+
+        self.cpu_threads = max(1, cpu_threads)
+        self.pool_size = local_pool_size(pool_size, self.cpu_threads)
+        self.language = language
+        self.beam_size = beam_size
+        self.queue_timeout = queue_timeout
+
+        self._slots = threading.BoundedSemaphore(self.pool_size + max(0, queue_size))
+        self._pool = queue.Queue()
+
+        print(f"🧠 로컬 STT 모델 로드: {model_size} ({compute_type}) x {self.pool_size}, 스레드 {self.cpu_threads}")
+        warmup_audio = np.zeros(16000, dtype=np.float32)
+        for _ in range(self.pool_size):
+            model = WhisperModel(
+                model_size,
+                device="cpu",
+                compute_type=compute_type,
+                cpu_threads=self.cpu_threads,
+            )
+            self._run(model, warmup_audio)
+            self._pool.put(model)
+
+    def _run(self, model, audio) -> str:
+        segments, _ = model.transcribe(audio, language=self.language, beam_size=self.beam_size)
+        return "".join(segment.text for segment in segments).strip()
+
+    def _transcribe(self, audio) -> str:
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise STTBusyError("로컬 STT 작업 큐가 가득 찼습니다")
+        try:
+            model = self._pool.get()
+            try:
+                return self._run(model, audio)
+            finally:
+                self._pool.put(model)
+        finally:
+            self._slots.release()
+
+    def transcribe_audio(self, audio: np.ndarray, samplerate: int) -> str:
+        if samplerate != 16000:
+            import librosa
+            audio = librosa.resample(audio, orig_sr=samplerate, target_sr=16000)
+        return self._transcribe(np.ascontiguousarray(audio, dtype=np.float32))
+
+    def transcribe_file(self, data: bytes, filename: str = "speech.wav") -> str:
+        return self._transcribe(io.BytesIO(data))
+
+
+# ========== 테스트용 Fake ==========
+class FakeSTTBackend(STTBackend):
+    """
+    네트워크/모델 없이 결정적인 결과를 돌려주는 테스트용 백엔드
+    text 가 비어 있으면 오디오 길이를 담은 문자열을 반환합니다.
+    """
+    name = "fake"
+
+    def __init__(self, text: str = "", delay: float = 0.0):
+        self.text = text
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _result(self, duration: float) -> str:
+        with self._lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self.text or f"[fake] {duration:.2f}s"
+
+    def transcribe_audio(self, audio: np.ndarray, samplerate: int) -> str:
+        return self._result(len(audio) / samplerate)
+
+    def transcribe_file(self, data: bytes, filename: str = "speech.wav") -> str:
+        import soundfile as sf
+
+        try:
+            info = sf.info(io.BytesIO(data))
+            duration = info.frames / info.samplerate
+        except Exception:
+            duration = 0.0
+        return self._result(duration)
+
+
+def default_workers(stt_config) -> int:
+    """백엔드를 만들기 전에 STT 실행기 워커 수 결정 (로컬 백엔드는 모델 풀 크기와 같게)"""
+    if stt_config.BACKEND.lower() == "local":
+        return local_pool_size(stt_config.POOL_SIZE, stt_config.CPU_THREADS)
+    return 4
+
+
+def create_stt_backend(stt_config, audio_config) -> STTBackend:
+    """config.json 의 stt 설정에 맞는 백엔드 생성"""
+    backend = stt_config.BACKEND.lower()
+
+    if backend == "openai":
+        return OpenAISTTBackend(
+            model=audio_config.WHISPER_MODEL,
+            language=audio_config.WHISPER_LANGUAGE,
+        )
+    if backend == "local":
+        return LocalWhisperSTTBackend(
+            model_size=stt_config.LOCAL_MODEL,
+            language=audio_config.WHISPER_LANGUAGE,
+            compute_type=stt_config.COMPUTE_TYPE,
+            pool_size=stt_config.POOL_SIZE,
+            cpu_threads=stt_config.CPU_THREADS,
+            queue_size=stt_config.QUEUE_SIZE,
+            queue_timeout=stt_config.QUEUE_TIMEOUT,
+        )
+    if backend == "fake":
+        return FakeSTTBackend(text=stt_config.FAKE_TEXT, delay=stt_config.FAKE_DELAY)
+
+    raise ValueError(f"알 수 없는 STT 백엔드: {stt_config.BACKEND}")
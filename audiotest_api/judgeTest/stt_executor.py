@@ -0,0 +1,173 @@
+"""
+stt_executor.py - 판단 서버 전용 STT 실행기
+기본 스레드 풀(asyncio.to_thread) 대신 크기가 고정된 전용 워커 스레드와 우선순위 큐로 STT 작업을 처리합니다.
+
+- 우선순위: 최종 전사(파일 모드 포함)가 중간 전사보다 먼저, 같은 종류는 발화가 먼저 시작된 것부터 (oldest first)
+- 대기 작업 수가 max_pending 에 도달하면 STTBusyError 로 즉시 거부 (타임아웃까지 기다리지 않음)
+- 발화 종료 시에는 reserve() 로 자리를 먼저 확보한 뒤 확정하므로, 대기열이 가득 차도 발화 오디오를 버리지 않음
+- 대기열 길이 / 대기 시간 / 처리량 지표는 stats() 로 /stats 에 노출
+"""
+import asyncio
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+from stt_backend import STTBusyError
+
+PRIORITY_FINAL = 0
+PRIORITY_PARTIAL = 1
+
+
+def _resolve(future: asyncio.Future, result=None, error: Optional[BaseException] = None):
+    """워커 스레드 결과를 이벤트 루프의 future 에 전달 (요청이 이미 취소됐으면 무시)"""
+    if future.cancelled():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class STTExecutor:
+    """
+    우선순위 큐 기반 STT 전용 실행기
+
+    Attributes:
+        workers: 워커 스레드 수
+        max_pending: 대기 가능한 최대 작업 수 (실행 중인 작업 제외)
+    """
+    def __init__(self, workers: int = 4, max_pending: int = 16, name: str = "stt-worker"):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+        self._pending = 0
+        self._running = 0
+        self.max_pending_seen = 0
+        self.submitted_total = 0
+        self.completed_total = 0            # 성공한 작업 수
+        self.failed_total = 0               # 예외로 끝난 작업 수
+        self.rejected_total = 0
+        self._waits = deque(maxlen=500)     # 최근 작업들의 큐 대기 시간(초)
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"{name}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def busy(self) -> bool:
+        """대기열이 가득 차서 새 작업을 받을 수 없는 상태"""
+        return self._pending >= self.max_pending
+
+    def reserve(self) -> bool:
+        """대기열 자리 하나를 미리 확보 (가득 찼으면 False), 확보한 자리는 run(reserved=True) 또는 release() 로 반납"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected_total += 1
+                return False
+            self._pending += 1
+            self.max_pending_seen = max(self.max_pending_seen, self._pending)
+            return True
+
+    def release(self):
+        """reserve() 로 확보했지만 쓰지 않은 자리 반납"""
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args, started_at: Optional[float] = None, kind: int = PRIORITY_FINAL,
+                  reserved: bool = False):
+        """
+        fn(*args) 를 워커 스레드에서 실행하고 결과를 기다림
+
+        Args:
+            started_at: 발화 시작 시각 (time.monotonic, 없으면 현재 시각), 작을수록 먼저 처리
+            kind: PRIORITY_FINAL | PRIORITY_PARTIAL
+            reserved: reserve() 로 이미 확보한 자리를 사용 (대기열 검사 생략)
+
+        Raises:
+            STTBusyError: 대기열이 가득 찬 경우
+        """
+        with self._lock:
+            if not reserved:
+                if self._pending >= self.max_pending:
+                    self.rejected_total += 1
+                    raise STTBusyError(f"STT 대기열 초과 (대기 {self._pending}/{self.max_pending})")
+                self._pending += 1
+                self.max_pending_seen = max(self.max_pending_seen, self._pending)
+            self.submitted_total += 1
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        priority = started_at if started_at is not None else time.monotonic()
+        self._queue.put((kind, priority, next(self._seq), (loop, future, fn, args, time.monotonic())))
+        return await future
+
+    @staticmethod
+    def _post(loop: asyncio.AbstractEventLoop, *args):
+        """결과를 요청한 이벤트 루프로 전달 (루프가 이미 닫혔으면 버리고 워커는 계속 동작)"""
+        try:
+            loop.call_soon_threadsafe(_resolve, *args)
+        except RuntimeError:
+            pass
+
+    def _worker(self):
+        while True:
+            _, _, _, job = self._queue.get()
+            if job is None:
+                return
+            loop, future, fn, args, enqueued_at = job
+            with self._lock:
+                self._pending -= 1
+                self._running += 1
+                self._waits.append(time.monotonic() - enqueued_at)
+
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                with self._lock:
+                    self._running -= 1
+                    self.failed_total += 1
+                self._post(loop, future, None, e)
+            else:
+                with self._lock:
+                    self._running -= 1
+                    self.completed_total += 1
+                self._post(loop, future, result)
+
+    def stats(self) -> dict:
+        """대기열 길이 / 대기 시간 / 처리량 지표"""
+        with self._lock:
+            waits = list(self._waits)
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "running": self._running,
+                "busy": self._pending >= self.max_pending,
+                "max_pending_seen": self.max_pending_seen,
+                "submitted_total": self.submitted_total,
+                "completed_total": self.completed_total,
+                "failed_total": self.failed_total,
+                "rejected_total": self.rejected_total,
+                "wait_ms_avg": round(float(np.mean(waits)) * 1000, 1) if waits else None,
+                "wait_ms_p99": round(float(np.percentile(waits, 99)) * 1000, 1) if waits else None,
+            }
+
+    def shutdown(self):
+        """워커 스레드 종료 (대기 중인 작업을 처리한 뒤 종료)"""
+        for _ in self._threads:
+            self._queue.put((PRIORITY_PARTIAL + 1, float("inf"), next(self._seq), None))
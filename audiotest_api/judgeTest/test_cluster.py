@@ -0,0 +1,268 @@
+"""
+판단 서버 스케일아웃 테스트 (멀티 프로세스)
+워커 N개를 별도 프로세스로 띄워 공유 레지스트리 등록, consistent hashing 라우팅, 세션 어피니티를 검증합니다.
+
+실행:
+    python test_cluster.py
+    또는 pytest test_cluster.py
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BASE = Path(__file__).parent
+sys.path.insert(0, str(BASE))
+
+import pytest  # noqa: E402
+
+from worker_registry import (  # noqa: E402
+    ConsistentHashRing,
+    InvalidShardError,
+    NoWorkerError,
+    ShardRouter,
+    WorkerRegistry,
+    make_session_id,
+    parse_shard,
+)
+
+WORKER_COUNT = 3
+STARTUP_TIMEOUT = 60.0
+_tmp_dir = tempfile.mkdtemp(prefix="judge_cluster_")
+REGISTRY_PATH = str(Path(_tmp_dir) / "workers.db")
+
+
+def _write_cluster_config() -> str:
+    """저장소 config.json 에 fake STT / 클러스터 모드 / 임시 레지스트리만 덮어쓴 설정 파일 생성"""
+    with open(BASE / "config.json", "r", encoding="utf-8") as f:
+        config_data = json.load(f)
+
+    config_data["stt"] = {"backend": "fake"}
+    config_data.setdefault("paths", {})["archive_dir"] = str(Path(_tmp_dir) / "audio_data")
+    config_data["cluster"] = {
+        "enabled": True,
+        "registry_path": REGISTRY_PATH,
+        "heartbeat_interval": 1,
+        "worker_ttl": 5,
+    }
+
+    config_path = Path(_tmp_dir) / "config.json"
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config_data, f, ensure_ascii=False)
+    return str(config_path)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _spawn_workers(count: int) -> list:
+    """main.py 를 워커 수만큼 별도 프로세스로 실행"""
+    config_path = _write_cluster_config()
+    processes = []
+    for i in range(count):
+        env = dict(
+            os.environ,
+            JUDGE_CONFIG=config_path,
+            JUDGE_PORT=str(_free_port()),
+            JUDGE_WORKER_ID=f"test-worker-{i}",
+        )
+        processes.append(subprocess.Popen(
+            [sys.executable, "main.py"],
+            cwd=BASE,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        ))
+    return processes
+
+
+def _wait_for_workers(registry: WorkerRegistry, count: int) -> dict:
+    """워커들이 레지스트리에 등록되고 /stats 에 응답할 때까지 대기"""
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        workers = registry.live_workers()
+        if len(workers) >= count:
+            try:
+                for url in workers.values():
+                    httpx.get(f"{url}/stats", timeout=2.0).raise_for_status()
+                return workers
+            except httpx.HTTPError:
+                pass
+        time.sleep(0.5)
+    raise AssertionError(f"{STARTUP_TIMEOUT}초 안에 워커 {count}개가 뜨지 않았습니다")
+
+
+_processes = []
+_workers = {}
+_router = None
+
+
+def setup_module(module=None):
+    global _processes, _workers, _router
+    registry = WorkerRegistry(REGISTRY_PATH, worker_ttl=5)
+    _processes = _spawn_workers(WORKER_COUNT)
+    _workers = _wait_for_workers(registry, WORKER_COUNT)
+    _router = ShardRouter(registry, refresh_interval=0)
+
+
+def teardown_module(module=None):
+    for process in _processes:
+        process.terminate()
+    for process in _processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _start_via_router() -> tuple:
+    """프록시와 같은 방식으로 /start: 샤드 결정 → 소유 워커에 세션 생성"""
+    shard, worker_url = _router.route_new_session()
+    resp = httpx.post(f"{worker_url}/start", params={"shard": shard}, timeout=5.0)
+    assert resp.status_code == 200
+    return resp.json()["sessionId"], worker_url
+
+
+def _ingest(worker_url: str, session_id: str):
+    return httpx.post(
+        f"{worker_url}/ingest-chunk",
+        data={"sessionId": session_id, "mode": "chunk"},
+        files={"chunk": ("chunk.raw", b"\x00\x00" * 24000, "application/octet-stream")},
+        timeout=5.0,
+    )
+
+
+def test_ring_remaps_only_removed_node():
+    """워커 하나가 빠지면 그 워커가 소유한 샤드만 다른 워커로 이동"""
+    nodes = [f"worker-{i}" for i in range(4)]
+    keys = [f"shard-{i}" for i in range(2000)]
+    full = ConsistentHashRing(nodes)
+    reduced = ConsistentHashRing(nodes[:-1])
+
+    moved = [key for key in keys if full.get(key) != reduced.get(key)]
+    assert moved
+    assert all(full.get(key) == nodes[-1] for key in moved)
+
+
+def test_routing_survives_membership_change():
+    """워커가 추가/제거되거나 heartbeat 가 늦어도 기존 세션은 소유 워커로 그대로 라우팅"""
+    registry = WorkerRegistry(str(Path(_tmp_dir) / "membership.db"), worker_ttl=60)
+    for i in range(3):
+        registry.register(f"worker-{i}", f"http://worker-{i}")
+    router = ShardRouter(registry, refresh_interval=0)
+
+    sessions = {}
+    for _ in range(50):
+        shard, url = router.route_new_session()
+        sessions[make_session_id(shard)] = url
+    assert len(set(sessions.values())) > 1
+
+    registry.register("worker-3", "http://worker-3")
+    registry.unregister("worker-0")
+    registry.worker_ttl = 0             # 남은 워커들의 heartbeat 가 만료된 상황
+    for session_id, url in sessions.items():
+        if url == "http://worker-0":
+            with pytest.raises(NoWorkerError):
+                router.route(session_id)
+        else:
+            assert router.route(session_id) == url
+
+
+def test_router_background_refresh():
+    """lifespan 안에서는 캐시로만 라우팅하고, 레지스트리 변경은 백그라운드 갱신으로 반영"""
+    registry = WorkerRegistry(str(Path(_tmp_dir) / "background.db"), worker_ttl=60)
+    registry.register("worker-0", "http://worker-0")
+    router = ShardRouter(registry, refresh_interval=0.05)
+
+    async def scenario():
+        async with router.lifespan():
+            assert router.route_new_session() == ("worker-0", "http://worker-0")
+            registry.register("worker-1", "http://worker-1")
+            with pytest.raises(NoWorkerError):
+                router.route_shard("worker-1")      # 요청 경로에서는 레지스트리를 다시 읽지 않음
+            await asyncio.sleep(0.3)
+            assert router.route_shard("worker-1") == "http://worker-1"
+
+    asyncio.run(scenario())
+
+
+def test_invalid_shard_rejected():
+    """구분자 "." 가 들어간 샤드 / 다른 워커의 샤드는 거부"""
+    with pytest.raises(InvalidShardError):
+        _router.route_shard("a.b")
+    with pytest.raises(InvalidShardError):
+        make_session_id("a.b")
+
+    worker_id, url = next(iter(_workers.items()))
+    assert httpx.post(f"{url}/start", params={"shard": "a.b"}, timeout=5.0).status_code == 400
+    other = next(w for w in _workers if w != worker_id)
+    assert httpx.post(f"{url}/start", params={"shard": other}, timeout=5.0).status_code == 400
+
+
+def test_workers_registered():
+    """모든 워커가 공유 레지스트리에 등록되고 /stats 에 자신의 worker_id 를 보고"""
+    assert len(_workers) == WORKER_COUNT
+    for worker_id, url in _workers.items():
+        assert httpx.get(f"{url}/stats", timeout=5.0).json()["worker_id"] == worker_id
+
+
+def test_session_affinity():
+    """세션을 만든 워커로 라우팅된 청크는 처리되고, 다른 워커로 보내면 400"""
+    session_id, owner_url = _start_via_router()
+    assert _workers[parse_shard(session_id)] == owner_url
+    assert _router.route(session_id) == owner_url
+
+    resp = _ingest(_router.route(session_id), session_id)
+    assert resp.status_code == 200
+    assert resp.json()["status"] in ("Silent", "Speech")
+
+    for url in _workers.values():
+        if url != owner_url:
+            assert _ingest(url, session_id).status_code == 400
+
+
+def test_sessions_spread_across_workers():
+    """새 세션들이 여러 워커에 분산"""
+    owners = {_start_via_router()[1] for _ in range(30)}
+    assert len(owners) > 1
+
+
+if __name__ == "__main__":
+    tests = [
+        test_ring_remaps_only_removed_node,
+        test_routing_survives_membership_change,
+        test_router_background_refresh,
+        test_workers_registered,
+        test_invalid_shard_rejected,
+        test_session_affinity,
+        test_sessions_spread_across_workers,
+    ]
+    failed = 0
+    print(f"🚀 판단 서버 워커 {WORKER_COUNT}개 실행 중...")
+    setup_module()
+    try:
+        for test in tests:
+            print("\n" + "=" * 60)
+            print(f"🧪 {test.__doc__}")
+            print("=" * 60)
+            try:
+                test()
+                print("✅ 통과")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ 실패: {e}")
+    finally:
+        teardown_module()
+
+    print(f"\n🏁 {len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,583 @@
+"""
+판단 서버 오프라인 파이프라인 테스트
+Fake STT 백엔드로 /start → /ingest-chunk(청크/파일 모드) 전체 흐름을 네트워크 없이 검증합니다.
+
+실행:
+    python test_pipeline.py
+    또는 pytest test_pipeline.py
+"""
+import asyncio
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+BASE = Path(__file__).parent
+sys.path.insert(0, str(BASE))
+
+FAKE_TEXT = "테스트 전사 결과"
+_tmp_dir = tempfile.mkdtemp(prefix="judge_test_")
+
+
+def _write_test_config() -> str:
+    """저장소 config.json 에 fake STT / 임시 아카이브 경로 / blocking warm-up 만 덮어쓴 설정 파일 생성"""
+    with open(BASE / "config.json", "r", encoding="utf-8") as f:
+        config_data = json.load(f)
+
+    config_data["stt"] = {"backend": "fake", "fake_text": FAKE_TEXT}
+    config_data.setdefault("paths", {})["archive_dir"] = str(Path(_tmp_dir) / "audio_data")
+    config_data.setdefault("server", {})["warmup"] = "blocking"
+
+    config_path = Path(_tmp_dir) / "config.json"
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config_data, f, ensure_ascii=False)
+    return str(config_path)
+
+
+os.environ["JUDGE_CONFIG"] = _write_test_config()
+
+import librosa  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from audio_codec import mulaw_encode  # noqa: E402
+
+# 모듈 전체에서 컨텍스트로 열어 두어야 요청 간에 같은 이벤트 루프가 유지됨 (백그라운드 task, lifespan)
+client: TestClient = None
+
+
+def _open_client():
+    """TestClient 를 열어 두고, 닫힐 때 lifespan 종료(아카이브 flush, 백그라운드 task 정리)까지 실행"""
+    global client
+    with TestClient(main.app) as test_client:
+        client = test_client
+        yield test_client
+    client = None
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _test_client():
+    yield from _open_client()
+
+
+CLIENT_SAMPLERATE = 48000
+CHUNK_SECONDS = 0.5
+
+
+def _archived_wavs(limit: int = 5) -> list:
+    """audio_data/ 의 실제 발화 파일을 크기순으로 반환"""
+    files = sorted((BASE / "audio_data").glob("*.wav"), key=lambda p: p.stat().st_size, reverse=True)
+    return files[:limit]
+
+
+def _to_client_chunks(path: Path, rate: int = CLIENT_SAMPLERATE, codec: str = "pcm_s16le") -> list:
+    """WAV 파일을 브라우저(processor.js)와 같은 0.5초 청크로 변환 (기본: 48kHz Int16)"""
+    audio, sr = sf.read(path, dtype="float32")
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    audio = librosa.resample(audio, orig_sr=sr, target_sr=rate)
+
+    # 발화 종료 판정을 위해 뒤에 무음 3초 추가
+    audio = np.concatenate([audio, np.zeros(rate * 3, dtype=np.float32)])
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    if codec == "mulaw":
+        pcm = mulaw_encode(pcm)
+
+    chunk_size = int(rate * CHUNK_SECONDS)
+    return [pcm[i:i + chunk_size].tobytes() for i in range(0, len(pcm), chunk_size)]
+
+
+def _start_session() -> str:
+    resp = client.post("/start")
+    assert resp.status_code == 200
+    return resp.json()["sessionId"]
+
+
+def _ingest(session_id: str, data: bytes, mode: str = "chunk", filename: str = "chunk.raw", **fields):
+    return client.post(
+        "/ingest-chunk",
+        data={"sessionId": session_id, "mode": mode, **fields},
+        files={"chunk": (filename, data, "application/octet-stream")},
+    )
+
+
+def test_invalid_session_rejected():
+    """/start 없이 보낸 청크는 400"""
+    resp = _ingest("not-a-session", b"\x00\x00" * 100)
+    assert resp.status_code == 400
+    assert resp.json()["status"] == "Error"
+
+
+def test_chunk_as_form_string_rejected():
+    """chunk 가 파일이 아닌 문자열 필드로 오면 500 이 아니라 400"""
+    resp = client.post("/ingest-chunk", data={"sessionId": _start_session(), "chunk": "not-a-file"})
+    assert resp.status_code == 400
+    assert resp.json()["status"] == "Error"
+
+
+def test_file_mode_uses_stt_backend():
+    """파일 모드는 VAD 없이 바로 STT 백엔드로 전사"""
+    wav_path = _archived_wavs(limit=1)[0]
+    resp = _ingest(_start_session(), wav_path.read_bytes(), mode="file", filename=wav_path.name)
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "Finished", "text": FAKE_TEXT}
+
+
+def _stream_until_finished(rate: int = CLIENT_SAMPLERATE, codec: str = "pcm_s16le") -> list:
+    """아카이브 파일을 하나씩 청크로 흘려보내 Finished 에 도달한 세션의 응답 목록 반환"""
+    for wav_path in _archived_wavs():
+        session_id = _start_session()
+        responses = []
+        for chunk in _to_client_chunks(wav_path, rate=rate, codec=codec):
+            body = _ingest(session_id, chunk, codec=codec, rate=str(rate)).json()
+            responses.append(body)
+            assert body["status"] in ("Silent", "Speech", "Finished", "Error")
+            if body["status"] in ("Finished", "Error"):
+                break
+        if responses[-1]["status"] == "Finished":
+            return responses
+        print(f"   - {wav_path.name}: {[r['status'] for r in responses]}")
+
+    raise AssertionError("어떤 아카이브 파일에서도 Finished 상태에 도달하지 못했습니다")
+
+
+def test_chunk_mode_reaches_finished():
+    """실제 발화 WAV를 청크로 흘려보내면 Finished + 전사 텍스트가 나와야 함"""
+    responses = _stream_until_finished()
+    assert responses[-1]["text"] == FAKE_TEXT
+
+
+def test_raw_octet_stream_fast_path():
+    """application/octet-stream 본문 + 쿼리 파라미터로 보낸 청크도 Finished 에 도달"""
+    for wav_path in _archived_wavs():
+        session_id = _start_session()
+        statuses = []
+        for chunk in _to_client_chunks(wav_path):
+            resp = client.post(
+                "/ingest-chunk",
+                params={"sessionId": session_id, "codec": "pcm_s16le", "rate": CLIENT_SAMPLERATE},
+                content=chunk,
+                headers={"Content-Type": "application/octet-stream"},
+            )
+            assert resp.status_code == 200, resp.json()
+            statuses.append(resp.json()["status"])
+            if statuses[-1] == "Finished":
+                break
+        if statuses[-1] == "Finished":
+            assert resp.json()["text"] == FAKE_TEXT
+            return
+    raise AssertionError("raw 경로로 Finished 에 도달하지 못했습니다")
+
+
+def test_decode_into_reuses_buffer():
+    """fused 디코딩: 기존 변환(/32768 * gain)과 같은 값, 버퍼 재사용"""
+    from audio_codec import decode_into
+
+    pcm = (np.sin(np.linspace(0, 50, 24000)) * 12000).astype(np.int16)
+    expected = pcm.astype(np.float32) / 32768.0 * 3.0
+    audio, buffer = decode_into(pcm.tobytes(), "pcm_s16le", 3.0)
+    assert np.allclose(audio, expected, atol=1e-6)
+
+    audio2, buffer2 = decode_into(pcm[:8000].tobytes(), "pcm_s16le", 3.0, buffer)
+    assert buffer2 is buffer and len(audio2) == 8000
+
+
+def test_downsampled_mulaw_transport():
+    """브라우저에서 16kHz μ-law 로 보낸 청크도 Finished 에 도달 (서버 리샘플링 생략)"""
+    responses = _stream_until_finished(rate=16000, codec="mulaw")
+    assert responses[-1]["text"] == FAKE_TEXT
+
+
+def test_mulaw_decode_matches_pcm():
+    """μ-law 디코딩 결과가 원본 PCM 과 양자화 오차 범위 안에서 일치, 모르는 codec 은 400"""
+    from audio_codec import decode_chunk
+
+    pcm = (np.sin(np.linspace(0, 200, 8000)) * 20000).astype(np.int16)
+    decoded = decode_chunk(mulaw_encode(pcm).tobytes(), "mulaw")
+    original = pcm.astype(np.float32) / 32768.0
+    assert decoded.dtype == np.float32
+    assert np.max(np.abs(decoded - original)) < 0.02
+
+    resp = _ingest(_start_session(), pcm.tobytes(), codec="opus")
+    assert resp.status_code == 400
+
+
+def test_partial_transcripts_during_speech():
+    """중간 전사 모드에서는 Speech 응답에 partial_text 가 실리고, 최종 텍스트는 중간 전사 결과를 재사용"""
+    from stt_executor import PRIORITY_FINAL
+
+    engine = main.engine
+    transcribe = engine.transcribe
+    calls = []
+
+    async def recording_transcribe(audio, started_at=None, kind=PRIORITY_FINAL, reserved=False):
+        text = await transcribe(audio, started_at, kind=kind, reserved=reserved)
+        calls.append((kind, text))
+        return text
+
+    # fake 백엔드가 오디오 길이로 결과를 만들도록 해서 전사마다 텍스트가 달라지게 함
+    fake_text, engine.stt_backend.text = engine.stt_backend.text, ""
+    partial_interval, main.STT_CONFIG.PARTIAL_INTERVAL = main.STT_CONFIG.PARTIAL_INTERVAL, 1
+    main.STT_CONFIG.PARTIAL_TRANSCRIPTS = True
+    engine.transcribe = recording_transcribe
+    try:
+        responses = _stream_until_finished()
+    finally:
+        del engine.transcribe
+        main.STT_CONFIG.PARTIAL_TRANSCRIPTS = False
+        main.STT_CONFIG.PARTIAL_INTERVAL = partial_interval
+        engine.stt_backend.text = fake_text
+
+    partial_texts = [r["partial_text"] for r in responses if r["status"] == "Speech" and r["partial_text"]]
+    assert partial_texts, "발화 도중 partial_text 가 한 번도 오지 않음"
+
+    final_text = responses[-1]["text"]
+    assert final_text is not None
+    assert all(kind != PRIORITY_FINAL for kind, _ in calls), "최종 전사를 다시 실행함 (중간 전사 미재사용)"
+    assert final_text in [text for _, text in calls]
+    # 발화 종료 시 확보한 최종 전사 자리는 중간 전사를 재사용했으므로 반납됨
+    assert engine.executor.pending == 0
+
+
+def test_adaptive_endpointing_hang_time():
+    """적응형 종료 감지: 확률이 급격히 떨어지면 MIN_HANG_MS, 천천히 떨어지면 MAX_HANG_MS 후 종료"""
+    from judge_config import AudioConfig
+    from streaming_engine import _AdaptiveEndpointDetection
+
+    config = AudioConfig(VAD_THRESHOLD=0.6, MIN_HANG_MS=300, MAX_HANG_MS=800, FAST_DROP_DELTA=0.6)
+    chunk = np.zeros(8000, dtype=np.float32)   # 0.5초 = 프레임 16개 (16번째는 패딩)
+
+    detector = _AdaptiveEndpointDetection(config)
+    assert detector([0.95] * 16, chunk)["status"] == "Speech"
+    result = detector([0.95] * 4 + [0.02] * 12, chunk)
+    assert result["status"] == "Finished"
+    assert len(result["audio"]) == 16000
+
+    detector = _AdaptiveEndpointDetection(config)
+    assert detector([0.95] * 16, chunk)["status"] == "Speech"
+    assert detector([0.95] * 4 + [0.4] * 12, chunk)["status"] == "Speech"
+    assert detector([0.4] * 16, chunk)["status"] == "Finished"
+
+
+def test_adaptive_endpointing_reaches_finished():
+    """적응형 종료 감지 모드로도 실제 발화가 Finished 에 도달"""
+    main.AUDIO_CONFIG.ENDPOINTING = "adaptive"
+    try:
+        responses = _stream_until_finished()
+    finally:
+        main.AUDIO_CONFIG.ENDPOINTING = "chunk"
+    assert responses[-1]["text"] == FAKE_TEXT
+
+
+def test_vad_state_kept_per_session():
+    """세션별 VAD 상태: 두 세션의 청크를 번갈아 넣어도 각 세션을 한 번에 처리한 확률과 같음"""
+    from streaming_engine import VAD_FRAME_SAMPLES, VADStream
+
+    vad = main.engine.vad
+    rng = np.random.default_rng(0)
+    audios = [rng.uniform(-0.3, 0.3, 8000 * 3).astype(np.float32) for _ in range(2)]
+    expected = [vad.frame_probabilities(audio[:len(audio) // VAD_FRAME_SAMPLES * VAD_FRAME_SAMPLES])
+                for audio in audios]
+
+    streams = [VADStream(), VADStream()]
+    probs = [[], []]
+    for start in range(0, 8000 * 3, 8000):     # 0.5초 청크 (512 로 나누어떨어지지 않음)
+        for index, audio in enumerate(audios):
+            probs[index].extend(vad.frame_probabilities(audio[start:start + 8000], streams[index]))
+    for index in range(2):
+        assert np.allclose(probs[index], expected[index], atol=1e-5)
+
+
+def test_stream_state_kept_after_finished():
+    """Finished 뒤에도 세션의 스트림 상태(VAD 상태, scratch 버퍼)는 유지하고 발화 버퍼만 비움"""
+    for wav_path in _archived_wavs():
+        session_id = _start_session()
+        stream = None
+        for chunk in _to_client_chunks(wav_path):
+            status = _ingest(session_id, chunk).json()["status"]
+            stream = stream or main.session_registry.get(session_id).stream
+            if status in ("Finished", "Error"):
+                break
+        if status == "Finished":
+            break
+    else:
+        raise AssertionError("어떤 아카이브 파일에서도 Finished 상태에 도달하지 못했습니다")
+
+    assert main.session_registry.get(session_id).stream is stream
+    assert stream.buffered_bytes == 0 and not stream.is_recording
+
+    # 다음 발화도 같은 스트림 상태로 이어서 처리
+    assert _ingest(session_id, _to_client_chunks(wav_path)[0]).status_code == 200
+    assert main.session_registry.get(session_id).stream is stream
+
+
+def test_stats_and_idle_expiry():
+    """/stats 에 세션이 보이고, 유휴 TTL 이 지나면 정리된 뒤 400 으로 거부"""
+    before = client.get("/stats").json()["active_sessions"]
+    session_id = _start_session()
+    stats = client.get("/stats").json()
+    assert stats["active_sessions"] == before + 1
+    # 세션 ID 는 /ingest-chunk 인증 수단이므로 /stats 에 노출하지 않음
+    assert session_id not in json.dumps(stats)
+
+    registry = main.session_registry
+    idle_ttl, registry.idle_ttl = registry.idle_ttl, 0
+    try:
+        assert registry.sweep() >= 1
+    finally:
+        registry.idle_ttl = idle_ttl
+
+    assert session_id not in registry
+    assert _ingest(session_id, b"\x00\x00" * 100).status_code == 400
+
+
+def test_session_capacity_returns_busy():
+    """검증 직후 만료된 세션을 다시 등록할 자리가 없으면 500 이 아니라 503 + Retry-After"""
+    session_id = _start_session()
+    registry = main.session_registry
+    get = registry.get
+    seen = []
+
+    def expiring_get(sid):
+        # 첫 조회(세션 검증)만 성공, 이후 _session_with_stream 에서는 만료된 것처럼 None
+        seen.append(sid)
+        return get(sid) if len(seen) == 1 else None
+
+    capacity, registry.capacity = registry.capacity, 0
+    registry.get = expiring_get
+    try:
+        resp = _ingest(session_id, b"\x00\x00" * 100)
+    finally:
+        del registry.get
+        registry.capacity = capacity
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+def test_stt_executor_priority_and_busy():
+    """STT 실행기: 먼저 시작된 발화부터 처리하고, 대기열이 가득 차면 STTBusyError"""
+    from stt_backend import STTBusyError
+    from stt_executor import STTExecutor
+
+    executor = STTExecutor(workers=1, max_pending=3)
+    gate = threading.Event()
+    order = []
+
+    async def scenario():
+        blocker = asyncio.create_task(executor.run(gate.wait))  # 워커 하나를 점유
+        await asyncio.sleep(0.05)
+        jobs = [
+            asyncio.create_task(executor.run(order.append, started_at, started_at=started_at))
+            for started_at in (3.0, 1.0, 2.0)
+        ]
+        await asyncio.sleep(0.05)
+        try:
+            await executor.run(order.append, 0.0)
+            raise AssertionError("대기열이 가득 찼는데 작업이 접수됨")
+        except STTBusyError:
+            pass
+        gate.set()
+        await asyncio.gather(blocker, *jobs)
+
+    asyncio.run(scenario())
+    executor.shutdown()
+    assert order == [1.0, 2.0, 3.0]
+    assert executor.stats()["rejected_total"] == 1
+
+
+def test_stt_executor_counts_failures_and_reservations():
+    """STT 실행기: 실패한 작업은 completed 가 아닌 failed 로 집계, reserve 한 자리는 run(reserved=True) 로 사용"""
+    from stt_executor import STTExecutor
+
+    executor = STTExecutor(workers=1, max_pending=1)
+
+    def fail():
+        raise RuntimeError("stt down")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await executor.run(fail)
+        assert executor.reserve()
+        assert not executor.reserve()
+        assert await executor.run(len, "abc", reserved=True) == 3
+
+    asyncio.run(scenario())
+    executor.shutdown()
+    stats = executor.stats()
+    assert (stats["completed_total"], stats["failed_total"], stats["rejected_total"]) == (1, 1, 1)
+    assert stats["pending"] == 0
+
+
+def test_stt_executor_survives_closed_loop():
+    """요청한 이벤트 루프가 먼저 닫혀도 워커 스레드는 죽지 않고 다음 작업을 처리"""
+    from stt_executor import STTExecutor
+
+    executor = STTExecutor(workers=1, max_pending=2)
+    started, unblock = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        unblock.wait(5)
+        return "late"
+
+    async def abandon():
+        task = asyncio.create_task(executor.run(slow))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+
+    asyncio.run(abandon())           # 작업이 끝나기 전에 루프 종료
+    unblock.set()
+
+    async def next_job():
+        return await asyncio.wait_for(executor.run(len, "abc"), timeout=5)
+
+    assert asyncio.run(next_job()) == 3
+    executor.shutdown()
+    assert executor.stats()["completed_total"] == 2
+
+
+def test_ingest_holds_utterance_when_stt_queue_full():
+    """STT 대기열이 가득 차도 발화 중 청크는 처리, 발화 종료 청크만 503 Busy 후 다음 청크에서 같은 발화를 전사"""
+    max_pending = main.stt_executor.max_pending
+    for wav_path in _archived_wavs():
+        session_id = _start_session()
+        chunks = iter(_to_client_chunks(wav_path))
+        statuses = []
+        main.stt_executor.max_pending = 0
+        try:
+            for chunk in chunks:
+                resp = _ingest(session_id, chunk)
+                statuses.append(resp.json()["status"])
+                if resp.status_code == 503:
+                    assert resp.json()["status"] == "Busy"
+                    assert resp.headers["Retry-After"] == "1"
+                    break
+                assert resp.status_code == 200
+        finally:
+            main.stt_executor.max_pending = max_pending
+        if statuses[-1] != "Busy":
+            continue
+
+        assert "Speech" in statuses
+        body = _ingest(session_id, next(chunks)).json()
+        assert body == {"status": "Finished", "text": FAKE_TEXT}
+        assert client.get("/stats").json()["stt"]["pending"] == 0
+        return
+    raise AssertionError("어떤 아카이브 파일에서도 발화 종료(Busy)에 도달하지 못했습니다")
+
+
+def test_archive_batches_flac_with_retention():
+    """아카이브: 날짜별 디렉토리에 FLAC 저장 + manifest 기록, 용량 제한을 넘으면 오래된 것부터 삭제"""
+    from archive import AudioArchive
+
+    root = Path(tempfile.mkdtemp(prefix="judge_archive_"))
+    archive = AudioArchive(root, fmt="flac", batch_size=4, flush_interval=0.1, retention_interval=3600)
+    audio = (np.sin(np.linspace(0, 2000, 16000 * 2)) * 0.3).astype(np.float32)
+    for i in range(3):
+        assert archive.submit(f"session-{i}", audio, 16000, text=f"발화 {i}")
+    archive.flush()
+
+    with open(root / "manifest.jsonl", "r", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert [entry["text"] for entry in entries] == ["발화 0", "발화 1", "발화 2"]
+    flac_path = root / entries[0]["path"]
+    assert flac_path.suffix == ".flac" and len(flac_path.parts) >= 4
+    assert entries[0]["bytes"] < len(audio) * 2   # 16bit PCM 보다 작아야 함
+
+    archive.max_total_bytes = entries[-1]["bytes"]
+    assert archive.stats()["bytes"] == sum(entry["bytes"] for entry in entries)
+    assert archive.apply_retention() == 2
+    assert not flac_path.exists()
+    assert archive.stats()["files"] == 1
+    assert archive.stats()["bytes"] == entries[-1]["bytes"]
+
+    # 재시작하면 manifest 에서 같은 목록 / 용량을 다시 계산
+    reloaded = AudioArchive(root, fmt="flac", retention_interval=3600)
+    assert (reloaded.stats()["files"], reloaded.stats()["bytes"]) == (1, entries[-1]["bytes"])
+
+
+def test_archive_writer_survives_batch_error():
+    """아카이브: 배치 저장 중 예외가 나도 writer 스레드가 살아 있고 flush() 가 끝나야 함"""
+    from archive import AudioArchive
+
+    root = Path(tempfile.mkdtemp(prefix="judge_archive_"))
+    archive = AudioArchive(root, fmt="flac", batch_size=1, flush_interval=0.1, retention_interval=3600)
+    write_batch = archive._write_batch
+    calls = []
+
+    def failing_once(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise OSError("manifest 기록 실패")
+        write_batch(batch)
+
+    archive._write_batch = failing_once
+    audio = np.zeros(1600, dtype=np.float32)
+    archive.submit("session-fail", audio, 16000)
+    archive.flush()
+    archive.submit("session-ok", audio, 16000)
+    archive.flush()
+
+    stats = archive.stats()
+    assert (stats["failed_total"], stats["written_total"]) == (1, 1)
+
+
+def test_encode_wav_roundtrip():
+    """메모리 WAV 인코딩 결과를 다시 읽으면 같은 길이/샘플레이트"""
+    from stt_backend import encode_wav
+
+    audio = np.sin(np.linspace(0, 100, 16000, dtype=np.float32)) * 0.5
+    info = sf.info(io.BytesIO(encode_wav(audio, 16000)))
+    assert info.samplerate == 16000
+    assert info.frames == len(audio)
+
+
+if __name__ == "__main__":
+    tests = [
+        test_invalid_session_rejected,
+        test_chunk_as_form_string_rejected,
+        test_file_mode_uses_stt_backend,
+        test_chunk_mode_reaches_finished,
+        test_raw_octet_stream_fast_path,
+        test_decode_into_reuses_buffer,
+        test_downsampled_mulaw_transport,
+        test_mulaw_decode_matches_pcm,
+        test_partial_transcripts_during_speech,
+        test_adaptive_endpointing_hang_time,
+        test_adaptive_endpointing_reaches_finished,
+        test_vad_state_kept_per_session,
+        test_stream_state_kept_after_finished,
+        test_stats_and_idle_expiry,
+        test_session_capacity_returns_busy,
+        test_stt_executor_priority_and_busy,
+        test_stt_executor_counts_failures_and_reservations,
+        test_stt_executor_survives_closed_loop,
+        test_ingest_holds_utterance_when_stt_queue_full,
+        test_archive_batches_flac_with_retention,
+        test_archive_writer_survives_batch_error,
+        test_encode_wav_roundtrip,
+    ]
+    failed = 0
+    runner = _open_client()
+    next(runner)
+    for test in tests:
+        print("\n" + "=" * 60)
+        print(f"🧪 {test.__doc__}")
+        print("=" * 60)
+        try:
+            test()
+            print("✅ 통과")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ 실패: {e}")
+
+    runner.close()
+    print(f"\n🏁 {len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
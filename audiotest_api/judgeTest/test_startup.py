@@ -0,0 +1,130 @@
+"""
+판단 서버 시작 시간 테스트
+main 모듈 import 가 무거운 라이브러리를 불러오지 않고 예산 안에 끝나는지, background warm-up 뒤 /ready 가 되는지 검증합니다.
+(새 인터프리터에서 측정하므로 다른 테스트가 이미 import 한 모듈의 영향을 받지 않습니다)
+
+실행:
+    python test_startup.py
+    또는 pytest test_startup.py
+
+예산 조정:
+    JUDGE_IMPORT_BUDGET=2.5 python test_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE = Path(__file__).parent
+sys.path.insert(0, str(BASE))
+
+IMPORT_BUDGET_SECONDS = float(os.getenv("JUDGE_IMPORT_BUDGET", "1.5"))
+READY_TIMEOUT = 60.0
+# warm-up 전에는 import 되면 안 되는 모듈
+HEAVY_MODULES = ("torch", "silero_vad", "librosa", "soundfile", "openai", "faster_whisper")
+_tmp_dir = tempfile.mkdtemp(prefix="judge_startup_")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "heavy": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def _write_config(backend: str = "fake") -> str:
+    with open(BASE / "config.json", "r", encoding="utf-8") as f:
+        config_data = json.load(f)
+    config_data["stt"] = {"backend": backend}
+    config_data.setdefault("paths", {})["archive_dir"] = str(Path(_tmp_dir) / "audio_data")
+    config_data.setdefault("server", {})["warmup"] = "background"
+
+    config_path = Path(_tmp_dir) / f"config_{backend}.json"
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config_data, f, ensure_ascii=False)
+    return str(config_path)
+
+
+def _slowest_imports(importtime_log: str, limit: int = 10) -> str:
+    """-X importtime 출력에서 누적 시간이 큰 모듈 (실패 메시지용)"""
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return "\n".join(f"  {us / 1000:8.1f} ms  {name}" for us, name in rows[:limit])
+
+
+def _profile_import(backend: str) -> tuple:
+    env = dict(os.environ, JUDGE_CONFIG=_write_config(backend))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE],
+        cwd=BASE, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def test_import_skips_heavy_modules():
+    """main import 시 torch / silero / librosa / soundfile / openai 를 불러오지 않음"""
+    for backend in ("fake", "openai"):
+        result, log = _profile_import(backend)
+        assert not result["heavy"], f"{backend}: import 시점에 로드됨 {result['heavy']}\n{_slowest_imports(log)}"
+
+
+def test_import_within_budget():
+    """main import 가 시간 예산 안에 끝남"""
+    result, log = _profile_import("fake")
+    print(f"⏱️ import main: {result['seconds']:.3f}초 (예산 {IMPORT_BUDGET_SECONDS}초)")
+    assert result["seconds"] <= IMPORT_BUDGET_SECONDS, (
+        f"import main {result['seconds']:.2f}초 > 예산 {IMPORT_BUDGET_SECONDS}초\n{_slowest_imports(log)}"
+    )
+
+
+def test_ready_after_background_warm_up():
+    """background warm-up: 기동 직후에는 /ready 가 503 일 수 있고, 모델 로드 후 200 + /start 가능"""
+    os.environ["JUDGE_CONFIG"] = _write_config("fake")
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as client:
+        deadline = time.monotonic() + READY_TIMEOUT
+        resp = client.get("/ready")
+        while resp.status_code != 200 and time.monotonic() < deadline:
+            assert resp.json()["stage"] != "failed", resp.json()["error"]
+            time.sleep(0.1)
+            resp = client.get("/ready")
+
+        assert resp.status_code == 200
+        assert resp.json()["warmup_seconds"] is not None
+        assert client.post("/start").status_code == 200
+
+
+if __name__ == "__main__":
+    tests = [
+        test_import_skips_heavy_modules,
+        test_import_within_budget,
+        test_ready_after_background_warm_up,
+    ]
+    failed = 0
+    for test in tests:
+        print("\n" + "=" * 60)
+        print(f"🧪 {test.__doc__}")
+        print("=" * 60)
+        try:
+            test()
+            print("✅ 통과")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ 실패: {e}")
+
+    print(f"\n🏁 {len(tests) - failed}/{len(tests)} 통과")
+    sys.exit(1 if failed else 0)
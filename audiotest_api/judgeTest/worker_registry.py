@@ -0,0 +1,248 @@
+"""
+worker_registry.py - 판단 서버 스케일아웃 (워커 레지스트리 + 세션 어피니티 라우팅)
+
+- 판단 서버 워커는 시작할 때 공유 SQLite 레지스트리에 (worker_id, base_url)을 등록하고 주기적으로 heartbeat 를 남깁니다.
+- 프록시(front.py, audioTest/app.py)는 살아있는 워커 중 하나를 골라 새 세션을 배치하고,
+  워커는 세션 ID 앞에 자신의 worker_id 를 샤드 태그로 붙입니다.
+- 프록시는 레지스트리를 백그라운드 task 에서 주기적으로 읽어 두므로 요청 처리 중에는 SQLite 를 읽지 않습니다.
+- 기존 세션은 샤드 태그(= 소유 워커 ID)로 직접 찾으므로, 워커가 추가/제거되거나 heartbeat 가 잠깐 끊겨도
+  세션이 StreamState 가 없는 다른 워커로 옮겨가지 않습니다.
+
+세션 ID 형식: "{worker_id}.{uuid4}"  (샤드 태그가 없는 예전 uuid4 세션 ID 만 consistent hash ring 으로 해싱)
+
+표준 라이브러리만 사용하므로 프록시 쪽에서도 무거운 의존성 없이 import 할 수 있습니다.
+"""
+import asyncio
+import bisect
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, Optional, Tuple
+from uuid import uuid4
+
+SHARD_SEPARATOR = "."
+# 샤드 태그 / 워커 ID 에 쓸 수 있는 문자 (구분자 "." 는 허용하지 않음)
+SHARD_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class NoWorkerError(Exception):
+    """레지스트리에 살아있는 판단 서버 워커가 없음"""
+
+
+class InvalidShardError(ValueError):
+    """샤드 태그 / 워커 ID 형식이 올바르지 않음"""
+
+
+# ========== 세션 ID / 샤드 태그 ==========
+def new_shard_tag() -> str:
+    """새 세션용 샤드 태그 생성"""
+    return uuid4().hex[:8]
+
+
+def validate_shard(shard: str) -> str:
+    """샤드 태그 형식 검사 (영문/숫자/-/_ 1~64자), 올바르지 않으면 InvalidShardError"""
+    if not isinstance(shard, str) or not SHARD_PATTERN.match(shard):
+        raise InvalidShardError(f"잘못된 샤드 태그: {shard!r} (영문/숫자/-/_ 1~64자)")
+    return shard
+
+
+def make_session_id(shard: Optional[str] = None) -> str:
+    """샤드 태그를 붙인 세션 ID 생성"""
+    if shard:
+        validate_shard(shard)
+    session_id = str(uuid4())
+    return f"{shard}{SHARD_SEPARATOR}{session_id}" if shard else session_id
+
+
+def parse_shard(session_id: str) -> Optional[str]:
+    """세션 ID 에서 샤드 태그 추출 (없으면 None)"""
+    if SHARD_SEPARATOR not in session_id:
+        return None
+    return session_id.split(SHARD_SEPARATOR, 1)[0]
+
+
+# ========== 워커 레지스트리 ==========
+class WorkerRegistry:
+    """
+    SQLite 파일 기반 공유 워커 레지스트리
+    같은 머신의 여러 프로세스(워커, 프록시)가 같은 파일을 바라봅니다.
+
+    Attributes:
+        db_path: 레지스트리 SQLite 파일 경로
+        worker_ttl: 이 시간(초) 동안 heartbeat 가 없으면 죽은 워커로 간주
+    """
+    def __init__(self, db_path: str, worker_ttl: float = 15.0):
+        self.db_path = str(db_path)
+        self.worker_ttl = worker_ttl
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS workers ("
+                " worker_id TEXT PRIMARY KEY,"
+                " base_url TEXT NOT NULL,"
+                " pid INTEGER,"
+                " last_heartbeat REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5.0)
+
+    def register(self, worker_id: str, base_url: str):
+        """워커 등록 (이미 있으면 주소/heartbeat 갱신), worker_id 는 세션 ID 의 샤드 태그로 쓰이므로 형식 검사"""
+        validate_shard(worker_id)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO workers (worker_id, base_url, pid, last_heartbeat) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(worker_id) DO UPDATE SET"
+                " base_url = excluded.base_url, pid = excluded.pid, last_heartbeat = excluded.last_heartbeat",
+                (worker_id, base_url, os.getpid(), time.time()),
+            )
+
+    def unregister(self, worker_id: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+
+    def live_workers(self) -> Dict[str, str]:
+        """살아있는 워커 목록 {worker_id: base_url}"""
+        deadline = time.time() - self.worker_ttl
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT worker_id, base_url FROM workers WHERE last_heartbeat >= ? ORDER BY worker_id",
+                (deadline,),
+            ).fetchall()
+        return dict(rows)
+
+    def snapshot(self) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """(살아있는 워커, 등록된 모든 워커) {worker_id: base_url} 를 한 번의 조회로 반환"""
+        deadline = time.time() - self.worker_ttl
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT worker_id, base_url, last_heartbeat FROM workers ORDER BY worker_id"
+            ).fetchall()
+        live = {worker_id: url for worker_id, url, heartbeat in rows if heartbeat >= deadline}
+        return live, {worker_id: url for worker_id, url, _ in rows}
+
+    def worker_url(self, worker_id: str) -> Optional[str]:
+        """등록된 워커의 base_url (heartbeat 만료 여부와 무관, 등록 해제됐으면 None)"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT base_url FROM workers WHERE worker_id = ?", (worker_id,)).fetchone()
+        return row[0] if row else None
+
+
+# ========== Consistent Hashing ==========
+class ConsistentHashRing:
+    """
+    가상 노드(replicas)를 사용하는 consistent hash ring
+    워커가 추가/제거되어도 다른 워커가 소유한 샤드는 그대로 유지됩니다.
+    """
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64):
+        self.replicas = replicas
+        points = []
+        for node in nodes:
+            for i in range(replicas):
+                points.append((self._hash(f"{node}#{i}"), node))
+        points.sort()
+        self._keys = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    def __len__(self) -> int:
+        return len(set(self._nodes))
+
+    def get(self, key: str) -> str:
+        """key 를 소유한 노드 반환"""
+        if not self._keys:
+            raise NoWorkerError("등록된 판단 서버 워커가 없습니다")
+        index = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._nodes[index]
+
+
+# ========== 프록시용 라우터 ==========
+class ShardRouter:
+    """
+    프록시에서 사용하는 세션 라우터
+
+    - 새 세션: 살아있는 워커 중 무작위로 골라 그 worker_id 를 샤드 태그로 사용 (/start?shard=worker_id)
+    - 기존 세션: 세션 ID 의 샤드 태그(worker_id)로 직접 조회
+      (heartbeat 가 잠깐 늦은 워커도 등록 해제 전까지는 그대로 사용)
+
+    lifespan 안에서는 레지스트리를 refresh_interval 마다 스레드에서 읽어 캐시하고, 라우팅은 캐시만 봅니다.
+    lifespan 없이 쓰면 (테스트 / CLI) 캐시가 refresh_interval 보다 오래됐을 때 그 자리에서 다시 읽습니다.
+    """
+    def __init__(self, registry: WorkerRegistry, refresh_interval: float = 2.0):
+        self.registry = registry
+        self.refresh_interval = refresh_interval
+        self._workers: Dict[str, str] = {}       # 살아있는 워커
+        self._registered: Dict[str, str] = {}    # 등록된 모든 워커 (heartbeat 만료 포함)
+        self._ring = ConsistentHashRing()        # 샤드 태그가 없는 예전 세션 ID 용
+        self._refreshed_at = 0.0
+        self._background = False
+
+    def _refresh(self):
+        live, registered = self.registry.snapshot()
+        if live != self._workers:
+            self._ring = ConsistentHashRing(live.keys())
+        self._workers, self._registered = live, registered
+        self._refreshed_at = time.monotonic()
+
+    def _current(self, force: bool = False) -> Tuple[ConsistentHashRing, Dict[str, str]]:
+        if not self._background and (force or time.monotonic() - self._refreshed_at >= self.refresh_interval):
+            self._refresh()
+        return self._ring, self._workers
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await asyncio.to_thread(self._refresh)
+            except Exception as e:
+                # 레지스트리를 읽지 못하면 마지막으로 읽은 워커 목록으로 계속 라우팅
+                print(f"⚠️ 워커 레지스트리 갱신 실패: {e}")
+
+    @asynccontextmanager
+    async def lifespan(self, app=None):
+        """FastAPI lifespan 용: 레지스트리 백그라운드 갱신 (요청 처리 중 SQLite 조회 없음)"""
+        await asyncio.to_thread(self._refresh)
+        self._background = True
+        task = asyncio.create_task(self._refresh_loop())
+        try:
+            yield
+        finally:
+            task.cancel()
+            self._background = False
+
+    def route_new_session(self) -> Tuple[str, str]:
+        """새 세션의 (샤드 태그 = 배치할 worker_id, 워커 base_url) 결정"""
+        _, workers = self._current()
+        if not workers:
+            raise NoWorkerError("레지스트리에 살아있는 판단 서버 워커가 없습니다")
+        worker_id = random.choice(list(workers))
+        return worker_id, workers[worker_id]
+
+    def route_shard(self, shard: str) -> str:
+        """샤드 태그(worker_id)를 소유한 워커의 base_url"""
+        validate_shard(shard)
+        _, workers = self._current()
+        url = workers.get(shard) or self._registered.get(shard)
+        if url is None and not self._background:
+            # 캐시 이후에 등록된 워커일 수 있으므로 한 번 다시 조회
+            _, workers = self._current(force=True)
+            url = workers.get(shard) or self._registered.get(shard)
+        if url is None:
+            raise NoWorkerError(f"세션을 소유한 워커가 없습니다: {shard}")
+        return url
+
+    def route(self, session_id: str) -> str:
+        """세션 ID 를 소유한 워커의 base_url (샤드 태그가 없는 예전 세션 ID 는 ring 으로 해싱)"""
+        shard = parse_shard(session_id)
+        if shard is not None:
+            return self.route_shard(shard)
+        ring, workers = self._current()
+        return workers[ring.get(session_id)]
@@ -5,6 +5,8 @@ from fastapi import FastAPI, HTTPException, Depends, Form
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import httpx
+import asyncio
+from itertools import zip_longest
 from datetime import datetime
 import time
 from typing import List, Optional
@@ -30,6 +32,7 @@ TTOT_BASE_URL = "http://localhost:8002"
 # TTOT_BASE_URL = "https://192.168.0.37:8002"
 TTS_BASE_URL = "http://localhost:8004"
 # TTS_BASE_URL = "https://192.168.0.37:8004"
+TTOT_FETCH_CONCURRENCY = 8  # /users 에서 ttot 대화 기록을 동시에 조회할 최대 요청 수
 
 # ✅ CORS 설정 추가
 app.add_middleware(
@@ -128,6 +131,7 @@ class UserDB(Base):
     id = Column(String, primary_key=True, index=True, unique=True)
     uuid = Column(Integer, index=True)
     room_id = Column(String, index=True)
+    # 채팅 텍스트는 ttot 대화 저장소에만 저장 (fetch_conversation), 아래 두 컬럼은 이전 기록 조회용
     input_text_list = Column(JSON, index=True)       # 텍스트 입력 (채팅)
     output_text_list = Column(JSON, index=True)      # 텍스트 출력 (답변)
     input_wav_list = Column(JSON, index=True)        # 오디오 입력 경로
@@ -142,6 +146,8 @@ class UserData(BaseModel):
     input_text_list: Optional[List[Optional[str]]] = []
     output_text_list: Optional[List[Optional[str]]] = []
     output_wav_list: Optional[List[Optional[str]]] = []
+    # ttot 대화 기록 조회 실패 사유 (실패하면 대화 텍스트는 DB 의 이전 기록만)
+    conversation_error: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -165,6 +171,66 @@ def get_db():
     finally:
         db.close()
 
+def merge_conversation(user: Optional[UserDB], turns: list):
+    """
+    DB 에 남은 이전 기록(input_text_list / output_text_list) 뒤에 ttot 기록을 이어붙임
+    이전에는 같은 턴이 DB 와 ttot 양쪽에 저장됐으므로, ttot 앞부분이 DB 끝부분과 겹치면 한 번만 포함
+    """
+    legacy = list(zip_longest(user.input_text_list or [], user.output_text_list or [])) if user else []
+    recent = [(turn["human"], turn["ai"]) for turn in turns]
+    overlap = next(
+        (k for k in range(min(len(legacy), len(recent)), 0, -1) if legacy[-k:] == recent[:k]),
+        0
+    )
+    merged = legacy + recent[overlap:]
+    return [human for human, _ in merged], [ai for _, ai in merged]
+
+async def fetch_conversation(user_id: str, user: Optional[UserDB] = None,
+                             client: Optional[httpx.AsyncClient] = None):
+    """
+    사용자의 대화 텍스트 조회: DB 의 이전 기록 + ttot 대화 저장소 (대화 1턴은 ttot /generate 가 한 번만 저장)
+    ttot 조회에 실패하면 이전 기록만 보여주지 않고 502 로 알림
+
+    Args:
+        client: 재사용할 AsyncClient (없으면 이번 조회용으로 생성)
+
+    Returns:
+        (input_text_list, output_text_list)
+    """
+    try:
+        if client is None:
+            async with httpx.AsyncClient(timeout=10.0) as own_client:
+                response = await own_client.get(f"{TTOT_BASE_URL}/conversation/{user_id}")
+        else:
+            response = await client.get(f"{TTOT_BASE_URL}/conversation/{user_id}")
+        response.raise_for_status()
+        turns = response.json()["turns"]
+    except Exception as e:
+        print(f"❌ ttot 대화 기록 조회 실패 ({user_id}): {str(e)}")
+        raise HTTPException(status_code=502, detail=f"ttot 대화 기록 조회 실패 ({user_id}): {str(e)}")
+
+    return merge_conversation(user, turns)
+
+async def user_to_dict(user: UserDB, client: Optional[httpx.AsyncClient] = None,
+                       conversation_error: Optional[str] = None):
+    """
+    UserData 응답용 딕셔너리 (대화 텍스트는 DB 이전 기록 + ttot)
+    conversation_error 를 주면 ttot 를 조회하지 않고 DB 의 이전 기록 + 실패 사유로 채움
+    """
+    if conversation_error is None:
+        input_text_list, output_text_list = await fetch_conversation(user.id, user, client)
+    else:
+        input_text_list, output_text_list = merge_conversation(user, [])
+    return {
+        "id": user.id or "",
+        "uuid": user.uuid or 0,
+        "room_id": user.room_id or "default",
+        "input_text_list": input_text_list,
+        "output_text_list": output_text_list,
+        "output_wav_list": user.output_wav_list or [],
+        "conversation_error": conversation_error
+    }
+
 # back.py에 추가 (line 113 이전에 추가)
 
 class LoginRequest(BaseModel):
@@ -216,16 +282,24 @@ async def authenticate_login(payload: LoginRequest, db: Session = Depends(get_db
         db.refresh(db_user)
         print(f"✅ 로그인으로 새 사용자 생성: {user_info['id']} (UUID: {user_info['uuid']})")
         
+    # 대화 기록을 불러오지 못해도 로그인은 성공, 실패 사유는 message 로 알림
+    message = "로그인 성공"
+    try:
+        input_text_list, output_text_list = await fetch_conversation(db_user.id, db_user)
+    except HTTPException as e:
+        input_text_list, output_text_list = [], []
+        message = f"로그인 성공 (대화 기록을 불러오지 못했습니다: {e.detail})"
+
     # 4️⃣ 응답 반환
     return LoginResponse(
         success=True,
-        message="로그인 성공",
+        message=message,
         user={
             "id": db_user.id,
             "uuid": db_user.uuid,
             "room_id": db_user.room_id,
-            "input_text_list": db_user.input_text_list or [],
-            "output_text_list": db_user.output_text_list or [],
+            "input_text_list": input_text_list,
+            "output_text_list": output_text_list,
             "input_wav_list": db_user.input_wav_list or [],
             "atot_text_list": db_user.atot_text_list or [],
             "ttot_text_list": db_user.ttot_text_list or [],
@@ -248,7 +322,7 @@ class ConversationResponse(BaseModel):
 @app.get("/api/conversation/{user_id}", response_model=ConversationResponse)
 async def get_conversation(user_id: str, db: Session = Depends(get_db)):
     """
-    DB에서 사용자의 전체 대화 내역을 조회
+    DB 의 이전 기록 + ttot 대화 저장소의 전체 대화 내역 조회
     Returns:
         - input_text_list와 output_text_list를 순서대로 합친 대화 내역
     """
@@ -256,17 +330,8 @@ async def get_conversation(user_id: str, db: Session = Depends(get_db)):
     
     user = db.query(UserDB).filter(UserDB.id == user_id).first()
     
-    if not user:
-        # 사용자가 없으면 빈 대화 내역 반환
-        print(f"⚠️ 사용자 {user_id} 없음 - 빈 대화 내역 반환")
-        return ConversationResponse(
-            user_id=user_id,
-            conversation=[]
-        )
-    
     # input_text_list와 output_text_list를 순서대로 합치기
-    input_list = user.input_text_list if user.input_text_list else []
-    output_list = user.output_text_list if user.output_text_list else []
+    input_list, output_list = await fetch_conversation(user_id, user)
     
     print(f"📥 입력 메시지: {len(input_list)}개")
     print(f"📤 출력 메시지: {len(output_list)}개")
@@ -336,14 +401,25 @@ async def get_users(db: Session=Depends(get_db)):
     """모든 사용자 조회"""
     try:
         users = db.query(UserDB).all()
-        # None 값을 빈 리스트로 안전하게 변환
-        for user in users:
-            user.id = user.id or ""
-            user.uuid = user.uuid or 0
-            user.room_id = user.room_id or "default"
-            user.input_text_list = user.input_text_list or []
-            user.output_text_list = user.output_text_list or []
-        return users
+        # None 값은 빈 값으로, 대화 텍스트는 ttot 연결 하나로 최대 TTOT_FETCH_CONCURRENCY 개씩 조회
+        semaphore = asyncio.Semaphore(TTOT_FETCH_CONCURRENCY)
+        limits = httpx.Limits(max_connections=TTOT_FETCH_CONCURRENCY)
+        async with httpx.AsyncClient(timeout=10.0, limits=limits) as client:
+            async def load(user):
+                async with semaphore:
+                    return await user_to_dict(user, client)
+
+            results = await asyncio.gather(*(load(user) for user in users), return_exceptions=True)
+
+        # 일부 사용자의 ttot 조회가 실패해도 전체 목록은 반환 (실패한 사용자는 DB 이전 기록 + 실패 사유)
+        user_list = []
+        for user, result in zip(users, results):
+            if isinstance(result, HTTPException):
+                result = await user_to_dict(user, conversation_error=result.detail)
+            elif isinstance(result, BaseException):
+                raise result
+            user_list.append(result)
+        return user_list
     except Exception as e:
         print(f"❌ /users 엔드포인트 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=f"사용자 조회 실패: {str(e)}")
@@ -353,21 +429,23 @@ async def get_user(uuid: int, db: Session=Depends(get_db)):
     user = db.query(UserDB).filter(UserDB.uuid==uuid).first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return await user_to_dict(user)
 
 @app.get('/users/{uuid}/input')
 async def upload_input(uuid: int, db: Session=Depends(get_db)):
     user = db.query(UserDB).filter(UserDB.uuid==uuid).first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return {"user_id": user.uuid, "input_text": user.input_text_list}
+    input_text_list, _ = await fetch_conversation(user.id, user)
+    return {"user_id": user.uuid, "input_text": input_text_list}
   
 @app.get('/users/{uuid}/output')
 async def get_user_output(uuid: int, db: Session=Depends(get_db)):
     user = db.query(UserDB).filter(UserDB.uuid==uuid).first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return {"user_id": user.uuid, "output_text": user.output_text_list}
+    _, output_text_list = await fetch_conversation(user.id, user)
+    return {"user_id": user.uuid, "output_text": output_text_list}
 
 voice_name_dict = {"0": "mb.wav", "1": "swingpark.wav", "2": "chulsoo.wav", "3": "jaemay.mp3", "4": "moon_short3.wav"}
 
@@ -383,7 +461,7 @@ async def run_text_pipeline(
     텍스트 기반 파이프라인 (front에서 채팅 메시지 처리용)
     1. 사용자가 입력한 텍스트 받기
     2. TTOT 서버에서 텍스트→텍스트 생성
-    3. DB에 저장
+    3. DB에 저장 (대화 텍스트는 ttot 가 /generate 에서 저장하므로 음성 경로만)
     
     Args:
         text: 사용자 입력 텍스트
@@ -548,10 +626,7 @@ async def run_text_pipeline(
         result["errors"].append(error_msg)
         return result
     
-    # DB에 저장
-    user.input_text_list = (user.input_text_list or []) + [SharedData.input_text or ""]
-    user.output_text_list = (user.output_text_list or []) + [SharedData.output_text or ""]
-    
+    # 대화 텍스트는 ttot 대화 저장소에 이미 저장됨 (여기서 다시 저장하지 않음)
     # output_wav 저장
     if output_filename:
         user.output_wav_list = (user.output_wav_list or []) + [output_filename]
@@ -588,7 +663,8 @@ async def get_users():
                 user_dict[user["uuid"]] = {
                     "uuid": user["uuid"],
                     "input_text_list": user["input_text_list"],
-                    "output_text_list": user["output_text_list"]
+                    "output_text_list": user["output_text_list"],
+                    "conversation_error": user.get("conversation_error")
                 }
             
             return user_dict
@@ -1,17 +1,35 @@
 # front.py
-from fastapi import FastAPI, UploadFile, Form
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 import requests
 import httpx
 import json
+import os
+
+from audiotest_api.audioTest.stream_proxy import StreamProxy
+from audiotest_api.judgeTest.worker_registry import InvalidShardError, NoWorkerError, ShardRouter, WorkerRegistry
+
+# 판단 서버 /ingest-chunk 스트리밍 패스스루 (연결 재사용, 앱 종료 시 정리)
+judge_proxy = StreamProxy(timeout=30.0)
+@asynccontextmanager
+async def lifespan(app):
+    """판단 서버 연결 정리 + 워커 레지스트리 백그라운드 갱신 (레지스트리를 쓰는 경우)"""
+    async with judge_proxy.lifespan(app):
+        if judge_router is None:
+            yield
+        else:
+            async with judge_router.lifespan(app):
+                yield
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # FRONT_BASE_URL = "http://localhost:3000"
 FRONT_BASE_URL = "https://192.168.0.37:3000"
@@ -94,6 +112,11 @@ JUDGE_BASE_URL = "http://127.0.0.1:8000"
 JUDGE_START = f"{JUDGE_BASE_URL}/start"
 JUDGE_INGEST_CHUNK = f"{JUDGE_BASE_URL}/ingest-chunk"
 
+# 판단 서버 스케일아웃: 워커 레지스트리 경로를 지정하면 세션별로 소유 워커에 라우팅
+# 예) JUDGE_REGISTRY_PATH=audiotest_api/judgeTest/workers.db
+JUDGE_REGISTRY_PATH = os.getenv("JUDGE_REGISTRY_PATH")
+judge_router = ShardRouter(WorkerRegistry(JUDGE_REGISTRY_PATH)) if JUDGE_REGISTRY_PATH else None
+
 USERDATA_PATH = Path("static/userdata.json")
 
 # 정적 파일 제공
@@ -309,8 +332,13 @@ async def start_audio_session():
         {"sessionId": "uuid-string"}
     """
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.post(JUDGE_START)
+        if judge_router is not None:
+            shard, worker_url = judge_router.route_new_session()
+            start_url, params = f"{worker_url}/start", {"shard": shard}
+        else:
+            start_url, params = JUDGE_START, None
+
+        resp = await judge_proxy.client.post(start_url, params=params, timeout=10.0)
 
         if resp.status_code == 200:
             return JSONResponse(resp.json(), status_code=200)
@@ -319,43 +347,49 @@ async def start_audio_session():
                 {"error": "Failed to create session"},
                 status_code=500,
             )
+    except NoWorkerError as e:
+        print("❌ 판단 서버 워커 없음:", e)
+        return JSONResponse({"error": str(e)}, status_code=503)
     except Exception as e:
         print("❌ 판단 서버 /start 통신 에러:", e)
         return JSONResponse({"error": str(e)}, status_code=500)
 
 @app.post("/ingest-chunk")
-async def ingest_chunk(
-        sessionId: str = Form(...),
-        chunk: UploadFile = Form(...),
-        mode: str = Form("chunk"),
-):
+async def ingest_chunk(request: Request):
     """
-    오디오 청크/파일 패스스루
-    Args:
-        sessionId: 세션 ID
-        chunk    : Raw PCM 청크 또는 WAV 파일
-        mode     : "chunk" (스트리밍) or "file" (파일 전사)
+    오디오 청크/파일 패스스루 (본문을 읽거나 다시 만들지 않고 판단 서버로 스트리밍)
+    요청 형식은 판단 서버 /ingest-chunk 와 같음
+        - application/octet-stream: 본문 = raw 청크, ?sessionId=&codec=&rate=
+        - multipart/form-data: sessionId, chunk, mode, codec, rate
+    스케일아웃 모드에서는 sessionId 를 쿼리(또는 X-Session-Id 헤더)로 받아 본문을 열지 않고 라우팅
     """
     try:
-        chunk_data = await chunk.read()
-
-        files = {
-            "chunk": (chunk.filename, chunk_data, "application/octet-stream")
-        }
-        data = {
-            "sessionId": sessionId,
-            "mode": mode,
-        }
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.post(
-                JUDGE_INGEST_CHUNK,
-                data=data,
-                files=files,
-            )
+        if judge_router is not None:
+            session_id = request.query_params.get("sessionId") or request.headers.get("x-session-id")
+            if not session_id:
+                return JSONResponse(
+                    {"status": "Error", "text": None,
+                     "detail": "sessionId query parameter (or X-Session-Id header) is required"},
+                    status_code=400,
+                )
+            ingest_url = f"{judge_router.route(session_id)}/ingest-chunk"
+        else:
+            ingest_url = JUDGE_INGEST_CHUNK
 
-        return JSONResponse(resp.json(), status_code=resp.status_code)
+        return await judge_proxy.forward(request, ingest_url)
 
+    except InvalidShardError as e:
+        # 세션 ID 의 샤드 태그 형식이 잘못됨 (/start 로 받은 세션 ID 가 아님)
+        return JSONResponse(
+            {"status": "Error", "text": None, "detail": str(e)},
+            status_code=400,
+        )
+    except NoWorkerError as e:
+        print("❌ 판단 서버 워커 없음:", e)
+        return JSONResponse(
+            {"status": "Error", "text": None, "detail": str(e)},
+            status_code=503,
+        )
     except Exception as e:
         print("❌ 판단 서버 /ingest-chunk 통신 에러:", e)
         return JSONResponse(
@@ -5,7 +5,16 @@
 // 역할: 마이크 입력을 받아서 0.5초 단위 청크로 만들어 전송
 // 
 // 데이터 흐름:
-// [마이크] → [AudioWorklet] → [청크 버퍼링] → [postMessage] → [HTML]
+// [마이크] → [AudioWorklet] → [(선택) 다운샘플링/μ-law 인코딩] → [청크 버퍼링] → [postMessage] → [HTML]
+//
+// 전송 모드 (processorOptions, 선택):
+//   new AudioWorkletNode(ctx, 'audio-stream-processor', {
+//     processorOptions: { codec: 'mulaw', targetRate: 16000 }
+//   })
+//   - codec: 'pcm_s16le' (기본, Int16 2바이트) | 'mulaw' (G.711 μ-law 1바이트)
+//   - targetRate: 전송 샘플레이트 (기본: 브라우저 sampleRate 그대로)
+//   예) 48kHz Int16 ≈ 96KB/s → 16kHz Int16 ≈ 32KB/s (3배) → 16kHz μ-law ≈ 16KB/s (6배)
+//   서버에는 청크와 함께 codec / rate 필드를 보내야 함 (scripts.js 참고)
 //
 // 주의사항:
 // - AudioWorklet은 별도 스레드에서 실행됨 (DOM 접근 불가)
@@ -13,24 +22,53 @@
 // - sampleRate는 AudioWorklet 전역 변수로 자동 제공됨
 // ============================================
 
+// ========================================
+// G.711 μ-law 인코딩 (Int16 → 8bit)
+// ========================================
+const MULAW_BIAS = 0x84;
+const MULAW_CLIP = 32635;
+
+function encodeMulaw(sample) {
+    const sign = (sample >> 8) & 0x80;
+    if (sign) sample = -sample;
+    if (sample > MULAW_CLIP) sample = MULAW_CLIP;
+    sample += MULAW_BIAS;
+
+    let exponent = 7;
+    for (let mask = 0x4000; (sample & mask) === 0 && exponent > 0; mask >>= 1) {
+        exponent--;
+    }
+    const mantissa = (sample >> (exponent + 3)) & 0x0F;
+    return ~(sign | (exponent << 4) | mantissa) & 0xFF;
+}
+
 class AudioStreamProcessor extends AudioWorkletProcessor {
-    constructor() {
+    constructor(options) {
         super();
         
         // ========================================
         // 설정값
         // ========================================
         // sampleRate: AudioWorklet 전역 변수 (브라우저 기본값, 보통 48000Hz)
-        // 서버에서 16kHz로 리샘플링하므로 여기선 원본 그대로 전송
+        // 기본값은 원본 그대로 전송 (서버에서 16kHz로 리샘플링)
+        const opts = (options && options.processorOptions) || {};
+        this.codec = opts.codec === 'mulaw' ? 'mulaw' : 'pcm_s16le';
+        this.targetRate = Math.min(opts.targetRate || sampleRate, sampleRate);
+
+        // 다운샘플링: 입력 ratio 개를 평균내서 출력 1개 (간단한 box 저역통과 필터)
+        this.ratio = sampleRate / this.targetRate;  // 예: 48000 / 16000 = 3
+        this.phase = 0;     // 현재 출력 샘플에 누적된 입력 수
+        this.accum = 0;     // 누적 합
+        this.accumCount = 0;
         
-        this.targetLength = Math.floor(sampleRate * 0.5);  // 0.5초 분량 샘플 수
+        this.targetLength = Math.floor(this.targetRate * 0.5);  // 0.5초 분량 샘플 수
         // 예: 48000Hz × 0.5초 = 24000 샘플
         // 예: 16000Hz × 0.5초 = 8000 샘플
         
         // ========================================
         // 버퍼 초기화
         // ========================================
-        this.sampleBuffer = new Int16Array(this.targetLength);  // 청크 버퍼
+        this.sampleBuffer = this.createBuffer();  // 청크 버퍼
         this.sampleCursor = 0;  // 현재 버퍼 위치
         this.isActive = true;   // 활성 상태 플래그
 
@@ -44,6 +82,12 @@ class AudioStreamProcessor extends AudioWorkletProcessor {
         };
     }
     
+    createBuffer() {
+        return this.codec === 'mulaw'
+            ? new Uint8Array(this.targetLength)
+            : new Int16Array(this.targetLength);
+    }
+
     // ========================================
     // 리소스 정리
     // ========================================
@@ -74,10 +118,26 @@ class AudioStreamProcessor extends AudioWorkletProcessor {
         // 샘플 변환 및 버퍼링
         // ========================================
         for (let i = 0; i < channel.length; i++) {
+            let s = channel[i];
+
+            // 다운샘플링: ratio 개가 모일 때까지 누적
+            if (this.ratio > 1) {
+                this.accum += s;
+                this.accumCount++;
+                this.phase += 1;
+                if (this.phase < this.ratio) continue;
+                s = this.accum / this.accumCount;
+                this.phase -= this.ratio;
+                this.accum = 0;
+                this.accumCount = 0;
+            }
+
             // Float32 (-1.0 ~ 1.0) → Int16 (-32768 ~ 32767) 변환
-            let s = Math.max(-1, Math.min(1, channel[i]));  // 클리핑
-            let int16Sample = Math.round(s * 32767);
-            this.sampleBuffer[this.sampleCursor] = Math.max(-32768, Math.min(32767, int16Sample));
+            s = Math.max(-1, Math.min(1, s));  // 클리핑
+            let int16Sample = Math.max(-32768, Math.min(32767, Math.round(s * 32767)));
+            this.sampleBuffer[this.sampleCursor] = this.codec === 'mulaw'
+                ? encodeMulaw(int16Sample)
+                : int16Sample;
             this.sampleCursor++;
 
             // ========================================
@@ -85,14 +145,14 @@ class AudioStreamProcessor extends AudioWorkletProcessor {
             // ========================================
             if (this.sampleCursor >= this.targetLength) {
                 // 버퍼 복사 (원본 보존)
-                const bufferToSend = new Int16Array(this.sampleBuffer);
+                const bufferToSend = this.sampleBuffer.slice();
                 
                 // HTML로 전송 (ArrayBuffer 형태)
                 // Transferable로 전송해서 복사 오버헤드 제거
                 this.port.postMessage(bufferToSend.buffer, [bufferToSend.buffer]);
                 
                 // 버퍼 리셋
-                this.sampleBuffer = new Int16Array(this.targetLength);
+                this.sampleBuffer = this.createBuffer();
                 this.sampleCursor = 0;
             }
         }
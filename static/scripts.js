@@ -2,6 +2,12 @@
 const API_BASE_URL = ""; // 같은 서버에서 HTML과 API를 같이 쓸 때는 빈 문자열이면 됨
 // const API_BASE_URL = "https://192.168.0.37:5001";
 
+// 음성 청크 전송 방식 (processor.js processorOptions)
+// - codec: "pcm_s16le" (Int16) | "mulaw" (8bit, 대역폭 절반)
+// - targetRate: null이면 브라우저 샘플레이트 그대로, 16000이면 브라우저에서 다운샘플링
+// 예) { codec: "mulaw", targetRate: 16000 } → 48kHz Int16 대비 약 1/6 대역폭
+const AUDIO_TRANSPORT = { codec: "pcm_s16le", targetRate: null };
+
 document.addEventListener("DOMContentLoaded", () => {
   // ===== 로그인 화면 관련 DOM =====
   const loginScreen   = document.getElementById("loginScreen");
@@ -525,6 +531,11 @@ document.addEventListener("DOMContentLoaded", () => {
   let recSessionId = null;
   let recSeq       = 0;
   let recordingTimeout = null; // ✅ 추가: 녹음 타임아웃 관리용
+  let busyBackoffMs = 0;       // ✅ 판단 서버 Busy(503) 재시도 대기 시간 (지수 백오프)
+  let busyRetryTimer = null;
+  let isFlushingHeld = false;
+  let heldChunks = [];         // 백오프 중 보관한 청크 (순서대로 다시 전송)
+  const BUSY_BACKOFF_MAX_MS = 4000;
 
   // 세션 시작 (서버A → 서버B /start 프록시)
   async function startAudioSession() {
@@ -543,25 +554,70 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
-  // PCM 청크 전송 (/ingest-chunk)
+  // PCM 청크 전송: 판단 서버가 Busy 면 백오프 동안 청크를 보관했다가 순서대로 전송
   async function sendPCMChunk(buffer) {
     if (!isRecordingAudio || !recSessionId) return;
+    if (busyRetryTimer || isFlushingHeld) {
+      heldChunks.push(buffer);
+      return;
+    }
+    await postPCMChunk(buffer);
+  }
+
+  // Busy(503): 발화 버퍼는 서버 세션에 남아 있으므로 녹음을 멈추지 않고 대기 후 다음 청크부터 이어서 전송
+  function scheduleBusyRetry(res) {
+    const retryAfterMs = (Number(res.headers.get("Retry-After")) || 1) * 1000;
+    if (busyBackoffMs === 0) {
+      addChatMessage("음성 인식 서버가 혼잡합니다. 잠시 후 자동으로 다시 시도합니다.", "system");
+    }
+    busyBackoffMs = Math.min(BUSY_BACKOFF_MAX_MS, Math.max(retryAfterMs, busyBackoffMs * 2));
+    console.warn(`⏳ 음성 인식 서버 혼잡 - ${busyBackoffMs}ms 후 재시도`);
+    if (!busyRetryTimer) {
+      busyRetryTimer = setTimeout(flushHeldChunks, busyBackoffMs);
+    }
+  }
+
+  async function flushHeldChunks() {
+    busyRetryTimer = null;
+    isFlushingHeld = true;
+    try {
+      while (heldChunks.length && isRecordingAudio && !busyRetryTimer) {
+        await postPCMChunk(heldChunks.shift());
+      }
+    } finally {
+      isFlushingHeld = false;
+    }
+  }
+
+  // PCM 청크 전송 (/ingest-chunk)
+  async function postPCMChunk(buffer) {
+    if (!isRecordingAudio || !recSessionId) return;
 
-    const blob = new Blob([buffer], { type: "application/octet-stream" });
-    const formData = new FormData();
-    formData.append("sessionId", recSessionId);
-    formData.append("chunk", blob, `chunk-${recSeq++}.raw`);
-    formData.append("mode", "chunk");
+    // raw 청크 그대로 전송 (multipart 없음), 세션 / 인코딩 정보는 쿼리로
+    // → 프록시(front.py)는 본문을 열지 않고 판단 서버로 스트리밍
+    recSeq++;
+    const params = new URLSearchParams({
+      sessionId: recSessionId,
+      codec: AUDIO_TRANSPORT.codec,
+      rate: String(AUDIO_TRANSPORT.targetRate || audioContext.sampleRate),
+    });
 
     try {
-      const res = await fetch(`${API_BASE_URL}/ingest-chunk`, {
+      const res = await fetch(`${API_BASE_URL}/ingest-chunk?${params}`, {
         method: "POST",
-        body: formData,
+        headers: { "Content-Type": "application/octet-stream" },
+        body: buffer,
       });
+      if (res.status === 503) {
+        // ✅ 판단 서버 STT 대기열 초과 (status: "Busy") → 백오프 후 재시도
+        scheduleBusyRetry(res);
+        return;
+      }
       if (!res.ok) {
         console.error("청크 전송 실패", res.status);
         return;
       }
+      busyBackoffMs = 0;
       const data = await res.json();
       console.log("audio resp:", data);
 
@@ -604,13 +660,15 @@ document.addEventListener("DOMContentLoaded", () => {
       await audioContext.audioWorklet.addModule("/static/processor.js?v=" + Date.now());
 
       const source = audioContext.createMediaStreamSource(stream);
-      workletNode = new AudioWorkletNode(audioContext, "audio-stream-processor");
+      workletNode = new AudioWorkletNode(audioContext, "audio-stream-processor", {
+        processorOptions: AUDIO_TRANSPORT,
+      });
 
       source.connect(workletNode);
 
       // Worklet -> JS
       workletNode.port.onmessage = (event) => {
-        // event.data는 Int16Array의 buffer (ArrayBuffer)
+        // event.data는 Int16Array(pcm_s16le) 또는 Uint8Array(mulaw)의 buffer (ArrayBuffer)
         sendPCMChunk(event.data);
       };
 
@@ -669,6 +727,14 @@ document.addEventListener("DOMContentLoaded", () => {
 
     recSessionId = null;
     recSeq = 0;
+
+    // Busy 백오프 상태 정리
+    if (busyRetryTimer) {
+      clearTimeout(busyRetryTimer);
+      busyRetryTimer = null;
+    }
+    heldChunks = [];
+    busyBackoffMs = 0;
     
     // ✅ 추가: 타임아웃 정리
     if (recordingTimeout) {
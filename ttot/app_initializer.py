@@ -2,11 +2,16 @@
 app_initializer.py - 서버 초기화 로직
 Manager와 Service 초기화를 담당합니다.
 """
+import threading
+import time
+
 from config import Config
 from prompts import PromptManager
 from llm_manager import LLMManager
 from rag_manager import RAGManager
 from memory_manager import MemoryManager
+from history_builder import HistoryBuilder
+from long_term_memory import LongTermMemory
 from services import ChatService, DocumentService, MemoryService, StatsService
 
 
@@ -31,21 +36,77 @@ class AppInitializer:
             llm=self.llm_manager.llm
         )
         self.memory_manager = MemoryManager(config=Config)
+        self.history_builder = HistoryBuilder(
+            self.llm_manager.llm,
+            config=Config,
+            max_users=Config.MEMORY_CACHE_MAX_USERS
+        )
+        # 장기 기억 (문서 DB 와 같은 임베딩 모델 사용)
+        self.long_term_memory = None
+        if Config.LONG_TERM_ENABLED:
+            self.long_term_memory = LongTermMemory(
+                self.rag_manager.embeddings,
+                config=Config,
+                backend=self.memory_manager.backend
+            )
 
         # Service 초기화
         self.chat_service = ChatService(
             self.llm_manager,
             self.rag_manager,
-            self.memory_manager
+            self.memory_manager,
+            self.history_builder,
+            self.long_term_memory
         )
         self.document_service = DocumentService(self.rag_manager)
-        self.memory_service = MemoryService(self.memory_manager)
-        self.stats_service = StatsService(self.memory_manager, self.rag_manager)
+        self.memory_service = MemoryService(
+            self.memory_manager,
+            self.history_builder,
+            self.long_term_memory
+        )
+        # 최근 사용자 메모리 미리 로드 상태 (/health 에 표시)
+        self.warmup = {
+            "status": "pending" if Config.MEMORY_WARM_USERS else "disabled",
+            "target": 0,
+            "loaded": 0,
+            "seconds": None,
+            "error": None
+        }
+        self.stats_service = StatsService(self.memory_manager, self.rag_manager, self.warmup)
 
         print("=" * 60)
         print("모든 모듈 초기화 완료")
         print("=" * 60)
 
+    def start_warm_up(self):
+        """최근 대화한 사용자 메모리를 백그라운드에서 미리 로드 (서버 시작 시)"""
+        if self.warmup["status"] != "pending":
+            return
+        self.warmup["status"] = "warming"
+        threading.Thread(target=self._warm_up, name="memory-warm-up", daemon=True).start()
+
+    def _warm_up(self):
+        started = time.perf_counter()
+        try:
+            # 캐시 크기보다 많이 로드하면 앞에서 로드한 사용자가 다시 밀려나므로 캐시 크기까지만
+            limit = min(Config.MEMORY_WARM_USERS, Config.MEMORY_CACHE_MAX_USERS or Config.MEMORY_WARM_USERS)
+            user_ids = self.memory_manager.recent_user_ids(limit)
+            self.warmup["target"] = len(user_ids)
+
+            # 오래된 사용자부터 로드해서 가장 최근 사용자가 LRU 의 가장 최근 쪽에 오도록
+            for user_id in reversed(user_ids):
+                if self.memory_manager.preload(user_id):
+                    self.warmup["loaded"] += 1
+
+            self.warmup["status"] = "ready"
+            self.warmup["seconds"] = round(time.perf_counter() - started, 3)
+            print(f"[Memory] 최근 사용자 메모리 로드 완료: {self.warmup['loaded']}명 ({self.warmup['seconds']}초)")
+
+        except Exception as e:
+            self.warmup["status"] = "failed"
+            self.warmup["error"] = str(e)
+            print(f"[Memory] 최근 사용자 메모리 로드 실패: {e}")
+
     def get_services(self):
         """서비스 객체들 반환"""
         return {
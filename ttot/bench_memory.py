@@ -0,0 +1,122 @@
+"""
+bench_memory.py - SimpleMemory 메모리 / CPU 벤치마크
+
+사용자 N명(기본 10,000명)이 각자 k턴 대화를 메모리에 들고 있는 상황에서
+예전 구현(LangChain 메시지 리스트 + 슬라이스 복사)과 현재 구현(deque + __slots__ 레코드)을 비교합니다.
+
+측정 항목:
+    - 상주 메모리 (tracemalloc, 사용자 1명당 바이트)
+    - 대화 추가 (k턴이 찬 뒤 add_user_message + add_ai_message, 턴당 µs)
+    - 프롬프트 생성 (get_messages, 대화 추가 직후 / 변경 없이 재호출, 회당 µs)
+
+실행 예:
+    python bench_memory.py
+    python bench_memory.py --users 2000 --k 30
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import List
+
+from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
+
+from memory_manager import SimpleMemory
+
+HUMAN_TEXT = "오늘은 아침에 공원에 산책을 다녀왔어요. 날씨가 좋아서 기분이 좋았어요."
+AI_TEXT = "산책 다녀오셨군요! 정말 잘하셨어요. 공원에서 어떤 꽃을 보셨어요?"
+
+
+class LegacySimpleMemory:
+    """예전 SimpleMemory (비교용 복제본)"""
+
+    def __init__(self, k: int = 15):
+        self.k = k
+        self.messages: List[BaseMessage] = []
+
+    def add_message(self, message: BaseMessage):
+        self.messages.append(message)
+        if len(self.messages) > self.k * 2:
+            self.messages = self.messages[-(self.k * 2):]
+
+    def add_user_message(self, text: str):
+        self.add_message(HumanMessage(content=text))
+
+    def add_ai_message(self, text: str):
+        self.add_message(AIMessage(content=text))
+
+    def get_messages(self) -> List[BaseMessage]:
+        return self.messages
+
+
+def _fill(memory, turns: int, user_index: int):
+    # 사용자마다 다른 문자열 (같은 객체를 공유하면 메모리가 과소 측정됨)
+    for turn in range(turns):
+        memory.add_user_message(f"{HUMAN_TEXT} ({user_index}-{turn})")
+        memory.add_ai_message(f"{AI_TEXT} ({user_index}-{turn})")
+
+
+def measure_resident(memory_class, users: int, k: int) -> float:
+    """사용자 users 명이 k턴씩 들고 있을 때 1명당 바이트"""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    store = {}
+    for i in range(users):
+        memory = memory_class(k=k)
+        _fill(memory, k, i)
+        store[f"user_{i}"] = memory
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / users
+
+
+def measure_cpu(memory_class, k: int, turns: int) -> dict:
+    """k턴이 찬 메모리에서 대화 추가 / 프롬프트 생성 시간 (µs)"""
+    memory = memory_class(k=k)
+    _fill(memory, k, 0)
+
+    started = time.perf_counter()
+    for turn in range(turns):
+        memory.add_user_message(HUMAN_TEXT)
+        memory.add_ai_message(AI_TEXT)
+    add_us = (time.perf_counter() - started) / turns * 1e6
+
+    # 실제 요청 흐름: 프롬프트 생성(get_messages) → 대화 추가
+    started = time.perf_counter()
+    for turn in range(turns):
+        memory.get_messages()
+        memory.add_user_message(HUMAN_TEXT)
+        memory.add_ai_message(AI_TEXT)
+    turn_us = (time.perf_counter() - started) / turns * 1e6
+
+    started = time.perf_counter()
+    for _ in range(turns):
+        memory.get_messages()
+    cached_us = (time.perf_counter() - started) / turns * 1e6
+
+    return {"add_us": add_us, "turn_us": turn_us, "cached_get_us": cached_us}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SimpleMemory 메모리 / CPU 벤치마크")
+    parser.add_argument("--users", type=int, default=10000, help="상주 사용자 수")
+    parser.add_argument("--k", type=int, default=15, help="사용자당 유지할 대화 수 (Config.MEMORY_K)")
+    parser.add_argument("--turns", type=int, default=20000, help="CPU 측정 반복 횟수")
+    args = parser.parse_args()
+
+    print(f"👥 사용자 {args.users}명 × {args.k}턴")
+    print(f"\n{'구현':<10}{'bytes/user':>14}{'MB total':>12}{'add µs':>10}{'turn µs':>10}{'get µs':>10}")
+    for name, memory_class in (("legacy", LegacySimpleMemory), ("deque", SimpleMemory)):
+        per_user = measure_resident(memory_class, args.users, args.k)
+        cpu = measure_cpu(memory_class, args.k, args.turns)
+        print(f"{name:<10}{per_user:>14,.0f}{per_user * args.users / 1024 / 1024:>12.1f}"
+              f"{cpu['add_us']:>10.2f}{cpu['turn_us']:>10.2f}{cpu['cached_get_us']:>10.2f}")
+
+    print("\nadd: 대화 추가만 / turn: 프롬프트 생성 + 대화 추가 / get: 변경 없이 get_messages 재호출")
+    print("deque 구현은 대화가 추가되면 변환 캐시를 버리므로 turn 에 LangChain 메시지 2k개 생성 비용이 포함됩니다")
+    print("(상주 메모리를 줄이는 대신 요청당 수백 µs, LLM 호출 시간에 비하면 무시할 수준)")
+
+
+if __name__ == "__main__":
+    main()
@@ -42,9 +42,29 @@ class Config:
     CHROMA_PERSIST_DIR = None
     MEMORY_DIR = None
     SYSTEM_PROMPT_FILE = None
+    LONG_TERM_MEMORY_DIR = None
 
     # 메모리 설정
     MEMORY_K = None
+    MEMORY_FSYNC_INTERVAL = None
+    MEMORY_CACHE_MAX_USERS = None
+    MEMORY_CACHE_MAX_BYTES = None
+    MEMORY_CACHE_IDLE_TTL = None
+    HISTORY_MAX_TOKENS = None
+    SUMMARY_MAX_TOKENS = None
+    MIN_RECENT_TURNS = None
+    MEMORY_WARM_USERS = None
+    MEMORY_BACKEND = None
+    MEMORY_SQLITE_PATH = None
+    MEMORY_REDIS_URL = None
+    MEMORY_REDIS_PREFIX = None
+
+    # 장기 기억 설정
+    LONG_TERM_ENABLED = None
+    LONG_TERM_K = None
+    LONG_TERM_MIN_SCORE = None
+    LONG_TERM_BATCH_SIZE = None
+    LONG_TERM_FLUSH_INTERVAL = None
 
     # RAG 설정
     CHUNK_SIZE = None
@@ -89,10 +109,31 @@ class Config:
             cls.CHROMA_PERSIST_DIR = paths.get('chroma_persist_dir', './chroma_db')
             cls.MEMORY_DIR = paths.get('memory_dir', './chat_history')
             cls.SYSTEM_PROMPT_FILE = paths.get('system_prompt_file', './system_prompt.json')
+            cls.LONG_TERM_MEMORY_DIR = paths.get('long_term_memory_dir', './chroma_memory')
 
             # 메모리 설정
             memory = cls._config_data.get('memory', {})
             cls.MEMORY_K = memory.get('k', 15)
+            cls.MEMORY_FSYNC_INTERVAL = memory.get('fsync_interval', 1.0)
+            cls.MEMORY_CACHE_MAX_USERS = memory.get('cache_max_users', 1000)
+            cls.MEMORY_CACHE_MAX_BYTES = int(memory.get('cache_max_mb', 64) * 1024 * 1024)
+            cls.MEMORY_CACHE_IDLE_TTL = memory.get('cache_idle_ttl', 1800)
+            cls.HISTORY_MAX_TOKENS = memory.get('history_max_tokens', 1500)
+            cls.SUMMARY_MAX_TOKENS = memory.get('summary_max_tokens', 300)
+            cls.MIN_RECENT_TURNS = memory.get('min_recent_turns', 2)
+            cls.MEMORY_WARM_USERS = memory.get('warm_users', 200)
+            cls.MEMORY_BACKEND = memory.get('backend', 'file')
+            cls.MEMORY_SQLITE_PATH = memory.get('sqlite_path', './chat_history.db')
+            cls.MEMORY_REDIS_URL = memory.get('redis_url', 'redis://localhost:6379/0')
+            cls.MEMORY_REDIS_PREFIX = memory.get('redis_prefix', 'ttot:')
+
+            # 장기 기억 설정
+            long_term = cls._config_data.get('long_term_memory', {})
+            cls.LONG_TERM_ENABLED = long_term.get('enabled', False)
+            cls.LONG_TERM_K = long_term.get('k', 3)
+            cls.LONG_TERM_MIN_SCORE = long_term.get('min_score', 0.3)
+            cls.LONG_TERM_BATCH_SIZE = long_term.get('batch_size', 16)
+            cls.LONG_TERM_FLUSH_INTERVAL = long_term.get('flush_interval', 2.0)
 
             # RAG 설정
             rag = cls._config_data.get('rag', {})
@@ -129,12 +170,17 @@ class Config:
             raise ValueError("LLM_MODEL이 설정되지 않았습니다!")
         if not cls.EMBEDDING_MODEL:
             raise ValueError("EMBEDDING_MODEL이 설정되지 않았습니다!")
+        if cls.HISTORY_MAX_TOKENS and cls.SUMMARY_MAX_TOKENS >= cls.HISTORY_MAX_TOKENS:
+            raise ValueError("memory.summary_max_tokens는 memory.history_max_tokens보다 작아야 합니다!")
+        if cls.MEMORY_BACKEND not in ("file", "sqlite", "redis"):
+            raise ValueError(f"memory.backend는 file, sqlite, redis 중 하나여야 합니다! (현재: {cls.MEMORY_BACKEND})")
 
     @classmethod
     def create_directories(cls):
         """필요한 디렉토리 생성"""
         Path(cls.CHROMA_PERSIST_DIR).mkdir(exist_ok=True)
         Path(cls.MEMORY_DIR).mkdir(exist_ok=True)
+        Path(cls.LONG_TERM_MEMORY_DIR).mkdir(exist_ok=True)
         print(f"[Config] 디렉토리 생성 완료")
 
     @classmethod
@@ -165,7 +211,26 @@ class Config:
                 "max_tokens": cls.MAX_TOKENS
             },
             "memory": {
-                "k": cls.MEMORY_K
+                "k": cls.MEMORY_K,
+                "fsync_interval": cls.MEMORY_FSYNC_INTERVAL,
+                "cache_max_users": cls.MEMORY_CACHE_MAX_USERS,
+                "cache_max_mb": cls.MEMORY_CACHE_MAX_BYTES / (1024 * 1024),
+                "cache_idle_ttl": cls.MEMORY_CACHE_IDLE_TTL,
+                "history_max_tokens": cls.HISTORY_MAX_TOKENS,
+                "summary_max_tokens": cls.SUMMARY_MAX_TOKENS,
+                "min_recent_turns": cls.MIN_RECENT_TURNS,
+                "warm_users": cls.MEMORY_WARM_USERS,
+                "backend": cls.MEMORY_BACKEND,
+                "sqlite_path": cls.MEMORY_SQLITE_PATH,
+                "redis_url": cls.MEMORY_REDIS_URL,
+                "redis_prefix": cls.MEMORY_REDIS_PREFIX
+            },
+            "long_term_memory": {
+                "enabled": cls.LONG_TERM_ENABLED,
+                "k": cls.LONG_TERM_K,
+                "min_score": cls.LONG_TERM_MIN_SCORE,
+                "batch_size": cls.LONG_TERM_BATCH_SIZE,
+                "flush_interval": cls.LONG_TERM_FLUSH_INTERVAL
             },
             "rag": {
                 "chunk_size": cls.CHUNK_SIZE,
@@ -0,0 +1,193 @@
+"""
+conversation_log.py - 사용자별 append-only 대화 로그 (JSONL)
+chat_history/{user_id}.jsonl 에 대화 1턴 = 1줄로 추가만 합니다.
+
+- 요청 경로: 한 줄 append 만 (파일 전체를 다시 쓰지 않으므로 턴마다 비용 일정)
+- fsync: 백그라운드 스레드가 fsync_interval 초마다 변경된 파일만 모아서 fsync
+- 보관: 대화 내역의 유일한 원본이므로 지우지 않고 전부 보관 (프롬프트용 최근 k턴은 SimpleMemory 가 따로 유지)
+- 읽기: 파일 끝에서부터 필요한 줄 수만큼만 읽음 (read_last), 대화 내역 화면용 전체 조회는 read_all
+
+레코드 형식:
+    {"ts": "2025-01-01T12:00:00", "human": "사용자 입력", "ai": "AI 응답"}
+"""
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import List
+
+LOG_SUFFIX = ".jsonl"
+_TAIL_BLOCK = 8192
+_LOCK_STRIPES = 64     # 사용자 수와 관계없이 락 개수 고정
+
+
+def _read_tail_lines(path: Path, n: int) -> List[bytes]:
+    """파일 끝에서부터 블록 단위로 읽어 마지막 n 줄만 반환"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= n:
+            size = min(_TAIL_BLOCK, position)
+            position -= size
+            f.seek(position)
+            data = f.read(size) + data
+    lines = [line for line in data.split(b"\n") if line.strip()]
+    return lines[-n:] if n else []
+
+
+def _parse(lines: List[bytes]) -> List[dict]:
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            # 비정상 종료로 잘린 마지막 줄 등은 건너뜀
+            continue
+    return records
+
+
+def _atomic_write(path: Path, text: str):
+    """임시 파일에 쓰고 fsync 후 rename (중간에 죽어도 기존 파일 유지)"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ConversationLog:
+    """
+    사용자별 append-only JSONL 대화 로그
+
+    Attributes:
+        directory: 로그 디렉토리 (Config.MEMORY_DIR)
+        fsync_interval: fsync 주기(초), 0이면 append 마다 바로 fsync
+    """
+
+    def __init__(self, directory: str, fsync_interval: float = 1.0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync_interval = fsync_interval
+
+        self._user_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+        self._dirty = set()                         # fsync 가 필요한 사용자
+        self._wakeup = threading.Condition()
+        self._closed = False
+
+        self.appended_total = 0
+        self.fsync_total = 0
+
+        self._thread = threading.Thread(target=self._run, name="conversation-log", daemon=True)
+        self._thread.start()
+
+    def path(self, user_id: str) -> Path:
+        return self.directory / f"{user_id}{LOG_SUFFIX}"
+
+    def _lock(self, user_id: str) -> threading.Lock:
+        return self._user_locks[zlib.crc32(user_id.encode("utf-8")) % _LOCK_STRIPES]
+
+    # ---------- 요청 경로 ----------
+    def append(self, user_id: str, record: dict):
+        """레코드 한 줄 추가 (fsync 는 백그라운드에서 묶어서 처리)"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock(user_id):
+            with open(self.path(user_id), "a", encoding="utf-8") as f:
+                f.write(line)
+                if not self.fsync_interval:
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.appended_total += 1
+
+        with self._wakeup:
+            self._dirty.add(user_id)
+
+    def read_last(self, user_id: str, n: int) -> List[dict]:
+        """최근 n 개 레코드 (오래된 것부터), 로그가 없으면 빈 리스트"""
+        path = self.path(user_id)
+        with self._lock(user_id):
+            if not path.exists():
+                return []
+            lines = _read_tail_lines(path, n)
+        return _parse(lines)
+
+    def read_all(self, user_id: str) -> List[dict]:
+        """전체 레코드 (오래된 것부터), 로그가 없으면 빈 리스트"""
+        path = self.path(user_id)
+        with self._lock(user_id):
+            if not path.exists():
+                return []
+            with open(path, "rb") as f:
+                lines = [line for line in f.read().split(b"\n") if line.strip()]
+        return _parse(lines)
+
+    def exists(self, user_id: str) -> bool:
+        return self.path(user_id).exists()
+
+    def rewrite(self, user_id: str, records: List[dict]):
+        """레코드 전체를 원자적으로 다시 씀 (레거시 파일 변환 / 스냅샷)"""
+        text = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with self._lock(user_id):
+            _atomic_write(self.path(user_id), text)
+
+    def clear(self, user_id: str) -> bool:
+        """사용자 로그 삭제, 삭제한 파일이 있으면 True"""
+        with self._lock(user_id):
+            path = self.path(user_id)
+            if not path.exists():
+                return False
+            path.unlink()
+        with self._wakeup:
+            self._dirty.discard(user_id)
+        return True
+
+    def user_ids(self) -> List[str]:
+        return [path.name[:-len(LOG_SUFFIX)] for path in self.directory.glob(f"*{LOG_SUFFIX}")]
+
+    # ---------- 백그라운드: fsync ----------
+    def _run(self):
+        while True:
+            with self._wakeup:
+                self._wakeup.wait(timeout=self.fsync_interval or 1.0)
+                dirty, self._dirty = self._dirty, set()
+                closed = self._closed
+            for user_id in dirty:
+                try:
+                    self._sync(user_id)
+                except Exception as e:
+                    print(f"[Memory] 로그 fsync 실패 ({user_id}): {e}")
+            if closed:
+                return
+
+    def _sync(self, user_id: str):
+        if not self.fsync_interval:
+            return
+        with self._lock(user_id):
+            path = self.path(user_id)
+            if not path.exists():
+                return
+            with open(path, "ab") as f:
+                os.fsync(f.fileno())
+            self.fsync_total += 1
+
+    def flush(self):
+        """대기 중인 fsync 를 바로 처리 (종료 시)"""
+        with self._wakeup:
+            dirty, self._dirty = self._dirty, set()
+        for user_id in dirty:
+            self._sync(user_id)
+
+    def close(self):
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        return {
+            "appended_total": self.appended_total,
+            "fsync_total": self.fsync_total,
+            "pending_fsync": len(self._dirty),
+        }
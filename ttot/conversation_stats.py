@@ -0,0 +1,138 @@
+"""
+conversation_stats.py - 대화 통계 카운터 (활성 사용자 수 / 전체 대화 턴 수)
+/stats 가 chat_history 폴더를 매번 훑지 않도록 save_context / clear_memory 때 바로 갱신합니다.
+
+- 상태는 chat_history/.conversation_stats 파일(JSON)에 저장
+  (요청마다 쓰지 않고 flush_interval 초에 한 번, 임시 파일 + rename 으로 원자적으로 저장)
+- 파일이 없으면(첫 실행 / 삭제됨) 시작할 때 한 번만 대화 로그를 훑어서 다시 만듦
+- 전체 대화 턴 수는 저장 시점까지 기록된 턴 수 (로그 압축으로 지워진 턴도 포함, 대화 기록 삭제 시 차감)
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict
+
+STATS_FILENAME = ".conversation_stats"
+
+
+class ConversationStats:
+    """
+    사용자별 대화 턴 수와 합계를 유지하는 카운터
+
+    Attributes:
+        directory: 대화 기록 디렉토리 (Config.MEMORY_DIR)
+        flush_interval: 통계 파일 저장 주기(초)
+    """
+
+    def __init__(self, directory: str, flush_interval: float = 1.0):
+        self.directory = Path(directory)
+        self.path = self.directory / STATS_FILENAME
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._turns: Dict[str, int] = {}
+        self.total_turns = 0
+        self._dirty = False
+        self._wakeup = threading.Condition()
+        self._closed = False
+
+        if not self._load():
+            self.rebuild()
+
+        self._thread = threading.Thread(target=self._run, name="conversation-stats", daemon=True)
+        self._thread.start()
+
+    @property
+    def active_users(self) -> int:
+        return len(self._turns)
+
+    # ---------- 갱신 (요청 경로, O(1)) ----------
+    def record_turn(self, user_id: str, turns: int = 1):
+        with self._lock:
+            self._turns[user_id] = self._turns.get(user_id, 0) + turns
+            self.total_turns += turns
+            self._dirty = True
+
+    def remove_user(self, user_id: str):
+        with self._lock:
+            turns = self._turns.pop(user_id, None)
+            if turns is None:
+                return
+            self.total_turns -= turns
+            self._dirty = True
+
+    def snapshot(self) -> dict:
+        return {"active_users": len(self._turns), "total_turns": self.total_turns}
+
+    # ---------- 저장 / 복원 ----------
+    def _load(self) -> bool:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._turns = {user_id: int(turns) for user_id, turns in data["turns"].items()}
+            self.total_turns = sum(self._turns.values())
+            print(f"[Memory] 대화 통계 로드: 사용자 {self.active_users}명, {self.total_turns}턴")
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"[Memory] 대화 통계 파일 손상, 다시 계산합니다: {e}")
+            return False
+
+    def rebuild(self):
+        """대화 로그(*.jsonl)와 예전 형식(*.json) 파일을 한 번 훑어서 카운터 재계산"""
+        turns: Dict[str, int] = {}
+        for path in self.directory.glob("*.jsonl"):
+            with open(path, "rb") as f:
+                turns[path.stem] = sum(1 for line in f if line.strip())
+        for path in self.directory.glob("*.json"):
+            if path.stem in turns:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    turns[path.stem] = sum(1 for item in json.load(f) if item.get("type") == "ai")
+            except Exception as e:
+                print(f"[Memory] 대화 통계 계산 실패 ({path.name}): {e}")
+
+        with self._lock:
+            self._turns = turns
+            self.total_turns = sum(turns.values())
+            self._dirty = True
+        self.flush()
+        print(f"[Memory] 대화 통계 재계산: 사용자 {self.active_users}명, {self.total_turns}턴")
+
+    def flush(self):
+        """변경된 카운터를 파일에 원자적으로 저장"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                text = json.dumps({"turns": self._turns}, ensure_ascii=False)
+                self._dirty = False
+
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                self._wakeup.wait(timeout=self.flush_interval)
+                closed = self._closed
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[Memory] 대화 통계 저장 실패: {e}")
+            if closed:
+                return
+
+    def close(self):
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join(timeout=5)
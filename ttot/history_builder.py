@@ -0,0 +1,256 @@
+"""
+history_builder.py - 토큰 예산 기반 대화 기록 구성
+프롬프트에 넣을 chat_history 를 max_tokens 안으로 맞춥니다.
+
+- 최근 대화: 최신 턴부터 예산이 허락하는 만큼 원문 그대로 (최소 min_recent_turns 턴)
+- 오래된 대화: 창(window) 밖으로 밀려난 턴은 사용자별 누적 요약 1개로 접어서 맨 앞에 SystemMessage 로 넣음
+- 요약 갱신: 창이 밀려서 새로 접을 턴이 생겼을 때만 백그라운드 스레드에서 LLM 으로 다시 만듦
+  예산의 FOLD_RATIO 까지 (최소 MIN_FOLD_TURNS 턴) 한 번에 접어서, 턴마다가 아니라 몇 턴에 한 번만 LLM 을 호출
+  요청 경로는 기다리지 않고 직전 요약을 그대로 사용 → 갱신 중에도 프롬프트 크기는 예산 이내
+- 요약은 서버 메모리에만 보관 (재시작 / 대화 기록 삭제 시 다시 만듦)
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional
+
+from langchain_core.messages import BaseMessage, SystemMessage
+
+from config import Config
+
+SUMMARY_PROMPT = """다음은 어르신과 AI 말동무의 이전 대화 요약과, 그 뒤에 이어진 대화입니다.
+두 내용을 합쳐 이전 대화 요약을 새로 작성하세요.
+
+- 어르신의 이름, 건강 상태, 가족, 관심사, 일정, 약속처럼 다음 대화에 필요한 정보를 중심으로
+- 인사말 등 중요하지 않은 내용은 생략
+- 한국어로 {max_tokens} 토큰 이내, 요약 본문만 출력
+
+[이전 대화 요약]
+{summary}
+
+[이어진 대화]
+{conversation}
+"""
+
+SUMMARY_MESSAGE_PREFIX = "이전 대화 요약 (오래된 대화를 줄인 내용입니다):\n"
+
+# 메시지 1개당 역할 / 구분자 토큰 (OpenAI chat 형식 기준 근사치)
+MESSAGE_OVERHEAD_TOKENS = 4
+# 요약을 갱신할 때 원문 창을 예산의 이 비율까지 줄여서 접음
+FOLD_RATIO = 0.6
+# 한 번에 접는 최소 턴 수 (최근 턴만으로 예산을 넘어도 턴마다 LLM 을 호출하지 않도록)
+MIN_FOLD_TURNS = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding(model: str):
+    """
+    tiktoken 인코딩 (없으면 None → 글자 수로 근사)
+    인코딩 파일은 처음 사용할 때 내려받으므로 네트워크가 막힌 환경에서도 실패할 수 있음 (RAG_MEMORY_ISSUE.md)
+    """
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"[HistoryBuilder] tiktoken 사용 불가 ({e}): 글자 수로 토큰 수를 근사합니다")
+        return None
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """텍스트 토큰 수 (같은 문장은 다시 세지 않도록 캐시)"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // 2 + 1
+    return len(encoding.encode(text))
+
+
+def _turn_key(human: str, ai: str) -> str:
+    return hashlib.sha1(f"{human}\x00{ai}".encode("utf-8")).hexdigest()
+
+
+class _SummaryState:
+    __slots__ = ("text", "tokens", "last_key", "folded_turns")
+
+    def __init__(self, text: str = "", tokens: int = 0, last_key: Optional[str] = None, folded_turns: int = 0):
+        self.text = text
+        self.tokens = tokens
+        self.last_key = last_key            # 마지막으로 요약에 접힌 턴 (human, ai 해시)
+        self.folded_turns = folded_turns
+
+
+class HistoryBuilder:
+    """
+    토큰 예산에 맞춘 chat_history 생성 + 사용자별 누적 요약 관리
+
+    Attributes:
+        llm: 요약 생성용 LLM (LLMManager.llm)
+        max_tokens: 대화 기록(요약 포함)에 쓸 최대 토큰 수 (0 이면 예산 없이 전체 사용)
+        summary_max_tokens: 요약 최대 토큰 수
+        min_recent_turns: 예산을 넘더라도 원문으로 남길 최근 턴 수
+    """
+
+    def __init__(self, llm, config: Config = None, max_users: int = 1000):
+        self.llm = llm
+        self.config = config or Config
+        self.model = self.config.LLM_MODEL
+        self.max_tokens = self.config.HISTORY_MAX_TOKENS
+        self.summary_max_tokens = self.config.SUMMARY_MAX_TOKENS
+        self.min_recent_turns = self.config.MIN_RECENT_TURNS
+        self.max_users = max_users
+
+        self._summaries: "OrderedDict[str, _SummaryState]" = OrderedDict()
+        self._pending = {}      # user_id -> 진행 중인 요약 작업 토큰
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+
+        self.summaries_generated = 0
+        self.summary_failures = 0
+
+        print(f"[HistoryBuilder] 대화 기록 예산: {self.max_tokens} 토큰 (요약 {self.summary_max_tokens} 토큰)")
+
+    # ---------- 요청 경로 ----------
+    def build(self, user_id: str, memory) -> List[BaseMessage]:
+        """
+        프롬프트에 넣을 대화 기록 생성
+
+        Args:
+            user_id: 사용자 ID
+            memory: SimpleMemory
+
+        Returns:
+            List[BaseMessage]: [요약 SystemMessage] + 최근 대화 원문
+        """
+        messages = memory.get_messages()
+        if not self.max_tokens:
+            return messages
+
+        records = list(memory.records)
+        turns = [(records[i].content, records[i + 1].content) for i in range(0, len(records) - 1, 2)]
+
+        with self._lock:
+            state = self._summaries.get(user_id)
+            if state is not None:
+                self._summaries.move_to_end(user_id)
+
+        # 최신 턴부터 예산 안에서 원문으로 유지
+        budget = self.max_tokens - (state.tokens + MESSAGE_OVERHEAD_TOKENS if state else 0)
+        start = self._window_start(turns, budget)
+
+        # 창 밖으로 밀려났지만 아직 요약에 안 들어간 턴이 있으면 백그라운드 갱신
+        if start > 0:
+            folded_until = self._folded_until(state, turns)
+            if folded_until < start:
+                fold_start = max(start, self._window_start(turns, int(budget * FOLD_RATIO)),
+                                 min(folded_until + MIN_FOLD_TURNS, len(turns)))
+                self._schedule_summary(user_id, state, turns[folded_until:fold_start])
+
+        history = messages[start * 2:]
+        if state and state.text:
+            history = [SystemMessage(content=SUMMARY_MESSAGE_PREFIX + state.text)] + history
+        return history
+
+    def _window_start(self, turns: list, budget: int) -> int:
+        """최신 턴부터 budget 안에 들어가는 첫 턴 위치 (최소 min_recent_turns 턴은 포함)"""
+        start = len(turns)
+        used = 0
+        while start > 0:
+            human, ai = turns[start - 1]
+            cost = count_tokens(human, self.model) + count_tokens(ai, self.model) + 2 * MESSAGE_OVERHEAD_TOKENS
+            if used + cost > budget and len(turns) - start >= self.min_recent_turns:
+                break
+            used += cost
+            start -= 1
+        return start
+
+    def _folded_until(self, state: Optional[_SummaryState], turns: list) -> int:
+        """turns 중 이미 요약에 들어간 턴 수 (마지막으로 접힌 턴 다음 위치)"""
+        if state is None or state.last_key is None:
+            return 0
+        for index in range(len(turns) - 1, -1, -1):
+            if _turn_key(*turns[index]) == state.last_key:
+                return index + 1
+        # 마지막으로 접힌 턴이 메모리에 없음 → 메모리에 있는 턴은 모두 그 이후
+        return 0
+
+    # ---------- 백그라운드 요약 ----------
+    def _schedule_summary(self, user_id: str, state: Optional[_SummaryState], unfolded: list):
+        with self._lock:
+            if user_id in self._pending:
+                return
+            token = object()
+            self._pending[user_id] = token
+        self._executor.submit(self._summarize, user_id, state, unfolded, token)
+
+    def _summarize(self, user_id: str, state: Optional[_SummaryState], unfolded: list, token):
+        try:
+            conversation = "\n".join(f"어르신: {human}\nAI: {ai}" for human, ai in unfolded)
+            prompt = SUMMARY_PROMPT.format(
+                max_tokens=self.summary_max_tokens,
+                summary=state.text if state and state.text else "(없음)",
+                conversation=conversation
+            )
+            text = self.llm.invoke(prompt).content.strip()
+            text = self._truncate(text)
+
+            new_state = _SummaryState(
+                text=text,
+                tokens=count_tokens(SUMMARY_MESSAGE_PREFIX + text, self.model),
+                last_key=_turn_key(*unfolded[-1]),
+                folded_turns=(state.folded_turns if state else 0) + len(unfolded)
+            )
+            with self._lock:
+                # 그 사이 대화 기록이 삭제됐으면 버림
+                if self._pending.get(user_id) is not token:
+                    return
+                self._summaries[user_id] = new_state
+                self._summaries.move_to_end(user_id)
+                while len(self._summaries) > self.max_users:
+                    self._summaries.popitem(last=False)
+                self.summaries_generated += 1
+            print(f"[HistoryBuilder] 대화 요약 갱신: {user_id} (+{len(unfolded)}턴, {new_state.tokens} 토큰)")
+
+        except Exception as e:
+            self.summary_failures += 1
+            print(f"[HistoryBuilder] 대화 요약 실패 ({user_id}): {e}")
+        finally:
+            with self._lock:
+                if self._pending.get(user_id) is token:
+                    del self._pending[user_id]
+
+    def _truncate(self, text: str) -> str:
+        """요약이 summary_max_tokens 를 넘으면 잘라냄 (프롬프트 크기 상한 유지)"""
+        encoding = _encoding(self.model)
+        if encoding is None:
+            return text[:self.summary_max_tokens * 2]
+        tokens = encoding.encode(text)
+        if len(tokens) <= self.summary_max_tokens:
+            return text
+        return encoding.decode(tokens[:self.summary_max_tokens])
+
+    # ---------- 관리 ----------
+    def forget(self, user_id: str):
+        """사용자 요약 삭제 (대화 기록 삭제 시), 진행 중인 요약 결과도 버림"""
+        with self._lock:
+            self._summaries.pop(user_id, None)
+            self._pending.pop(user_id, None)
+
+    def get_summary(self, user_id: str) -> Optional[str]:
+        state = self._summaries.get(user_id)
+        return state.text if state else None
+
+    def stats(self) -> dict:
+        return {
+            "users_with_summary": len(self._summaries),
+            "pending": len(self._pending),
+            "generated": self.summaries_generated,
+            "failures": self.summary_failures,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,210 @@
+"""
+long_term_memory.py - 사용자별 장기 기억 (대화 턴 벡터 인덱스)
+최근 k턴(SimpleMemory) 밖으로 밀려난 대화도 필요할 때 찾아 쓸 수 있도록
+모든 대화 턴을 임베딩해서 로컬 Chroma 컬렉션("user_memories")에 저장합니다.
+
+- 저장: 요청 경로에서는 큐에 넣기만 하고, 백그라운드 스레드가 batch_size 개 / flush_interval 초 단위로 모아서 임베딩
+- 검색: metadata 의 user_id 로 필터링해서 해당 사용자의 대화만, 관련도 min_score 이상 상위 k개
+- 삭제: 대화 기록 저장소의 삭제 횟수(epoch)로 삭제 전에 큐에 들어간 턴을 걸러냄
+        (sqlite / redis 저장소면 다른 ttot 프로세스에서 삭제한 경우도 반영)
+- 문서 DB(elderly_knowledge)와 다른 디렉토리에 저장 (/documents/clear 로 지워지지 않음)
+- 검색은 요청 경로에서 질문을 임베딩하므로 켜면 턴마다 임베딩 API 왕복이 1번 늘어남 (기본값 꺼짐)
+"""
+import hashlib
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from langchain_chroma import Chroma
+
+from config import Config
+
+COLLECTION_NAME = "user_memories"
+
+
+def format_turn(human: str, ai: str) -> str:
+    return f"어르신: {human}\nAI: {ai}"
+
+
+class LongTermMemory:
+    """
+    사용자별 장기 기억 저장소
+
+    Attributes:
+        embeddings: 임베딩 모델 (RAGManager.embeddings 공유)
+        backend: 대화 기록 저장소 (삭제 횟수 epoch 조회용, 없으면 이 프로세스의 삭제만 반영)
+        k: 검색할 과거 대화 수
+        min_score: 최소 관련도 (0~1)
+        batch_size: 한 번에 임베딩할 최대 턴 수
+        flush_interval: 모인 턴을 저장하는 주기(초)
+    """
+
+    def __init__(self, embeddings, config: Config = None, backend=None):
+        self.config = config or Config
+        self.backend = backend
+        self.k = self.config.LONG_TERM_K
+        self.min_score = self.config.LONG_TERM_MIN_SCORE
+        self.batch_size = self.config.LONG_TERM_BATCH_SIZE
+        self.flush_interval = self.config.LONG_TERM_FLUSH_INTERVAL
+
+        # 텔레메트리 비활성화 (네트워크 오류 방지)
+        os.environ["ANONYMIZED_TELEMETRY"] = "False"
+        self.vectorstore = Chroma(
+            persist_directory=self.config.LONG_TERM_MEMORY_DIR,
+            embedding_function=embeddings,
+            collection_name=COLLECTION_NAME
+        )
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._epochs = {}           # user_id -> 삭제 횟수 (backend 가 없을 때만 사용)
+        self._lock = threading.Lock()
+        self.indexed_total = 0
+        self.failed_total = 0
+
+        self._thread = threading.Thread(target=self._run, name="long-term-memory", daemon=True)
+        self._thread.start()
+
+        print(f"[LongTermMemory] 장기 기억 로드 완료 (저장된 대화: {self.vectorstore._collection.count()}턴)")
+
+    # ---------- 요청 경로 ----------
+    def add_turn(self, user_id: str, human: str, ai: str):
+        """대화 1턴 저장 예약 (임베딩은 백그라운드에서 모아서 처리)"""
+        self._queue.put((user_id, human, ai, datetime.now().isoformat(), self._epoch(user_id)))
+
+    def _epoch(self, user_id: str) -> int:
+        """사용자 삭제 횟수 (삭제 전에 큐에 들어간 턴은 저장하지 않음)"""
+        if self.backend is not None:
+            return self.backend.epoch(user_id)
+        with self._lock:
+            return self._epochs.get(user_id, 0)
+
+    def search(self, user_id: str, query: str, exclude: Optional[set] = None) -> List[str]:
+        """
+        사용자의 과거 대화 중 query 와 관련 있는 턴 검색
+
+        Args:
+            user_id: 사용자 ID
+            query: 현재 사용자 입력
+            exclude: 제외할 턴 텍스트 (이미 프롬프트에 원문으로 들어가는 최근 대화)
+
+        Returns:
+            List[str]: 관련 있는 과거 대화 (관련도 높은 순)
+        """
+        exclude = exclude or set()
+        try:
+            results = self.vectorstore.similarity_search_with_relevance_scores(
+                query,
+                k=self.k + len(exclude),
+                filter={"user_id": user_id}
+            )
+        except Exception as e:
+            print(f"[LongTermMemory] 검색 실패 ({user_id}): {e}")
+            return []
+
+        turns = [
+            doc.page_content
+            for doc, score in results
+            if score >= self.min_score and doc.page_content not in exclude
+        ]
+        return turns[:self.k]
+
+    def forget(self, user_id: str):
+        """사용자의 장기 기억 삭제 (대화 기록 삭제 시, backend 가 있으면 backend.clear 로 epoch 를 올린 뒤 호출)"""
+        with self._lock:
+            if self.backend is None:
+                self._epochs[user_id] = self._epochs.get(user_id, 0) + 1
+            self.vectorstore._collection.delete(where={"user_id": user_id})
+        print(f"[LongTermMemory] 장기 기억 삭제: {user_id}")
+
+    # ---------- 백그라운드 저장 ----------
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            closed = False
+            # flush_interval 동안 batch_size 개까지 더 모음
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closed = True
+                    break
+                batch.append(item)
+
+            self._index(batch)
+            if closed:
+                return
+
+    def _current_epochs(self, user_ids) -> dict:
+        """배치에 들어 있는 사용자들의 현재 삭제 횟수 (사용자마다 한 번만 조회)"""
+        if self.backend is not None:
+            return {user_id: self.backend.epoch(user_id) for user_id in user_ids}
+        return {user_id: self._epochs.get(user_id, 0) for user_id in user_ids}
+
+    def _index(self, batch: list):
+        # 같은 프로세스의 삭제(forget)와 겹치지 않도록 락 안에서 확인 + 저장 (삭제 직후 이전 턴이 다시 저장되는 것 방지)
+        with self._lock:
+            try:
+                epochs = self._current_epochs({item[0] for item in batch})
+            except Exception as e:
+                self.failed_total += len(batch)
+                print(f"[LongTermMemory] 삭제 횟수 조회 실패 ({len(batch)}턴): {e}")
+                return
+
+            texts, metadatas, ids = [], [], []
+            for user_id, human, ai, ts, epoch in batch:
+                if epoch != epochs[user_id]:
+                    continue
+                texts.append(format_turn(human, ai))
+                metadatas.append({"user_id": user_id, "ts": ts})
+                ids.append(hashlib.sha1(f"{user_id}\x00{ts}\x00{human}".encode("utf-8")).hexdigest())
+            if not texts:
+                return
+
+            try:
+                self.vectorstore.add_texts(texts, metadatas=metadatas, ids=ids)
+                self.indexed_total += len(texts)
+            except Exception as e:
+                self.failed_total += len(texts)
+                print(f"[LongTermMemory] 저장 실패 ({len(texts)}턴): {e}")
+                return
+
+            if self.backend is not None:
+                self._drop_if_forgotten(epochs, metadatas, ids)
+
+    def _drop_if_forgotten(self, epochs: dict, metadatas: list, ids: list):
+        """
+        저장하는 사이 다른 프로세스가 삭제했으면 방금 저장한 턴을 지움
+        (삭제하는 쪽은 epoch 를 올린 뒤 벡터를 지우므로, 여기서 바뀐 epoch 를 못 봤다면 그쪽 삭제가 이 턴도 지움)
+        """
+        try:
+            changed = {user_id for user_id, epoch in self._current_epochs(epochs).items() if epoch != epochs[user_id]}
+            stale = [doc_id for doc_id, metadata in zip(ids, metadatas) if metadata["user_id"] in changed]
+            if stale:
+                self.vectorstore._collection.delete(ids=stale)
+                self.indexed_total -= len(stale)
+        except Exception as e:
+            print(f"[LongTermMemory] 삭제 확인 실패: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "indexed_total": self.indexed_total,
+            "failed_total": self.failed_total,
+            "pending": self._queue.qsize(),
+        }
+
+    def close(self):
+        """큐에 남은 턴 저장 후 종료"""
+        self._queue.put(None)
+        self._thread.join(timeout=30)
@@ -2,6 +2,9 @@
 main.py - RAG 기반 LLM 서버 (API 엔드포인트)
 로컬 파일 기반 메모리 버전
 """
+from contextlib import asynccontextmanager
+from typing import Optional
+
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -11,6 +14,7 @@ from models import (
     GenerateResponse,
     AddDocumentRequest,
     MemoryResponse,
+    ConversationResponse,
     StatsResponse,
     HealthResponse
 )
@@ -34,10 +38,23 @@ stats_service = services['stats']
 # [FastAPI 앱 생성]
 # ============================================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 최근 사용자 메모리를 백그라운드에서 미리 로드 (요청은 바로 받음)
+    initializer.start_warm_up()
+    yield
+    # 종료 시 대기 중인 대화 로그 fsync / 통계 파일 저장
+    initializer.history_builder.close()
+    if initializer.long_term_memory:
+        initializer.long_term_memory.close()
+    initializer.memory_manager.close()
+
+
 app = FastAPI(
     title=Config.SERVER_TITLE,
     description=Config.SERVER_DESCRIPTION,
-    version=Config.SERVER_VERSION
+    version=Config.SERVER_VERSION,
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -56,7 +73,7 @@ app.add_middleware(
 @app.post("/generate", response_model=GenerateResponse)
 async def generate_response(request: GenerateRequest):
     """채팅 응답 생성 (POST 방식)"""
-    return chat_service.generate_response(request)
+    return await chat_service.generate_response(request)
 
 
 @app.get("/generate", response_model=GenerateResponse)
@@ -81,7 +98,7 @@ async def generate_response_get(
         use_rag=use_rag,
         use_memory=use_memory
     )
-    return chat_service.generate_response(request)
+    return await chat_service.generate_response(request)
 
 
 # ============================================
@@ -164,6 +181,17 @@ async def get_memory(user_id: str):
     )
 
 
+@app.get("/conversation/{user_id}", response_model=ConversationResponse)
+async def get_conversation(user_id: str, limit: Optional[int] = None):
+    """저장된 대화 기록 조회 (back.py 대화 내역 화면용, 최근 limit 턴, 없으면 전체)"""
+    result = memory_service.get_conversation(user_id, limit)
+
+    return ConversationResponse(
+        user_id=result["user_id"],
+        turns=result["turns"]
+    )
+
+
 @app.delete("/memory/{user_id}")
 async def clear_memory(user_id: str):
     """대화 메모리 삭제"""
@@ -184,7 +212,8 @@ async def get_stats():
         total_conversations=result["total_conversations"],
         documents_in_db=result["documents_in_db"],
         model=result["model"],
-        embedding_model=result["embedding_model"]
+        embedding_model=result["embedding_model"],
+        memory_cache=result["memory_cache"]
     )
 
 
@@ -197,7 +226,9 @@ async def health_check():
         status=result["status"],
         service=result["service"],
         model=result["model"],
-        documents=result["documents"]
+        documents=result["documents"],
+        ready=result["ready"],
+        warmup=result["warmup"]
     )
 
 
@@ -215,7 +246,7 @@ async def root():
         "version": Config.SERVER_VERSION,
         "description": Config.SERVER_DESCRIPTION,
         "model": Config.LLM_MODEL,
-        "memory_storage": "local_file",
+        "memory_storage": Config.MEMORY_BACKEND,
         "features": [
             "RAG (문서 기반 검색)",
             "Memory (로컬 파일 기반 대화 기록)",
@@ -231,6 +262,7 @@ async def root():
             },
             "memory": {
                 "get": "GET /memory/{user_id}",
+                "conversation": "GET /conversation/{user_id}",
                 "clear": "DELETE /memory/{user_id}"
             },
             "system": {
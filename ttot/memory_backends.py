@@ -0,0 +1,518 @@
+"""
+memory_backends.py - 대화 기록 저장소 백엔드
+MemoryManager 는 이 인터페이스만 사용하고, config.json 의 memory.backend 로 저장소를 고릅니다.
+
+- file  : chat_history/{user_id}.jsonl (conversation_log.py), 프로세스 1개용 (기본값)
+- sqlite: SQLite 파일 1개 (WAL), 같은 머신의 ttot 프로세스 여러 개가 공유
+- redis : Redis 프로토콜 서버 (redis-py), 여러 머신의 ttot 프로세스가 공유
+          테스트 / 로컬 개발에는 redis_url 을 "fakeredis://" 로 두면 fakeredis 사용
+
+레코드 형식은 모든 백엔드가 같습니다: {"ts": ..., "human": ..., "ai": ...}
+저장소는 대화 내역의 유일한 원본이므로 모든 턴을 보관합니다 (프롬프트용 최근 k턴은 MemoryManager 의 SimpleMemory 캐시).
+"""
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from config import Config
+from conversation_log import ConversationLog
+from conversation_stats import ConversationStats
+
+
+class MemoryBackend:
+    """
+    대화 기록 저장소 인터페이스
+    모든 메서드는 동기 함수이며 여러 스레드에서 동시에 호출될 수 있습니다.
+    """
+    name = "base"
+    # 다른 프로세스도 같은 저장소에 쓰는지 (True 면 MemoryManager 가 캐시를 version 으로 검증)
+    shared = False
+
+    def append(self, user_id: str, record: dict) -> Optional[int]:
+        """대화 1턴 추가, 공유 저장소면 추가 후 사용자 version(누적 턴 수) 반환"""
+        raise NotImplementedError
+
+    def read_last(self, user_id: str, n: int) -> List[dict]:
+        """최근 n 턴 (오래된 것부터), 없으면 빈 리스트"""
+        raise NotImplementedError
+
+    def read_all(self, user_id: str) -> List[dict]:
+        """전체 턴 (오래된 것부터), 없으면 빈 리스트"""
+        raise NotImplementedError
+
+    def rewrite(self, user_id: str, records: List[dict]):
+        """사용자 기록 전체를 records 로 교체"""
+        raise NotImplementedError
+
+    def clear(self, user_id: str) -> bool:
+        """사용자 기록 삭제, 삭제한 기록이 있으면 True"""
+        raise NotImplementedError
+
+    def version(self, user_id: str) -> Optional[int]:
+        """사용자 version (누적 턴 수), 공유 저장소가 아니면 None"""
+        return None
+
+    def epoch(self, user_id: str) -> int:
+        """
+        사용자 기록 삭제 횟수 (clear 할 때마다 1 증가, 삭제해도 0 으로 돌아가지 않음)
+        장기 기억처럼 대화에서 파생된 데이터가 삭제 전에 받은 턴을 다시 쓰지 않도록 확인하는 용도
+        """
+        raise NotImplementedError
+
+    def user_ids(self) -> List[str]:
+        raise NotImplementedError
+
+    def recent_user_ids(self, n: int) -> List[str]:
+        """최근에 대화한 사용자 n명 (최근 순)"""
+        raise NotImplementedError
+
+    def active_users(self) -> int:
+        raise NotImplementedError
+
+    def total_turns(self) -> int:
+        raise NotImplementedError
+
+    def location(self, user_id: str) -> str:
+        """로그 출력용 저장 위치"""
+        return f"{self.name}:{user_id}"
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+    def close(self):
+        """대기 중인 쓰기 처리 + 리소스 정리"""
+
+
+# ========== 파일 (JSONL) ==========
+class FileMemoryBackend(MemoryBackend):
+    """
+    사용자별 append-only JSONL 파일 (conversation_log.py) + 통계 카운터 파일
+    예전 형식(chat_history/{user_id}.json)은 처음 읽을 때 JSONL 로 변환합니다.
+    """
+    name = "file"
+
+    def __init__(self, directory: str, fsync_interval: float = 1.0):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.log = ConversationLog(directory, fsync_interval=fsync_interval)
+        self.counters = ConversationStats(directory, flush_interval=fsync_interval or 1.0)
+        self._epochs = {}       # 프로세스 1개용이므로 삭제 횟수는 메모리에만 보관
+        self._epochs_lock = threading.Lock()
+
+    def _legacy_filepath(self, user_id: str) -> str:
+        return f"{self.directory}/{user_id}.json"
+
+    def _migrate_legacy(self, user_id: str):
+        """예전 JSON 파일을 턴 단위 레코드로 변환 (human 다음 ai 가 오는 쌍만)"""
+        with open(self._legacy_filepath(user_id), "r", encoding="utf-8") as f:
+            history_data = json.load(f)
+
+        records = []
+        pending = None
+        for item in history_data:
+            if item["type"] == "human":
+                pending = item
+            elif item["type"] == "ai" and pending is not None:
+                records.append({"ts": pending.get("timestamp"), "human": pending["content"], "ai": item["content"]})
+                pending = None
+
+        self.log.rewrite(user_id, records)
+        os.remove(self._legacy_filepath(user_id))
+        print(f"[Memory] 예전 대화 기록 변환: {self.log.path(user_id)}")
+
+    def append(self, user_id: str, record: dict) -> Optional[int]:
+        self.log.append(user_id, record)
+        self.counters.record_turn(user_id)
+        return None
+
+    def _ensure_migrated(self, user_id: str) -> bool:
+        """대화 로그가 있으면 True (예전 형식 파일만 있으면 먼저 변환)"""
+        if not self.log.exists(user_id):
+            if not os.path.exists(self._legacy_filepath(user_id)):
+                return False
+            self._migrate_legacy(user_id)
+        return True
+
+    def read_last(self, user_id: str, n: int) -> List[dict]:
+        if not self._ensure_migrated(user_id):
+            return []
+        return self.log.read_last(user_id, n)
+
+    def read_all(self, user_id: str) -> List[dict]:
+        if not self._ensure_migrated(user_id):
+            return []
+        return self.log.read_all(user_id)
+
+    def rewrite(self, user_id: str, records: List[dict]):
+        self.log.rewrite(user_id, records)
+
+    def clear(self, user_id: str) -> bool:
+        with self._epochs_lock:
+            self._epochs[user_id] = self._epochs.get(user_id, 0) + 1
+        self.counters.remove_user(user_id)
+        removed = self.log.clear(user_id)
+        filepath = self._legacy_filepath(user_id)
+        if os.path.exists(filepath):
+            os.remove(filepath)
+            removed = True
+        return removed
+
+    def epoch(self, user_id: str) -> int:
+        with self._epochs_lock:
+            return self._epochs.get(user_id, 0)
+
+    def _scan(self):
+        """(수정 시각, user_id) 목록, 대화 로그와 예전 형식 파일 모두"""
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".jsonl"):
+                    yield entry.stat().st_mtime, entry.name[:-len(".jsonl")]
+                elif entry.name.endswith(".json"):
+                    yield entry.stat().st_mtime, entry.name[:-len(".json")]
+
+    def user_ids(self) -> List[str]:
+        return sorted({user_id for _, user_id in self._scan()})
+
+    def recent_user_ids(self, n: int) -> List[str]:
+        user_ids = []
+        for _, user_id in heapq.nlargest(n, self._scan()):
+            if user_id not in user_ids:
+                user_ids.append(user_id)
+        return user_ids
+
+    def active_users(self) -> int:
+        return self.counters.active_users
+
+    def total_turns(self) -> int:
+        return self.counters.total_turns
+
+    def location(self, user_id: str) -> str:
+        return str(self.log.path(user_id))
+
+    def stats(self) -> dict:
+        return {"backend": self.name, **self.log.stats()}
+
+    def close(self):
+        self.log.flush()
+        self.log.close()
+        self.counters.close()
+
+
+# ========== SQLite (WAL) ==========
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    ts TEXT,
+    human TEXT NOT NULL,
+    ai TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_turns_user ON turns(user_id, id);
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    turns INTEGER NOT NULL DEFAULT 0,     -- 누적 턴 수 (version)
+    last_active REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_users_recent ON users(last_active);
+CREATE TABLE IF NOT EXISTS totals (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals (name, value) VALUES ('active_users', 0), ('total_turns', 0);
+CREATE TABLE IF NOT EXISTS epochs (
+    user_id TEXT PRIMARY KEY,
+    epoch INTEGER NOT NULL                -- 삭제 횟수 (users 행을 지워도 유지)
+);
+"""
+
+
+class SQLiteMemoryBackend(MemoryBackend):
+    """
+    SQLite 파일 1개에 모든 사용자 기록 저장 (WAL 모드, 같은 머신의 여러 프로세스가 공유)
+    """
+    name = "sqlite"
+    shared = True
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []    # close() 에서 모든 스레드의 연결을 닫기 위해 보관
+        self._connections_lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.executescript(_SQLITE_SCHEMA)
+        print(f"[Memory] SQLite 대화 저장소: {path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """스레드별 연결 (sqlite3 연결은 스레드 간 공유하지 않음)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # 쿼리는 만든 스레드에서만 실행, check_same_thread=False 는 close() 가 다른 스레드의 연결을 닫기 위함
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL 에서는 NORMAL 이어도 DB 손상 없음 (전원 장애 시 마지막 커밋 일부만 유실될 수 있음)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _transaction(self):
+        conn = self._connect()
+        return _ImmediateTransaction(conn)
+
+    def append(self, user_id: str, record: dict) -> Optional[int]:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO turns (user_id, ts, human, ai) VALUES (?, ?, ?, ?)",
+                (user_id, record.get("ts"), record["human"], record["ai"])
+            )
+            row = conn.execute("SELECT turns FROM users WHERE user_id = ?", (user_id,)).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO users (user_id, turns, last_active) VALUES (?, 1, ?)",
+                    (user_id, time.time())
+                )
+                conn.execute("UPDATE totals SET value = value + 1 WHERE name = 'active_users'")
+                version = 1
+            else:
+                version = row[0] + 1
+                conn.execute(
+                    "UPDATE users SET turns = ?, last_active = ? WHERE user_id = ?",
+                    (version, time.time(), user_id)
+                )
+            conn.execute("UPDATE totals SET value = value + 1 WHERE name = 'total_turns'")
+        return version
+
+    def read_last(self, user_id: str, n: int) -> List[dict]:
+        rows = self._connect().execute(
+            "SELECT ts, human, ai FROM turns WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+            (user_id, n)
+        ).fetchall()
+        return [{"ts": ts, "human": human, "ai": ai} for ts, human, ai in reversed(rows)]
+
+    def read_all(self, user_id: str) -> List[dict]:
+        rows = self._connect().execute(
+            "SELECT ts, human, ai FROM turns WHERE user_id = ? ORDER BY id", (user_id,)
+        ).fetchall()
+        return [{"ts": ts, "human": human, "ai": ai} for ts, human, ai in rows]
+
+    def rewrite(self, user_id: str, records: List[dict]):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM turns WHERE user_id = ?", (user_id,))
+            conn.executemany(
+                "INSERT INTO turns (user_id, ts, human, ai) VALUES (?, ?, ?, ?)",
+                [(user_id, record.get("ts"), record["human"], record["ai"]) for record in records]
+            )
+
+    def clear(self, user_id: str) -> bool:
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO epochs (user_id, epoch) VALUES (?, 1) "
+                "ON CONFLICT(user_id) DO UPDATE SET epoch = epoch + 1",
+                (user_id,)
+            )
+            row = conn.execute("SELECT turns FROM users WHERE user_id = ?", (user_id,)).fetchone()
+            if row is None:
+                return False
+            conn.execute("DELETE FROM turns WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+            conn.execute("UPDATE totals SET value = value - 1 WHERE name = 'active_users'")
+            conn.execute("UPDATE totals SET value = value - ? WHERE name = 'total_turns'", (row[0],))
+        return True
+
+    def version(self, user_id: str) -> Optional[int]:
+        row = self._connect().execute("SELECT turns FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def epoch(self, user_id: str) -> int:
+        row = self._connect().execute("SELECT epoch FROM epochs WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def user_ids(self) -> List[str]:
+        return [row[0] for row in self._connect().execute("SELECT user_id FROM users ORDER BY user_id")]
+
+    def recent_user_ids(self, n: int) -> List[str]:
+        rows = self._connect().execute(
+            "SELECT user_id FROM users ORDER BY last_active DESC LIMIT ?", (n,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _total(self, name: str) -> int:
+        return self._connect().execute("SELECT value FROM totals WHERE name = ?", (name,)).fetchone()[0]
+
+    def active_users(self) -> int:
+        return self._total("active_users")
+
+    def total_turns(self) -> int:
+        return self._total("total_turns")
+
+    def location(self, user_id: str) -> str:
+        return f"{self.path}#{user_id}"
+
+    def close(self):
+        """이 백엔드가 연 모든 스레드의 연결 종료"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local.conn = None
+
+
+class _ImmediateTransaction:
+    """BEGIN IMMEDIATE ... COMMIT (쓰기 락을 처음부터 잡아서 읽고-쓰기 사이에 다른 프로세스가 끼어들지 않음)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# ========== Redis ==========
+class RedisMemoryBackend(MemoryBackend):
+    """
+    Redis 프로토콜 서버에 저장 (여러 머신의 ttot 프로세스가 공유)
+
+    키 구조 (prefix 기본값 "ttot:"):
+        {prefix}log:{user_id}   LIST  대화 레코드 JSON (RPUSH, 전체 보관)
+        {prefix}turns           HASH  user_id -> 누적 턴 수 (version)
+        {prefix}epochs          HASH  user_id -> 삭제 횟수 (epoch)
+        {prefix}recent          ZSET  user_id -> 마지막 대화 시각
+        {prefix}total_turns     STRING 전체 누적 턴 수
+    """
+    name = "redis"
+    shared = True
+
+    def __init__(self, client, prefix: str = "ttot:"):
+        self.client = client
+        self.prefix = prefix
+        self._turns_key = f"{prefix}turns"
+        self._recent_key = f"{prefix}recent"
+        self._total_key = f"{prefix}total_turns"
+        self._epochs_key = f"{prefix}epochs"
+
+    def _log_key(self, user_id: str) -> str:
+        return f"{self.prefix}log:{user_id}"
+
+    def append(self, user_id: str, record: dict) -> Optional[int]:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.rpush(self._log_key(user_id), json.dumps(record, ensure_ascii=False))
+        pipe.hincrby(self._turns_key, user_id, 1)
+        pipe.zadd(self._recent_key, {user_id: time.time()})
+        pipe.incr(self._total_key)
+        _, version, _, _ = pipe.execute()
+        return int(version)
+
+    def read_last(self, user_id: str, n: int) -> List[dict]:
+        if n <= 0:
+            return []
+        return [json.loads(item) for item in self.client.lrange(self._log_key(user_id), -n, -1)]
+
+    def read_all(self, user_id: str) -> List[dict]:
+        return [json.loads(item) for item in self.client.lrange(self._log_key(user_id), 0, -1)]
+
+    def rewrite(self, user_id: str, records: List[dict]):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self._log_key(user_id))
+        if records:
+            pipe.rpush(self._log_key(user_id), *[json.dumps(record, ensure_ascii=False) for record in records])
+        pipe.execute()
+
+    def clear(self, user_id: str) -> bool:
+        """
+        사용자 기록 삭제 (턴 수를 읽고 삭제하는 사이에 다른 프로세스가 append 하면 total_turns 가 어긋나므로
+        turns 해시를 WATCH 하고, 그 사이 바뀌었으면 다시 시도)
+        """
+        from redis.exceptions import WatchError
+
+        self.client.hincrby(self._epochs_key, user_id, 1)
+        with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    pipe.watch(self._turns_key)
+                    turns = pipe.hget(self._turns_key, user_id)
+                    if turns is None:
+                        pipe.unwatch()
+                        return False
+                    pipe.multi()
+                    pipe.delete(self._log_key(user_id))
+                    pipe.hdel(self._turns_key, user_id)
+                    pipe.zrem(self._recent_key, user_id)
+                    pipe.decrby(self._total_key, int(turns))
+                    pipe.execute()
+                    return True
+                except WatchError:
+                    continue
+
+    def version(self, user_id: str) -> Optional[int]:
+        return int(self.client.hget(self._turns_key, user_id) or 0)
+
+    def epoch(self, user_id: str) -> int:
+        return int(self.client.hget(self._epochs_key, user_id) or 0)
+
+    def user_ids(self) -> List[str]:
+        return sorted(_decode(user_id) for user_id in self.client.hkeys(self._turns_key))
+
+    def recent_user_ids(self, n: int) -> List[str]:
+        if n <= 0:
+            return []
+        return [_decode(user_id) for user_id in self.client.zrevrange(self._recent_key, 0, n - 1)]
+
+    def active_users(self) -> int:
+        return int(self.client.hlen(self._turns_key))
+
+    def total_turns(self) -> int:
+        return int(self.client.get(self._total_key) or 0)
+
+    def location(self, user_id: str) -> str:
+        return self._log_key(user_id)
+
+    def close(self):
+        self.client.close()
+
+
+def _decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def create_redis_client(url: str):
+    """redis_url 에 맞는 클라이언트 ("fakeredis://" 면 프로세스 내 fakeredis)"""
+    if url.startswith("fakeredis://"):
+        import fakeredis
+        return fakeredis.FakeRedis()
+    import redis
+    return redis.Redis.from_url(url)
+
+
+def create_memory_backend(config: Config = None) -> MemoryBackend:
+    """config.json 의 memory.backend 설정에 맞는 백엔드 생성"""
+    config = config or Config
+    backend = (config.MEMORY_BACKEND or "file").lower()
+
+    if backend == "file":
+        return FileMemoryBackend(
+            config.MEMORY_DIR,
+            fsync_interval=config.MEMORY_FSYNC_INTERVAL
+        )
+    if backend == "sqlite":
+        return SQLiteMemoryBackend(config.MEMORY_SQLITE_PATH)
+    if backend == "redis":
+        print(f"[Memory] Redis 대화 저장소: {config.MEMORY_REDIS_URL}")
+        return RedisMemoryBackend(
+            create_redis_client(config.MEMORY_REDIS_URL),
+            prefix=config.MEMORY_REDIS_PREFIX
+        )
+
+    raise ValueError(f"알 수 없는 메모리 백엔드: {config.MEMORY_BACKEND}")
@@ -0,0 +1,150 @@
+"""
+memory_cache.py - 사용자 메모리 LRU 캐시
+MemoryManager.memory_store 로 사용합니다.
+
+- 사용자 수(max_users) / 추정 바이트(max_bytes) 상한을 넘으면 가장 오래 안 쓴 사용자부터 제거
+- idle_ttl 초 동안 접근이 없던 사용자도 제거 (접근 / 추가할 때 함께 정리)
+- 대화는 save_context 에서 이미 대화 로그에 기록되므로 (write-through) 제거할 때 따로 저장할 필요 없음
+  제거된 사용자는 다음 요청 때 대화 로그에서 다시 로드됩니다.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# 사용자 1명당 고정 비용 추정치 (SimpleMemory 객체, 메시지 레코드, 딕셔너리 항목 등)
+ENTRY_OVERHEAD_BYTES = 2048
+MESSAGE_OVERHEAD_BYTES = 64
+
+
+def estimate_memory_bytes(memory) -> int:
+    """SimpleMemory 가 차지하는 메모리 추정 (대화 내용 문자열 크기 기준)"""
+    records = memory.records
+    return (
+        ENTRY_OVERHEAD_BYTES
+        + len(records) * MESSAGE_OVERHEAD_BYTES
+        + sum(sys.getsizeof(record.content) for record in records)
+    )
+
+
+class _Entry:
+    __slots__ = ("memory", "size", "last_access")
+
+    def __init__(self, memory, size: int, last_access: float):
+        self.memory = memory
+        self.size = size
+        self.last_access = last_access
+
+
+class MemoryCache:
+    """
+    사용자 수 / 바이트 / 유휴 시간 제한이 있는 LRU 캐시
+
+    Attributes:
+        max_users: 최대 사용자 수 (0 이면 제한 없음)
+        max_bytes: 최대 추정 바이트 (0 이면 제한 없음)
+        idle_ttl: 이 시간(초) 동안 접근이 없으면 제거 (0 이면 제한 없음)
+    """
+
+    def __init__(self, max_users: int = 1000, max_bytes: int = 64 * 1024 * 1024, idle_ttl: float = 1800.0):
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: str):
+        """캐시에서 메모리 조회 (최근 사용으로 표시), 없으면 None"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            entry.last_access = now
+            self.hits += 1
+            return entry.memory
+
+    def peek(self, user_id: str):
+        """LRU 순서 / 통계를 바꾸지 않고 조회 (통계 집계용)"""
+        entry = self._entries.get(user_id)
+        return entry.memory if entry else None
+
+    def put(self, user_id: str, memory):
+        """메모리 추가 또는 크기 갱신 (대화가 추가된 뒤 다시 호출)"""
+        size = estimate_memory_bytes(memory)
+        now = time.monotonic()
+        with self._lock:
+            old = self._entries.pop(user_id, None)
+            if old is not None:
+                self.total_bytes -= old.size
+            self._entries[user_id] = _Entry(memory, size, now)
+            self.total_bytes += size
+            self._expire(now)
+            self._evict(keep=user_id)
+
+    def pop(self, user_id: str):
+        """사용자 제거 (대화 기록 삭제 시)"""
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            if entry is None:
+                return None
+            self.total_bytes -= entry.size
+            return entry.memory
+
+    def _expire(self, now: float):
+        """맨 앞(가장 오래 안 쓴 사용자)부터 idle_ttl 이 지난 항목 제거"""
+        if not self.idle_ttl:
+            return
+        while self._entries:
+            user_id, entry = next(iter(self._entries.items()))
+            if now - entry.last_access < self.idle_ttl:
+                break
+            self._entries.popitem(last=False)
+            self.total_bytes -= entry.size
+            self.expirations += 1
+
+    def _evict(self, keep: Optional[str] = None):
+        """사용자 수 / 바이트 상한을 넘으면 LRU 순서로 제거 (방금 추가한 사용자는 남김)"""
+        while len(self._entries) > 1 and (
+            (self.max_users and len(self._entries) > self.max_users)
+            or (self.max_bytes and self.total_bytes > self.max_bytes)
+        ):
+            user_id, entry = next(iter(self._entries.items()))
+            if user_id == keep:
+                break
+            self._entries.popitem(last=False)
+            self.total_bytes -= entry.size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire(time.monotonic())
+            lookups = self.hits + self.misses
+            return {
+                "users": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_users": self.max_users,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -1,14 +1,38 @@
 """
 memory_manager.py - 대화 메모리 관리
-로컬 파일(chat_history 폴더) 기반 버전
+
+저장소는 config.json 의 memory.backend 로 선택합니다 (memory_backends.py).
+- file  : chat_history/{user_id}.jsonl (append-only, 대화 1턴 = 1줄), 예전 .json 형식은 처음 로드할 때 변환
+- sqlite: SQLite 파일 1개 (WAL), 같은 머신의 여러 ttot 프로세스가 공유
+- redis : Redis 프로토콜 서버, 여러 머신의 ttot 프로세스가 공유
+메모리에는 최근 사용자만 LRU 로 유지합니다 (memory_cache.py).
+공유 저장소에서는 캐시된 메모리를 사용자 version(누적 턴 수)으로 검증해서, 다른 프로세스가 쓴 턴이 있으면 다시 로드합니다.
 """
 from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
-from typing import Dict, List
-import json
-import os
+from typing import Deque, Dict, List, Optional
+from collections import deque
+import threading
+import zlib
 from datetime import datetime
 
 from config import Config
+from memory_backends import MemoryBackend, create_memory_backend
+from memory_cache import MemoryCache
+
+# 사용자별 락 대신 고정 개수의 락을 나눠 씀 (사용자 수가 늘어도 락 개수는 그대로)
+LOCK_STRIPES = 64
+
+
+class MessageRecord:
+    """대화 메시지 1개 (LangChain 메시지 객체 대신 보관하는 가벼운 레코드)"""
+    __slots__ = ("type", "content")
+
+    def __init__(self, type: str, content: str):
+        self.type = type
+        self.content = content
+
+
+_MESSAGE_CLASSES = {"human": HumanMessage, "ai": AIMessage}
 
 
 class SimpleMemory:
@@ -20,51 +44,78 @@ class SimpleMemory:
             k: 유지할 최근 대화 개수
         """
         self.k = k
-        self.messages: List[BaseMessage] = []
+        # 최근 k개 대화만 유지 (Human + AI 쌍), 넘치면 deque 가 가장 오래된 것부터 버림
+        self.records: Deque[MessageRecord] = deque(maxlen=k * 2)
+        # LangChain 메시지 변환 결과 캐시 (대화가 추가되면 무효화)
+        self._messages_cache: Optional[List[BaseMessage]] = None
+        # 저장소의 사용자 version (공유 저장소일 때만, 다른 프로세스가 쓴 턴이 있는지 확인용)
+        self.version: Optional[int] = None
 
     def add_message(self, message: BaseMessage):
         """메시지 추가"""
-        self.messages.append(message)
-        # 최근 k개 대화만 유지 (Human + AI 쌍)
-        if len(self.messages) > self.k * 2:
-            self.messages = self.messages[-(self.k * 2):]
+        self._append(message.type, message.content)
+
+    def _append(self, type: str, content: str):
+        self.records.append(MessageRecord(type, content))
+        self._messages_cache = None
 
     def add_user_message(self, text: str):
         """사용자 메시지 추가"""
-        self.add_message(HumanMessage(content=text))
+        self._append("human", text)
 
     def add_ai_message(self, text: str):
         """AI 메시지 추가"""
-        self.add_message(AIMessage(content=text))
+        self._append("ai", text)
 
     def get_messages(self) -> List[BaseMessage]:
-        """모든 메시지 반환"""
-        return self.messages
+        """모든 메시지 반환 (프롬프트 생성용 LangChain 메시지, 수정하지 말 것)"""
+        if self._messages_cache is None:
+            self._messages_cache = [
+                _MESSAGE_CLASSES[record.type](content=record.content)
+                for record in self.records
+            ]
+        return self._messages_cache
 
     def clear(self):
         """메모리 초기화"""
-        self.messages = []
+        self.records.clear()
+        self._messages_cache = None
 
     def load_memory_variables(self, inputs: dict) -> dict:
         """LangChain 호환성을 위한 메서드"""
-        return {"chat_history": self.messages}
+        return {"chat_history": self.get_messages()}
 
 
 class MemoryManager:
-    """대화 메모리 관리 클래스 - 로컬 파일 기반"""
+    """대화 메모리 관리 클래스 - 저장소 백엔드(file / sqlite / redis) 기반"""
 
-    def __init__(self, config: Config = None):
+    def __init__(self, config: Config = None, backend: MemoryBackend = None):
         """
         Args:
             config: 설정 객체
+            backend: 대화 기록 저장소 (없으면 config 의 memory.backend 로 생성)
         """
         self.config = config or Config
-        self.memory_store: Dict[str, SimpleMemory] = {}
+        self.memory_store = MemoryCache(
+            max_users=self.config.MEMORY_CACHE_MAX_USERS,
+            max_bytes=self.config.MEMORY_CACHE_MAX_BYTES,
+            idle_ttl=self.config.MEMORY_CACHE_IDLE_TTL
+        )
+        # 같은 사용자의 로드 / 대화 추가는 순서대로 (캐시에서 제거된 직후 다시 로드해도 턴 유실 없음)
+        self._locks = [threading.RLock() for _ in range(LOCK_STRIPES)]
 
-        # 메모리 디렉토리 생성
-        os.makedirs(self.config.MEMORY_DIR, exist_ok=True)
+        # 대화 기록 저장소 (압축 후에도 최근 MEMORY_K 턴은 남김) + /stats 용 카운터
+        self.backend = backend or create_memory_backend(self.config)
 
-        print(f"[MemoryManager] 메모리 관리자 초기화 완료 (저장 경로: {self.config.MEMORY_DIR})")
+        print(f"[MemoryManager] 메모리 관리자 초기화 완료 (저장소: {self.backend.name})")
+
+    def _user_lock(self, user_id: str) -> threading.RLock:
+        return self._locks[zlib.crc32(user_id.encode("utf-8")) % LOCK_STRIPES]
+
+    def _snapshot_records(self, user_id: str) -> list:
+        """사용자 메시지 목록 스냅샷 (save_context 가 deque 를 바꾸는 도중에 순회하지 않도록 락 안에서 복사)"""
+        with self._user_lock(user_id):
+            return list(self.get_or_create_memory(user_id).records)
 
     def _create_memory(self) -> SimpleMemory:
         """새 메모리 생성"""
@@ -80,20 +131,35 @@ class MemoryManager:
         Returns:
             SimpleMemory: 사용자 메모리
         """
-        # 메모리 저장소에 있으면 반환
-        if user_id in self.memory_store:
-            return self.memory_store[user_id]
-
-        # 파일에서 로드 시도
-        memory = self.load_memory_from_file(user_id)
-        if memory:
-            self.memory_store[user_id] = memory
+        # 메모리 저장소에 있으면 반환 (공유 저장소면 다른 프로세스가 쓴 턴이 없을 때만)
+        memory = self.memory_store.get(user_id)
+        if memory is not None and self._is_current(user_id, memory):
+            return memory
+
+        with self._user_lock(user_id):
+            # 락을 기다리는 동안 다른 요청이 로드했을 수 있음
+            memory = self.memory_store.peek(user_id)
+            if memory is not None and self._is_current(user_id, memory):
+                return memory
+
+            # 저장소에서 로드 시도, 없으면 새로 생성 (공유 저장소에서는 version 0 부터)
+            memory = self.load_memory_from_file(user_id)
+            if memory is None:
+                memory = self._create_memory()
+                memory.version = 0 if self.backend.shared else None
+            self.memory_store.put(user_id, memory)
             return memory
 
-        # 새로 생성
-        memory = self._create_memory()
-        self.memory_store[user_id] = memory
-        return memory
+    def _is_current(self, user_id: str, memory: SimpleMemory) -> bool:
+        """캐시된 메모리가 저장소와 같은 version 인지 (프로세스 혼자 쓰는 저장소면 항상 True)"""
+        if not self.backend.shared:
+            return True
+        try:
+            return self.backend.version(user_id) == memory.version
+        except Exception as e:
+            # 저장소에 연결할 수 없으면 캐시된 내용으로 계속 대화
+            print(f"[Memory] version 확인 실패 ({user_id}): {e}")
+            return True
 
     def save_context(self, user_id: str, input_text: str, output_text: str):
         """
@@ -104,12 +170,26 @@ class MemoryManager:
             input_text: 사용자 입력
             output_text: AI 출력
         """
-        memory = self.get_or_create_memory(user_id)
-        memory.add_user_message(input_text)
-        memory.add_ai_message(output_text)
-
-        # 파일로 저장
-        self.save_memory_to_file(user_id)
+        with self._user_lock(user_id):
+            memory = self.get_or_create_memory(user_id)
+            memory.add_user_message(input_text)
+            memory.add_ai_message(output_text)
+
+            # 저장소에 이번 턴만 추가 (전체를 다시 쓰지 않음)
+            version = self.backend.append(user_id, {
+                "ts": datetime.now().isoformat(),
+                "human": input_text,
+                "ai": output_text
+            })
+
+            if version is not None and memory.version is not None and version != memory.version + 1:
+                # 그 사이 다른 프로세스도 이 사용자의 턴을 씀 → 저장소 순서대로 다시 로드
+                memory = self.load_memory_from_file(user_id) or memory
+            elif version is not None:
+                memory.version = version
+
+            # 크기 갱신 (그 사이 캐시에서 제거됐으면 다시 넣음, 저장소와 같은 내용이므로 안전)
+            self.memory_store.put(user_id, memory)
 
     def get_chat_history(self, user_id: str) -> List[Dict]:
         """
@@ -121,8 +201,7 @@ class MemoryManager:
         Returns:
             List[Dict]: 대화 기록
         """
-        memory = self.get_or_create_memory(user_id)
-        messages = memory.get_messages()
+        messages = self._snapshot_records(user_id)
 
         return [
             {
@@ -134,7 +213,9 @@ class MemoryManager:
 
     def save_memory_to_file(self, user_id: str) -> bool:
         """
-        대화 기록을 JSON 파일로 저장
+        현재 메모리 전체를 저장소에 다시 저장 (스냅샷)
+        평소 턴 저장은 save_context 의 append 로 처리되므로 수동 스냅샷에만 사용
+        저장소는 대화 내역의 원본이므로 이미 기록이 있으면 최근 k턴으로 덮어쓰지 않음
 
         Args:
             user_id: 사용자 ID
@@ -142,29 +223,22 @@ class MemoryManager:
         Returns:
             bool: 저장 성공 여부
         """
-        if user_id not in self.memory_store:
+        memory = self.memory_store.peek(user_id)
+        if memory is None:
             return False
 
         try:
-            memory = self.memory_store[user_id]
-            messages = memory.get_messages()
-
-            # JSON 형태로 변환
-            history_data = [
-                {
-                    "type": msg.type,
-                    "content": msg.content,
-                    "timestamp": datetime.now().isoformat()
-                }
-                for msg in messages
+            if self.backend.read_last(user_id, 1):
+                return True
+            with self._user_lock(user_id):
+                messages = list(memory.records)
+            records = [
+                {"ts": None, "human": human.content, "ai": ai.content}
+                for human, ai in zip(messages[0::2], messages[1::2])
             ]
+            self.backend.rewrite(user_id, records)
 
-            # JSON 파일로 저장
-            filepath = f"{self.config.MEMORY_DIR}/{user_id}.json"
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(history_data, f, ensure_ascii=False, indent=2)
-
-            print(f"[Memory] 대화 기록 저장: {filepath}")
+            print(f"[Memory] 대화 기록 스냅샷 저장: {self.backend.location(user_id)}")
             return True
 
         except Exception as e:
@@ -173,7 +247,7 @@ class MemoryManager:
 
     def load_memory_from_file(self, user_id: str) -> SimpleMemory:
         """
-        JSON 파일에서 대화 기록 복원
+        저장소에서 최근 MEMORY_K 턴만 읽어 메모리 복원
 
         Args:
             user_id: 사용자 ID
@@ -181,25 +255,20 @@ class MemoryManager:
         Returns:
             SimpleMemory: 복원된 메모리 (없으면 None)
         """
-        filepath = f"{self.config.MEMORY_DIR}/{user_id}.json"
-
-        if not os.path.exists(filepath):
-            return None
-
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                history_data = json.load(f)
+            # version 을 먼저 읽음 (사이에 다른 프로세스가 쓰면 다음 조회 때 다시 로드)
+            version = self.backend.version(user_id)
+            records = self.backend.read_last(user_id, self.config.MEMORY_K)
+            if not records and not version:
+                return None
 
             memory = self._create_memory()
+            for record in records:
+                memory.add_user_message(record["human"])
+                memory.add_ai_message(record["ai"])
+            memory.version = version
 
-            # 메시지 복원
-            for item in history_data:
-                if item["type"] == "human":
-                    memory.add_user_message(item["content"])
-                elif item["type"] == "ai":
-                    memory.add_ai_message(item["content"])
-
-            print(f"[Memory] 대화 기록 로드: {filepath} ({len(history_data)}개)")
+            print(f"[Memory] 대화 기록 로드: {self.backend.location(user_id)} ({len(records)}턴)")
             return memory
 
         except Exception as e:
@@ -217,15 +286,13 @@ class MemoryManager:
             bool: 삭제 성공 여부
         """
         try:
-            # 메모리 저장소에서 삭제
-            if user_id in self.memory_store:
-                del self.memory_store[user_id]
+            with self._user_lock(user_id):
+                # 메모리 저장소에서 삭제
+                self.memory_store.pop(user_id)
 
-            # 파일 삭제
-            filepath = f"{self.config.MEMORY_DIR}/{user_id}.json"
-            if os.path.exists(filepath):
-                os.remove(filepath)
-                print(f"[Memory] 대화 기록 삭제: {filepath}")
+                # 저장소에서 삭제 (파일 백엔드는 대화 로그 + 예전 형식 파일)
+                if self.backend.clear(user_id):
+                    print(f"[Memory] 대화 기록 삭제: {self.backend.location(user_id)}")
 
             return True
 
@@ -241,13 +308,55 @@ class MemoryManager:
             List[str]: 사용자 ID 목록
         """
         try:
-            files = os.listdir(self.config.MEMORY_DIR)
-            user_ids = [f.replace(".json", "") for f in files if f.endswith(".json")]
-            return user_ids
+            return self.backend.user_ids()
         except Exception as e:
             print(f"[Memory] 사용자 목록 조회 실패: {e}")
             return []
 
+    def recent_user_ids(self, n: int) -> List[str]:
+        """
+        최근에 대화한 사용자 n명 (최근 순)
+
+        Args:
+            n: 가져올 사용자 수
+
+        Returns:
+            List[str]: 사용자 ID 목록
+        """
+        return self.backend.recent_user_ids(n)
+
+    def preload(self, user_id: str) -> bool:
+        """
+        사용자 메모리를 미리 캐시에 로드 (warm-up 용, hit / miss 통계에 포함하지 않음)
+        요청이 먼저 로드했으면 그대로 둠
+
+        Returns:
+            bool: 새로 로드했으면 True
+        """
+        with self._user_lock(user_id):
+            if self.memory_store.peek(user_id) is not None:
+                return False
+            memory = self.load_memory_from_file(user_id)
+            if memory is None:
+                return False
+            self.memory_store.put(user_id, memory)
+            return True
+
+    def get_conversation(self, user_id: str, limit: Optional[int] = None) -> List[dict]:
+        """
+        저장소의 대화 기록 조회 (캐시를 거치지 않음, 다른 서비스의 대화 내역 화면용)
+
+        Args:
+            user_id: 사용자 ID
+            limit: 최근 몇 턴까지 (없으면 전체)
+
+        Returns:
+            List[dict]: 대화 턴 목록 ({"ts", "human", "ai"}, 오래된 것부터)
+        """
+        if limit:
+            return self.backend.read_last(user_id, limit)
+        return self.backend.read_all(user_id)
+
     def get_memory_info(self, user_id: str) -> dict:
         """
         메모리 정보 조회
@@ -258,8 +367,7 @@ class MemoryManager:
         Returns:
             dict: 메모리 정보
         """
-        memory = self.get_or_create_memory(user_id)
-        messages = memory.get_messages()
+        messages = self._snapshot_records(user_id)
 
         return {
             "user_id": user_id,
@@ -272,13 +380,17 @@ class MemoryManager:
         }
 
     def get_active_users(self) -> int:
-        """활성 사용자 수 반환"""
-        return len(self.get_all_user_ids())
+        """활성 사용자 수 반환 (카운터, 기록을 훑지 않음)"""
+        return self.backend.active_users()
 
     def get_total_conversations(self) -> int:
-        """전체 대화 수 반환"""
-        total = 0
-        for user_id in self.get_all_user_ids():
-            info = self.get_memory_info(user_id)
-            total += info.get('conversation_count', 0)
-        return total
\ No newline at end of file
+        """전체 대화 턴 수 반환 (카운터, 기록을 훑지 않음)"""
+        return self.backend.total_turns()
+
+    def close(self):
+        """대기 중인 쓰기 처리 + 저장소 연결 종료 (서버 종료 시)"""
+        self.backend.close()
+
+    def get_cache_stats(self) -> dict:
+        """메모리 캐시 통계 (hit / miss / eviction)"""
+        return self.memory_store.stats()
\ No newline at end of file
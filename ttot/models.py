@@ -46,6 +46,12 @@ class MemoryResponse(BaseModel):
     history: List[Dict] = Field(..., description="대화 기록")
 
 
+class ConversationResponse(BaseModel):
+    """저장된 대화 기록 조회 응답 모델"""
+    user_id: str = Field(..., description="사용자 ID")
+    turns: List[Dict] = Field(..., description="대화 턴 목록 (ts, human, ai / 오래된 것부터)")
+
+
 class StatsResponse(BaseModel):
     """서버 통계 응답 모델"""
     active_users: int = Field(..., description="활성 사용자 수")
@@ -53,6 +59,7 @@ class StatsResponse(BaseModel):
     documents_in_db: int = Field(..., description="벡터 DB 문서 수")
     model: str = Field(..., description="사용 중인 LLM 모델")
     embedding_model: str = Field(..., description="사용 중인 임베딩 모델")
+    memory_cache: Optional[Dict] = Field(None, description="대화 메모리 캐시 통계 (hit / miss / eviction)")
 
 
 class HealthResponse(BaseModel):
@@ -60,4 +67,6 @@ class HealthResponse(BaseModel):
     status: str = Field(..., description="서버 상태")
     service: str = Field(..., description="서비스 이름")
     model: str = Field(..., description="LLM 모델")
-    documents: int = Field(..., description="벡터 DB 문서 수")
\ No newline at end of file
+    documents: int = Field(..., description="벡터 DB 문서 수")
+    ready: bool = Field(True, description="최근 사용자 메모리 미리 로드(warm-up) 완료 여부")
+    warmup: Optional[Dict] = Field(None, description="warm-up 진행 상태 (status / target / loaded / seconds)")
\ No newline at end of file
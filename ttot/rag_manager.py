@@ -36,6 +36,8 @@ class RAGManager:
 
         self.embeddings = self._initialize_embeddings()
         self.vectorstore = self._initialize_vectorstore()
+        # 문서 수 캐시 (/stats, /health 마다 Chroma 를 조회하지 않도록 추가 / 초기화 때만 갱신)
+        self._document_count = self.vectorstore._collection.count()
 
         print(f"[RAGManager] RAG 초기화 완료")
 
@@ -123,6 +125,7 @@ class RAGManager:
         prompt = ChatPromptTemplate.from_messages([
             ("system", self.prompt_manager.get_prompt()),
             ("system", "다음은 검색된 관련 정보입니다:\n{context}"),
+            ("system", "다음은 이 어르신과 예전에 나눈 대화 중 관련 있는 내용입니다:\n{past_conversations}"),
             MessagesPlaceholder(variable_name="chat_history"),  # ← 대화 기록
             ("human", "{question}")
         ])
@@ -141,11 +144,16 @@ class RAGManager:
                 return x.get("chat_history", [])
             return []
 
+        def get_past_conversations(x):
+            past = x.get("past_conversations") if isinstance(x, dict) else None
+            return "\n\n".join(past) if past else "(없음)"
+
         rag_chain = (
             {
                 "context": lambda x: format_docs(retriever.invoke(get_question(x))),
                 "question": get_question,
-                "chat_history": get_history
+                "chat_history": get_history,
+                "past_conversations": get_past_conversations
             }
             | prompt
             | self.llm
@@ -178,7 +186,8 @@ class RAGManager:
     def generate_with_rag_and_memory(
         self,
         query: str,
-        chat_history: List
+        chat_history: List,
+        past_conversations: List[str] = None
     ) -> tuple[str, List[Document]]:
         """
         ⭐ RAG + 메모리를 사용한 응답 생성
@@ -186,6 +195,7 @@ class RAGManager:
         Args:
             query: 사용자 질문
             chat_history: 대화 기록 (LangChain Message 형식)
+            past_conversations: 장기 기억에서 찾은 관련 과거 대화
 
         Returns:
             tuple: (응답, 출처 문서 리스트)
@@ -198,7 +208,8 @@ class RAGManager:
         # 응답 생성 (대화 기록 포함)
         response = rag_chain.invoke({
             "question": query,
-            "chat_history": chat_history
+            "chat_history": chat_history,
+            "past_conversations": past_conversations or []
         })
 
         # 🔍 디버그: 응답 확인
@@ -246,6 +257,7 @@ class RAGManager:
             ]
 
             self.vectorstore.add_documents(documents)
+            self._document_count += len(documents)
 
             print(f"[RAGManager] 문서 추가 완료 ({len(chunks)}개 청크)")
 
@@ -277,8 +289,8 @@ class RAGManager:
         return docs
 
     def get_document_count(self) -> int:
-        """벡터 DB의 문서 수 조회"""
-        return self.vectorstore._collection.count()
+        """벡터 DB의 문서 수 조회 (캐시된 값)"""
+        return self._document_count
 
     def clear_documents(self) -> bool:
         """벡터 DB 초기화"""
@@ -289,6 +301,7 @@ class RAGManager:
                 shutil.rmtree(self.config.CHROMA_PERSIST_DIR)
 
             self.vectorstore = self._initialize_vectorstore()
+            self._document_count = self.vectorstore._collection.count()
 
             print(f"[RAGManager] 벡터 DB 초기화 완료")
             return True
@@ -2,6 +2,8 @@
 services.py - 비즈니스 로직 처리
 RAG + Memory 통합 버전 (로컬 파일 메모리)
 """
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import List, Dict, Optional
 
@@ -11,6 +13,8 @@ from config import Config
 from llm_manager import LLMManager
 from rag_manager import RAGManager
 from memory_manager import MemoryManager
+from history_builder import HistoryBuilder
+from long_term_memory import LongTermMemory, format_turn
 from models import GenerateRequest, GenerateResponse
 
 
@@ -21,14 +25,70 @@ class ChatService:
         self,
         llm_manager: LLMManager,
         rag_manager: RAGManager,
-        memory_manager: MemoryManager
+        memory_manager: MemoryManager,
+        history_builder: Optional[HistoryBuilder] = None,
+        long_term_memory: Optional[LongTermMemory] = None
     ):
         self.llm_manager = llm_manager
         self.rag_manager = rag_manager
         self.memory_manager = memory_manager
-
-    def generate_response(self, request: GenerateRequest) -> GenerateResponse:
-        """사용자 요청에 대한 응답 생성"""
+        self.history_builder = history_builder
+        self.long_term_memory = long_term_memory
+        # 사용자별 대화 순서 보장용 락: user_id -> [asyncio.Lock, 대기/사용 중인 요청 수]
+        self._turn_locks: Dict[str, list] = {}
+
+    @asynccontextmanager
+    async def _user_turn(self, user_id: str):
+        """
+        같은 사용자의 대화(기록 읽기 → 응답 생성 → 저장)를 한 번에 하나씩 실행
+        쓰는 요청이 없으면 락을 지워서 사용자 수만큼 쌓이지 않게 함
+        """
+        entry = self._turn_locks.get(user_id)
+        if entry is None:
+            entry = self._turn_locks[user_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._turn_locks[user_id]
+
+    def _load_chat_history(self, user_id: str) -> list:
+        """프롬프트에 넣을 대화 기록 (토큰 예산 + 오래된 대화 요약, 없으면 최근 k턴 전체)"""
+        memory = self.memory_manager.get_or_create_memory(user_id)
+        if self.history_builder:
+            return self.history_builder.build(user_id, memory)
+        return memory.load_memory_variables({}).get("chat_history", [])
+
+    def _search_past_conversations(self, user_id: str, text: str, chat_history: list) -> List[str]:
+        """장기 기억에서 관련 과거 대화 검색 (프롬프트에 이미 원문으로 들어간 최근 턴은 제외)"""
+        if not self.long_term_memory:
+            return []
+        turns = [message for message in chat_history if message.type in ("human", "ai")]
+        recent = {format_turn(human.content, ai.content) for human, ai in zip(turns[0::2], turns[1::2])}
+        return self.long_term_memory.search(user_id, text, exclude=recent)
+
+    def _save_turn(self, user_id: str, text: str, bot_response: str):
+        """대화 기록 저장 + 장기 기억 저장 예약"""
+        self.memory_manager.save_context(user_id, text, bot_response)
+        if self.long_term_memory:
+            self.long_term_memory.add_turn(user_id, text, bot_response)
+
+    async def generate_response(self, request: GenerateRequest) -> GenerateResponse:
+        """
+        사용자 요청에 대한 응답 생성
+        LLM 호출 / 파일 I/O 는 스레드에서 실행해서 다른 사용자의 요청을 막지 않음
+        """
+        if not request.use_memory:
+            return await asyncio.to_thread(self._generate_response, request)
+
+        async with self._user_turn(request.user_id):
+            return await asyncio.to_thread(self._generate_response, request)
+
+    def _generate_response(self, request: GenerateRequest) -> GenerateResponse:
+        """사용자 요청에 대한 응답 생성 (동기, 같은 사용자는 _user_turn 안에서만 호출)"""
         print(f"\n[Service] 응답 생성 시작")
         print(f"  - 사용자: {request.user_id}")
         print(f"  - RAG: {request.use_rag}, Memory: {request.use_memory}")
@@ -63,13 +123,16 @@ class ChatService:
         if request.use_memory:
             print(f"[Service] RAG + 메모리 모드 (로컬 파일)")
             # 로컬 파일에서 대화 기록 불러오기
-            memory = self.memory_manager.get_or_create_memory(request.user_id)
-            chat_history = memory.load_memory_variables({}).get("chat_history", [])
+            chat_history = self._load_chat_history(request.user_id)
+            past_conversations = self._search_past_conversations(request.user_id, request.text, chat_history)
+            if past_conversations:
+                print(f"[Service] 장기 기억 {len(past_conversations)}턴 사용")
 
             # RAG + 메모리 통합 응답 생성
             bot_response, source_docs = self.rag_manager.generate_with_rag_and_memory(
                 request.text,
-                chat_history
+                chat_history,
+                past_conversations
             )
         else:
             print(f"[Service] RAG 단독 모드")
@@ -85,7 +148,7 @@ class ChatService:
 
         # 메모리 저장 (로컬 파일)
         if request.use_memory:
-            self.memory_manager.save_context(
+            self._save_turn(
                 request.user_id,
                 request.text,
                 bot_response
@@ -110,8 +173,7 @@ class ChatService:
 
         if request.use_memory:
             # 로컬 파일에서 대화 기록 불러오기
-            memory = self.memory_manager.get_or_create_memory(request.user_id)
-            chat_history = memory.load_memory_variables({}).get("chat_history", [])
+            chat_history = self._load_chat_history(request.user_id)
 
             bot_response = self.llm_manager.generate_with_history(
                 request.text,
@@ -119,7 +181,7 @@ class ChatService:
             )
 
             # 메모리 저장
-            self.memory_manager.save_context(
+            self._save_turn(
                 request.user_id,
                 request.text,
                 bot_response
@@ -232,8 +294,15 @@ class DocumentService:
 class MemoryService:
     """메모리 관련 비즈니스 로직"""
 
-    def __init__(self, memory_manager: MemoryManager):
+    def __init__(
+        self,
+        memory_manager: MemoryManager,
+        history_builder: Optional[HistoryBuilder] = None,
+        long_term_memory: Optional[LongTermMemory] = None
+    ):
         self.memory_manager = memory_manager
+        self.history_builder = history_builder
+        self.long_term_memory = long_term_memory
 
     def get_memory(self, user_id: str) -> Dict:
         """대화 메모리 조회"""
@@ -245,9 +314,22 @@ class MemoryService:
             "history": info["history"]
         }
 
+    def get_conversation(self, user_id: str, limit: Optional[int] = None) -> Dict:
+        """저장된 대화 기록 조회 (턴 단위)"""
+        turns = self.memory_manager.get_conversation(user_id, limit)
+
+        return {
+            "user_id": user_id,
+            "turns": turns
+        }
+
     def clear_memory(self, user_id: str) -> Dict:
         """대화 메모리 삭제"""
         success = self.memory_manager.clear_memory(user_id)
+        if self.history_builder:
+            self.history_builder.forget(user_id)
+        if self.long_term_memory:
+            self.long_term_memory.forget(user_id)
 
         if success:
             return {"message": f"{user_id}의 대화 기록이 삭제되었습니다"}
@@ -261,10 +343,12 @@ class StatsService:
     def __init__(
         self,
         memory_manager: MemoryManager,
-        rag_manager: RAGManager
+        rag_manager: RAGManager,
+        warmup: Optional[Dict] = None
     ):
         self.memory_manager = memory_manager
         self.rag_manager = rag_manager
+        self.warmup = warmup
 
     def get_stats(self) -> Dict:
         """서버 통계 조회"""
@@ -273,7 +357,8 @@ class StatsService:
             "total_conversations": self.memory_manager.get_total_conversations(),
             "documents_in_db": self.rag_manager.get_document_count(),
             "model": Config.LLM_MODEL,
-            "embedding_model": Config.EMBEDDING_MODEL
+            "embedding_model": Config.EMBEDDING_MODEL,
+            "memory_cache": self.memory_manager.get_cache_stats()
         }
 
     def get_health(self) -> Dict:
@@ -282,5 +367,8 @@ class StatsService:
             "status": "healthy",
             "service": "llm_server_modular",
             "model": Config.LLM_MODEL,
-            "documents": self.rag_manager.get_document_count()
+            "documents": self.rag_manager.get_document_count(),
+            # warm-up 이 끝났거나(실패 포함) 꺼져 있으면 ready (요청 처리는 warm-up 중에도 가능)
+            "ready": self.warmup is None or self.warmup["status"] in ("ready", "failed", "disabled"),
+            "warmup": dict(self.warmup) if self.warmup else None
         }
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+LLM 서버 동시성 테스트 스크립트
+같은 user_id 로 /generate 요청을 동시에 보내고 모든 대화 턴이 순서대로 저장됐는지 확인합니다.
+
+실행 (서버 실행 중):
+    python test_concurrency.py
+    python test_concurrency.py --requests 10 --rounds 3
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE_URL = "http://localhost:8002"
+TEST_USER = "concurrency_test_user"
+
+
+def print_test_header(test_name):
+    """테스트 헤더 출력"""
+    print("\n" + "="*60)
+    print(f"🧪 {test_name}")
+    print("="*60)
+
+
+def print_result(success, message):
+    """결과 출력"""
+    icon = "✅" if success else "❌"
+    print(f"{icon} {message}")
+
+
+def send_turn(index):
+    """마커가 들어간 메시지 1개 전송"""
+    payload = {
+        "text": f"[동시성 {index:03d}] 짧게 한 문장으로만 대답해 주세요.",
+        "user_id": TEST_USER,
+        "use_rag": False,
+        "use_memory": True
+    }
+    response = requests.post(f"{BASE_URL}/generate", json=payload, timeout=120)
+    return response.status_code == 200 and response.json().get("success", False)
+
+
+def check_history(count):
+    """저장된 기록에 모든 턴이 정확히 한 번씩, human → ai 순서로 들어 있는지 확인"""
+    response = requests.get(f"{BASE_URL}/memory/{TEST_USER}", timeout=10)
+    history = response.json()["history"]
+
+    types = [item["type"] for item in history]
+    expected_types = ["human", "ai"] * count
+    if types != expected_types:
+        return False, f"메시지 순서가 섞임: {types}"
+
+    markers = sorted(item["content"][:9] for item in history if item["type"] == "human")
+    expected = sorted(f"[동시성 {i:03d}]" for i in range(count))
+    if markers != expected:
+        missing = set(expected) - set(markers)
+        return False, f"유실되거나 중복된 턴: 누락 {sorted(missing)}, 저장 {len(markers)}개"
+
+    return True, f"{count}턴 모두 저장 (human/ai 순서 유지)"
+
+
+def test_concurrent_same_user(count, rounds):
+    """같은 사용자로 동시에 요청해도 턴이 유실되지 않음"""
+    print_test_header(f"동시 요청 {count}개 × {rounds}회 (user_id={TEST_USER})")
+
+    config = requests.get(f"{BASE_URL}/config", timeout=5).json()
+    memory_k = config["memory"]["k"]
+    if count > memory_k:
+        print(f"⚠️ 메모리는 최근 {memory_k}턴만 유지하므로 요청 수를 {memory_k}개로 줄입니다")
+        count = memory_k
+
+    all_passed = True
+    for round_index in range(rounds):
+        requests.delete(f"{BASE_URL}/memory/{TEST_USER}", timeout=10)
+
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            results = list(executor.map(send_turn, range(count)))
+        elapsed = time.time() - start_time
+
+        if not all(results):
+            print_result(False, f"{round_index + 1}회차: 실패한 요청 {results.count(False)}개")
+            all_passed = False
+            continue
+
+        passed, message = check_history(count)
+        print_result(passed, f"{round_index + 1}회차 ({elapsed:.1f}초): {message}")
+        all_passed = all_passed and passed
+
+    requests.delete(f"{BASE_URL}/memory/{TEST_USER}", timeout=10)
+    return all_passed
+
+
+def test_other_users_not_blocked():
+    """한 사용자의 요청이 처리되는 동안 다른 사용자의 요청도 동시에 처리됨"""
+    print_test_header("다른 사용자 요청 병렬 처리")
+
+    def timed(user_index):
+        payload = {
+            "text": "안녕하세요! 한 문장으로 인사해주세요.",
+            "user_id": f"{TEST_USER}_{user_index}",
+            "use_rag": False,
+            "use_memory": True
+        }
+        started = time.time()
+        response = requests.post(f"{BASE_URL}/generate", json=payload, timeout=120)
+        return response.status_code == 200, time.time() - started
+
+    users = 4
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        results = list(executor.map(timed, range(users)))
+    elapsed = time.time() - start_time
+
+    for user_index in range(users):
+        requests.delete(f"{BASE_URL}/memory/{TEST_USER}_{user_index}", timeout=10)
+
+    slowest = max(seconds for _, seconds in results)
+    total = sum(seconds for _, seconds in results)
+    # 순서대로 처리됐다면 전체 시간 ≈ 각 요청 시간의 합
+    passed = all(ok for ok, _ in results) and elapsed < total * 0.8
+    print_result(passed, f"전체 {elapsed:.1f}초 (가장 느린 요청 {slowest:.1f}초, 합계 {total:.1f}초)")
+    return passed
+
+
+def run_all_tests(count, rounds):
+    """모든 테스트 실행"""
+    print("\n" + "="*60)
+    print("🚀 LLM 서버 동시성 테스트 시작")
+    print("="*60)
+
+    results = [
+        ("같은 사용자 동시 요청", test_concurrent_same_user(count, rounds)),
+        ("다른 사용자 병렬 처리", test_other_users_not_blocked()),
+    ]
+
+    print("\n" + "="*60)
+    print("📊 테스트 결과 요약")
+    print("="*60)
+    for test_name, result in results:
+        icon = "✅" if result else "❌"
+        print(f"{icon} {test_name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n총 {len(results)}개 테스트 중 {passed}개 성공")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM 서버 동시성 테스트")
+    parser.add_argument("--requests", type=int, default=10, help="같은 사용자로 동시에 보낼 요청 수")
+    parser.add_argument("--rounds", type=int, default=3, help="반복 횟수")
+    args = parser.parse_args()
+
+    run_all_tests(args.requests, args.rounds)
@@ -0,0 +1,192 @@
+"""
+토큰 예산 기반 대화 기록(HistoryBuilder) 테스트 스크립트 (서버 / OpenAI 없이 실행)
+요약 LLM 은 호출 횟수를 세는 가짜 LLM 으로 대신하고, 토큰 수는 글자 수 근사(tiktoken 없음)로 셉니다.
+
+실행:
+    python test_history_builder.py
+"""
+import threading
+import time
+
+import history_builder
+from config import Config
+from history_builder import MESSAGE_OVERHEAD_TOKENS, MIN_FOLD_TURNS, HistoryBuilder, count_tokens
+from memory_manager import SimpleMemory
+
+TEST_USER = "history_test_user"
+
+
+def print_test_header(test_name):
+    """테스트 헤더 출력"""
+    print("\n" + "="*60)
+    print(f"🧪 {test_name}")
+    print("="*60)
+
+
+def print_result(success, message):
+    """결과 출력"""
+    icon = "✅" if success else "❌"
+    print(f"{icon} {message}")
+
+
+class _Reply:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeLLM:
+    """요약 요청을 세고 고정된 요약을 돌려주는 LLM (gate 가 있으면 열릴 때까지 대기)"""
+
+    def __init__(self, summary="어르신은 산책을 좋아하심", gate=None):
+        self.summary = summary
+        self.gate = gate
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        return _Reply(self.summary)
+
+
+def make_builder(llm, max_tokens, summary_max_tokens=40, min_recent_turns=2):
+    builder = HistoryBuilder(llm, Config)
+    builder.max_tokens = max_tokens
+    builder.summary_max_tokens = summary_max_tokens
+    builder.min_recent_turns = min_recent_turns
+    return builder
+
+
+def wait_idle(builder, timeout=5.0):
+    """백그라운드 요약 작업이 끝날 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while builder.stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def history_tokens(builder, history):
+    return sum(count_tokens(message.content, builder.model) + MESSAGE_OVERHEAD_TOKENS for message in history)
+
+
+def add_turn(memory, index, length=20):
+    memory.add_user_message(f"질문 {index} " + "가" * length)
+    memory.add_ai_message(f"대답 {index} " + "나" * length)
+
+
+def test_budget_bound():
+    """대화가 길어져도 요약 + 최근 대화가 max_tokens 를 넘지 않음"""
+    builder = make_builder(FakeLLM(), max_tokens=200)
+    memory = SimpleMemory(k=100)
+    results = []
+    over_budget = []
+    for index in range(30):
+        add_turn(memory, index)
+        history = builder.build(TEST_USER, memory)
+        wait_idle(builder)
+        if history_tokens(builder, history) > builder.max_tokens:
+            over_budget.append(index)
+
+    history = builder.build(TEST_USER, memory)
+    passed = not over_budget
+    print_result(passed, f"모든 턴에서 예산 이내 (초과한 턴: {over_budget})")
+    results.append(passed)
+
+    passed = history[0].type == "system" and len(history) - 1 < 30 * 2
+    print_result(passed, f"요약 1개 + 최근 {(len(history) - 1) // 2}턴 원문")
+    results.append(passed)
+
+    builder.close()
+    return all(results)
+
+
+def test_fold_batching():
+    """최근 턴만으로 예산을 넘어도 요약은 턴마다가 아니라 MIN_FOLD_TURNS 턴에 한 번"""
+    llm = FakeLLM()
+    builder = make_builder(llm, max_tokens=100, min_recent_turns=4)
+    memory = SimpleMemory(k=100)
+    turns = 24
+    for index in range(turns):
+        add_turn(memory, index, length=100)
+        builder.build(TEST_USER, memory)
+        wait_idle(builder)
+
+    passed = 0 < llm.calls <= turns // MIN_FOLD_TURNS
+    print_result(passed, f"{turns}턴 동안 요약 LLM 호출 {llm.calls}회")
+    builder.close()
+    return passed
+
+
+def test_forget_drops_pending():
+    """요약 도중 대화 기록을 삭제하면 진행 중이던 요약 결과는 버림"""
+    gate = threading.Event()
+    llm = FakeLLM(gate=gate)
+    builder = make_builder(llm, max_tokens=100)
+    memory = SimpleMemory(k=100)
+    for index in range(10):
+        add_turn(memory, index)
+    builder.build(TEST_USER, memory)
+
+    builder.forget(TEST_USER)
+    gate.set()
+    builder._executor.shutdown(wait=True)
+
+    passed = llm.calls == 1 and builder.get_summary(TEST_USER) is None and builder.summaries_generated == 0
+    print_result(passed, f"삭제 후 요약 없음 (LLM 호출 {llm.calls}회, 생성 {builder.summaries_generated}개)")
+    return passed
+
+
+def test_char_count_fallback():
+    """tiktoken 을 쓸 수 없으면 글자 수로 토큰 수를 근사하고, 요약도 그 기준으로 자름"""
+    results = []
+    passed = count_tokens("가" * 10) == 6
+    print_result(passed, f"글자 수 근사: 10글자 → {count_tokens('가' * 10)} 토큰")
+    results.append(passed)
+
+    builder = make_builder(FakeLLM(summary="요약" * 200), max_tokens=200, summary_max_tokens=40)
+    memory = SimpleMemory(k=100)
+    for index in range(20):
+        add_turn(memory, index)
+    builder.build(TEST_USER, memory)
+    wait_idle(builder)
+    summary = builder.get_summary(TEST_USER) or ""
+    passed = 0 < len(summary) <= builder.summary_max_tokens * 2
+    print_result(passed, f"긴 요약을 잘라냄: {len(summary)}글자")
+    results.append(passed)
+
+    builder.close()
+    return all(results)
+
+
+def run_all_tests():
+    """모든 테스트 실행"""
+    print("\n" + "="*60)
+    print("🚀 대화 기록 토큰 예산 테스트 시작")
+    print("="*60)
+
+    Config.LLM_MODEL = "gpt-4o-mini"
+    Config.HISTORY_MAX_TOKENS = 200
+    Config.SUMMARY_MAX_TOKENS = 40
+    Config.MIN_RECENT_TURNS = 2
+    # 네트워크 / tiktoken 인코딩 파일 유무와 관계없이 같은 결과가 나오도록 글자 수 근사 사용
+    history_builder._encoding = lambda model: None
+    count_tokens.cache_clear()
+
+    results = []
+    for test_name, test in (("예산 상한", test_budget_bound), ("요약 묶음", test_fold_batching),
+                            ("삭제 시 요약 버림", test_forget_drops_pending), ("글자 수 근사", test_char_count_fallback)):
+        print_test_header(test_name)
+        results.append((test_name, test()))
+
+    print("\n" + "="*60)
+    print("📊 테스트 결과 요약")
+    print("="*60)
+    for test_name, result in results:
+        icon = "✅" if result else "❌"
+        print(f"{icon} {test_name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n총 {len(results)}개 테스트 중 {passed}개 성공")
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,169 @@
+"""
+장기 기억(LongTermMemory) 테스트 스크립트 (서버 / OpenAI 없이 실행)
+임베딩은 같은 텍스트에 같은 벡터를 주는 가짜 임베딩(DeterministicFakeEmbedding)으로 대신하고,
+Chroma 는 임시 디렉토리에 만듭니다.
+
+실행:
+    pip install langchain-chroma chromadb
+    python test_long_term_memory.py
+"""
+import shutil
+import tempfile
+import time
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from config import Config
+from long_term_memory import LongTermMemory, format_turn
+from memory_backends import SQLiteMemoryBackend
+
+TEST_USER = "long_term_test_user"
+OTHER_USER = "long_term_other_user"
+
+
+def print_test_header(test_name):
+    """테스트 헤더 출력"""
+    print("\n" + "="*60)
+    print(f"🧪 {test_name}")
+    print("="*60)
+
+
+def print_result(success, message):
+    """결과 출력"""
+    icon = "✅" if success else "❌"
+    print(f"{icon} {message}")
+
+
+def make_memory(directory, backend=None):
+    Config.LONG_TERM_MEMORY_DIR = f"{directory}/chroma_memory"
+    return LongTermMemory(DeterministicFakeEmbedding(size=64), config=Config, backend=backend)
+
+
+def wait_indexed(memory, expected, timeout=10.0):
+    """백그라운드 저장이 expected 턴에 도달하고 큐가 빌 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if memory.stats()["pending"] == 0 and memory.indexed_total >= expected:
+            break
+        time.sleep(0.05)
+    # 마지막 배치의 flush_interval 만큼 더 기다려서 늦게 저장되는 턴이 없는지 확인
+    time.sleep(Config.LONG_TERM_FLUSH_INTERVAL + 0.2)
+
+
+def test_search(directory):
+    """사용자별로 필터링해서 검색, 최근 대화에 이미 있는 턴은 제외"""
+    memory = make_memory(directory)
+    for index in range(5):
+        memory.add_turn(TEST_USER, f"질문 {index}", f"대답 {index}")
+        memory.add_turn(OTHER_USER, f"질문 {index}", f"다른 사용자 대답 {index}")
+    wait_indexed(memory, 10)
+
+    results = []
+    target = format_turn("질문 3", "대답 3")
+    found = memory.search(TEST_USER, target)
+    passed = bool(found) and found[0] == target and all("다른 사용자" not in turn for turn in found)
+    print_result(passed, f"관련 있는 턴 검색 + 다른 사용자 대화 제외: {found[:1]}")
+    results.append(passed)
+
+    found = memory.search(TEST_USER, target, exclude={target})
+    passed = target not in found and len(found) <= memory.k
+    print_result(passed, f"최근 대화에 있는 턴 제외 ({len(found)}개)")
+    results.append(passed)
+
+    memory.close()
+    return all(results)
+
+
+def test_forget(directory):
+    """삭제하면 저장된 턴도, 삭제 전에 큐에 들어가 있던 턴도 남지 않음"""
+    memory = make_memory(directory)
+    memory.add_turn(TEST_USER, "질문 0", "대답 0")
+    wait_indexed(memory, 1)
+
+    memory.add_turn(TEST_USER, "질문 1", "대답 1")        # 아직 큐에 있음
+    memory.forget(TEST_USER)
+    wait_indexed(memory, 2)
+
+    found = memory.search(TEST_USER, format_turn("질문 1", "대답 1"))
+    passed = found == [] and memory.indexed_total == 1
+    print_result(passed, f"삭제 후 검색 결과 없음 ({found}), 저장 {memory.indexed_total}턴")
+    memory.close()
+    return passed
+
+
+def test_forget_from_other_process(directory):
+    """공유 저장소에서 다른 프로세스가 대화 기록을 삭제하면, 이 프로세스 큐에 있던 예전 턴도 버림"""
+    backend = SQLiteMemoryBackend(f"{directory}/chat_history.db")
+    other = SQLiteMemoryBackend(f"{directory}/chat_history.db")     # 다른 ttot 프로세스
+    memory = make_memory(directory, backend=backend)
+
+    memory.add_turn(TEST_USER, "질문 0", "대답 0")
+    other.clear(TEST_USER)
+    memory.add_turn(TEST_USER, "질문 1", "대답 1")        # 삭제 뒤의 새 대화는 저장
+    wait_indexed(memory, 1)
+
+    found = memory.search(TEST_USER, format_turn("질문 0", "대답 0"))
+    passed = format_turn("질문 0", "대답 0") not in found and memory.indexed_total == 1
+    print_result(passed, f"삭제 전 턴은 버리고 삭제 뒤 턴만 저장 ({memory.indexed_total}턴)")
+
+    memory.close()
+    backend.close()
+    other.close()
+    return passed
+
+
+def test_batching(directory):
+    """턴마다가 아니라 batch_size 개씩 모아서 임베딩"""
+    memory = make_memory(directory)
+    batches = []
+    add_texts = memory.vectorstore.add_texts
+
+    def recording_add_texts(texts, **kwargs):
+        batches.append(len(texts))
+        return add_texts(texts, **kwargs)
+
+    memory.vectorstore.add_texts = recording_add_texts
+    for index in range(10):
+        memory.add_turn(TEST_USER, f"질문 {index}", f"대답 {index}")
+    wait_indexed(memory, 10)
+
+    passed = batches == [4, 4, 2]
+    print_result(passed, f"10턴 → 배치 {batches}")
+    memory.close()
+    return passed
+
+
+def run_all_tests():
+    """모든 테스트 실행"""
+    print("\n" + "="*60)
+    print("🚀 장기 기억 테스트 시작")
+    print("="*60)
+
+    Config.LONG_TERM_K = 3
+    Config.LONG_TERM_MIN_SCORE = 0.0
+    Config.LONG_TERM_BATCH_SIZE = 4
+    Config.LONG_TERM_FLUSH_INTERVAL = 0.5
+
+    results = []
+    for test_name, test in (("검색", test_search), ("삭제", test_forget),
+                            ("다른 프로세스의 삭제", test_forget_from_other_process), ("배치 저장", test_batching)):
+        print_test_header(test_name)
+        directory = tempfile.mkdtemp(prefix="ttot_long_term_")
+        try:
+            results.append((test_name, test(directory)))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    print("\n" + "="*60)
+    print("📊 테스트 결과 요약")
+    print("="*60)
+    for test_name, result in results:
+        icon = "✅" if result else "❌"
+        print(f"{icon} {test_name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n총 {len(results)}개 테스트 중 {passed}개 성공")
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,252 @@
+"""
+대화 기록 저장소 백엔드 테스트 스크립트 (서버 없이 실행)
+file / sqlite / redis(fakeredis) 백엔드가 같은 동작을 하는지, 공유 저장소에서
+MemoryManager 두 개(= ttot 프로세스 두 개)가 같은 사용자의 대화를 이어받는지 확인합니다.
+
+실행:
+    pip install fakeredis
+    python test_memory_backends.py
+"""
+import shutil
+import tempfile
+import threading
+import time
+
+import fakeredis
+
+from config import Config
+from memory_backends import FileMemoryBackend, SQLiteMemoryBackend, RedisMemoryBackend
+from memory_manager import MemoryManager
+
+TEST_USER = "backend_test_user"
+
+
+def print_test_header(test_name):
+    """테스트 헤더 출력"""
+    print("\n" + "="*60)
+    print(f"🧪 {test_name}")
+    print("="*60)
+
+
+def print_result(success, message):
+    """결과 출력"""
+    icon = "✅" if success else "❌"
+    print(f"{icon} {message}")
+
+
+def make_backends(directory, server):
+    """백엔드 이름 → 생성 함수 (같은 함수를 두 번 부르면 같은 저장소를 보는 백엔드 2개)"""
+    return {
+        "file": lambda: FileMemoryBackend(f"{directory}/chat_history", fsync_interval=0),
+        "sqlite": lambda: SQLiteMemoryBackend(f"{directory}/chat_history.db"),
+        "redis": lambda: RedisMemoryBackend(fakeredis.FakeRedis(server=server)),
+    }
+
+
+def record(index):
+    return {"ts": None, "human": f"질문 {index}", "ai": f"대답 {index}"}
+
+
+def test_basic(name, backend):
+    """추가 / 최근 n턴 / 사용자 목록 / 카운터 / 삭제"""
+    for index in range(30):
+        backend.append(TEST_USER, record(index))
+    backend.append(f"{TEST_USER}_2", record(0))
+
+    checks = [
+        ("최근 3턴", [r["human"] for r in backend.read_last(TEST_USER, 3)] == ["질문 27", "질문 28", "질문 29"]),
+        ("사용자 목록", backend.user_ids() == [TEST_USER, f"{TEST_USER}_2"]),
+        ("최근 사용자", backend.recent_user_ids(1) == [f"{TEST_USER}_2"]),
+        ("활성 사용자 수", backend.active_users() == 2),
+        ("전체 턴 수", backend.total_turns() == 31),
+        ("삭제", backend.clear(TEST_USER) and backend.read_last(TEST_USER, 3) == []),
+        ("삭제 후 카운터", backend.active_users() == 1 and backend.total_turns() == 1),
+        ("삭제 횟수", backend.epoch(TEST_USER) == 1 and backend.epoch(f"{TEST_USER}_2") == 0),
+        ("없는 사용자 삭제", not backend.clear("no_such_user")),
+    ]
+    for check_name, passed in checks:
+        print_result(passed, f"[{name}] {check_name}")
+    return all(passed for _, passed in checks)
+
+
+def test_shared(name, create_backend):
+    """MemoryManager 2개가 같은 저장소를 쓸 때 서로의 대화를 이어받음"""
+    first = MemoryManager(backend=create_backend())
+    second = MemoryManager(backend=create_backend())
+
+    first.save_context(TEST_USER, "첫 번째 프로세스", "안녕하세요")
+    second.get_or_create_memory(TEST_USER)          # 캐시에 올려둠
+    first.save_context(TEST_USER, "다시 첫 번째", "네")
+    second.save_context(TEST_USER, "두 번째 프로세스", "반가워요")
+
+    expected = ["첫 번째 프로세스", "다시 첫 번째", "두 번째 프로세스"]
+    results = []
+    for manager_name, manager in (("first", first), ("second", second)):
+        history = [m["content"] for m in manager.get_chat_history(TEST_USER) if m["type"] == "human"]
+        passed = history == expected
+        print_result(passed, f"[{name}] {manager_name} 이 최신 대화를 봄: {history}")
+        results.append(passed)
+
+    first.clear_memory(TEST_USER)
+    passed = second.get_chat_history(TEST_USER) == []
+    print_result(passed, f"[{name}] 다른 프로세스의 삭제가 반영됨")
+    results.append(passed)
+
+    first.close()
+    second.close()
+    return all(results)
+
+
+def test_history_complete(name, create_backend):
+    """예전 압축 기준(200턴)보다 많이 대화해도 대화 내역 전체가 남음 (프롬프트용 메모리는 최근 k턴)"""
+    manager = MemoryManager(backend=create_backend())
+    turns = 250
+    for index in range(turns):
+        manager.save_context(TEST_USER, f"질문 {index}", f"대답 {index}")
+    time.sleep(1.5)     # 파일 백엔드의 백그라운드 스레드가 한 번 이상 돌도록 대기
+
+    history = [turn["human"] for turn in manager.get_conversation(TEST_USER)]
+    recent = [turn["human"] for turn in manager.get_conversation(TEST_USER, limit=3)]
+    checks = [
+        ("전체 대화 내역", history == [f"질문 {index}" for index in range(turns)]),
+        ("최근 n턴", recent == [f"질문 {index}" for index in range(turns - 3, turns)]),
+        ("프롬프트용 메모리는 최근 k턴", len(manager.get_chat_history(TEST_USER)) == Config.MEMORY_K * 2),
+    ]
+    for check_name, passed in checks:
+        print_result(passed, f"[{name}] {check_name}")
+    manager.close()
+    return all(passed for _, passed in checks)
+
+
+def test_concurrent_append(name, create_backend):
+    """여러 스레드가 동시에 추가해도 턴 수가 맞음"""
+    backend = create_backend()
+
+    def worker(thread_index):
+        for index in range(10):
+            backend.append(f"{TEST_USER}_{thread_index}", record(index))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    passed = backend.total_turns() == 40 and backend.active_users() == 4
+    print_result(passed, f"[{name}] 동시 추가 4 × 10턴 → 전체 {backend.total_turns()}턴, 사용자 {backend.active_users()}명")
+    backend.close()
+    return passed
+
+
+def test_clear_during_append(name, create_backend):
+    """다른 스레드가 추가하는 도중에 삭제해도 전체 턴 수 = 사용자별 턴 수 합계, close() 는 모든 스레드의 연결을 닫음"""
+    backend = create_backend()
+
+    def writer():
+        for index in range(50):
+            backend.append(TEST_USER, record(index))
+            backend.append(f"{TEST_USER}_2", record(index))
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    for _ in range(20):
+        backend.clear(TEST_USER)
+    thread.join()
+
+    remaining = sum(backend.version(user_id) for user_id in backend.user_ids())
+    passed = backend.total_turns() == remaining
+    print_result(passed, f"[{name}] 삭제 중 추가 → 전체 {backend.total_turns()}턴, 사용자별 합계 {remaining}턴")
+
+    if isinstance(backend, SQLiteMemoryBackend):
+        connections = list(backend._connections)
+        backend.close()
+        try:
+            connections[-1].execute("SELECT 1")
+            closed = False
+        except Exception:
+            closed = True
+        passed = passed and len(connections) == 2 and closed
+        print_result(passed, f"[{name}] close() 가 스레드 연결 {len(connections)}개를 모두 닫음")
+    else:
+        backend.close()
+    return passed
+
+
+def test_history_read_during_save(name, create_backend):
+    """대화 저장 중에 기록 / 메모리 정보를 조회해도 예외가 나지 않음 (deque 순회 중 변경)"""
+    manager = MemoryManager(backend=create_backend())
+    errors = []
+
+    def reader():
+        for _ in range(200):
+            try:
+                manager.get_chat_history(TEST_USER)
+                manager.get_memory_info(TEST_USER)
+            except RuntimeError as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for index in range(100):
+        manager.save_context(TEST_USER, f"질문 {index}", f"대답 {index}")
+    thread.join()
+    manager.close()
+
+    passed = not errors
+    print_result(passed, f"[{name}] 저장 중 조회 → 예외 {len(errors)}개")
+    return passed
+
+
+def run_all_tests():
+    """모든 테스트 실행"""
+    print("\n" + "="*60)
+    print("🚀 대화 기록 저장소 백엔드 테스트 시작")
+    print("="*60)
+
+    Config.MEMORY_K = 15
+    Config.MEMORY_CACHE_MAX_USERS = 100
+    Config.MEMORY_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    Config.MEMORY_CACHE_IDLE_TTL = 0
+
+    results = []
+    for test_name, test in (("기본 동작", "basic"), ("프로세스 간 공유", "shared"), ("전체 대화 보관", "complete"),
+                            ("동시 추가", "concurrent"),
+                            ("추가 중 삭제", "clear_during_append"), ("저장 중 조회", "read_during_save")):
+        print_test_header(test_name)
+        for name in ("file", "sqlite", "redis"):
+            if test in ("shared", "clear_during_append") and name == "file":
+                continue        # 파일 백엔드는 프로세스 1개용 (version 없음)
+            directory = tempfile.mkdtemp(prefix="ttot_backend_")
+            try:
+                create_backend = make_backends(directory, fakeredis.FakeServer())[name]
+                if test == "basic":
+                    backend = create_backend()
+                    passed = test_basic(name, backend)
+                    backend.close()
+                elif test == "shared":
+                    passed = test_shared(name, create_backend)
+                elif test == "complete":
+                    passed = test_history_complete(name, create_backend)
+                elif test == "clear_during_append":
+                    passed = test_clear_during_append(name, create_backend)
+                elif test == "read_during_save":
+                    passed = test_history_read_during_save(name, create_backend)
+                else:
+                    passed = test_concurrent_append(name, create_backend)
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+            results.append((f"{test_name} ({name})", passed))
+
+    print("\n" + "="*60)
+    print("📊 테스트 결과 요약")
+    print("="*60)
+    for test_name, result in results:
+        icon = "✅" if result else "❌"
+        print(f"{icon} {test_name}")
+
+    passed = sum(1 for _, result in results if result)
+    print(f"\n총 {len(results)}개 테스트 중 {passed}개 성공")
+
+
+if __name__ == "__main__":
+    run_all_tests()